@@ -1,4 +1,31 @@
 """
 This subpackage contains modules with functions that perform
 mathematical calculations.
+
+Submodules are imported on first access, ``import FarseerNMR.calc`` does
+not import them:
+
+>>> from FarseerNMR import calc
+>>> calc.threshold.calc_thresholds(values)
 """
+import importlib
+
+_submodules = frozenset((
+    "binding",
+    "bootstrap",
+    "calc",
+    "csp",
+    "memoize",
+    "pre",
+    "threshold",
+    ))
+
+
+def __getattr__(name):
+    if name in _submodules:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _submodules)
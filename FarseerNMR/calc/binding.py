@@ -0,0 +1,398 @@
+r"""
+Fits binding isotherms to titration data.
+
+The single-site binding isotherm is fitted to all residues at once,
+using a Levenberg-Marquardt minimization vectorized along the residue
+axis, that is, all residues are optimized simultaneously in each
+iteration instead of one after the other.
+
+Without protein concentration, ligand is considered in excess:
+    
+    ``\Delta\delta = \Delta\delta_{max} \frac{[L]}{K_d + [L]}``
+
+If the protein concentration, ``[P]``, is given, ligand depletion
+is accounted for:
+    
+    ``\Delta\delta = \Delta\delta_{max}
+    \frac{b - \sqrt{b^2 - 4[P][L]}}{2[P]}``, ``b = [P] + [L] + K_d``
+
+The output of :func:`~calc_fitting` can be passed directly to
+:func:`FarseerNMR.plot.parameterevolutionplot.plot`.
+"""
+# Copyright © 2017-2019 Farseer-NMR
+#
+# @Original Article: http://bit.ly/farseerjbnmr
+# @ResearchGate https://goo.gl/z8dPJU
+# @Twitter https://twitter.com/farseer_nmr
+# @GitHub: http://bit.ly/farseer-nmr
+# @Mailist: http://bit.ly/fs_maillist
+#
+# This file is part of the Farseer-NMR project.
+#
+# Farseer-NMR is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Farseer-NMR is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Farseer-NMR. If not, see <http://www.gnu.org/licenses/>.
+#
+# For full list of author contributors visit:
+#    https://github.com/Farseer-NMR/FarSeer-NMR/wiki/Citing
+#
+# Contributors to this file:
+#    - João M.C. Teixeira (https://github.com/joaomcteixeira)
+import numpy as np
+
+from FarseerNMR import logger
+
+log = logger.get_log(__name__)
+
+
+def single_site(x, kd, dmax, protein_conc=None):
+    """
+    Evaluates the single-site binding isotherm.
+    
+    Parameters
+    ----------
+    x : :obj:`np.ndarray`, shape=(N,)
+        Ligand concentrations.
+    
+    kd : :obj:`np.ndarray`, shape=(R,)
+        Dissociation constants, one per residue.
+    
+    dmax : :obj:`np.ndarray`, shape=(R,)
+        Maximum perturbations, one per residue.
+    
+    protein_conc : :obj:`float`, optional
+        Protein concentration. If None, ligand is considered in excess.
+        Defaults to None.
+    
+    Returns
+    -------
+    :obj:`np.ndarray`, shape=(R, N)
+        The isotherm of each residue evaluated at x.
+    """
+    
+    fraction, _ = _bound_fraction(
+        np.asarray(x, dtype=float),
+        np.asarray(kd, dtype=float)[:, np.newaxis],
+        protein_conc,
+        )
+    
+    return np.asarray(dmax, dtype=float)[:, np.newaxis] * fraction
+
+
+def fit_single_site(
+        values,
+        x,
+        *,
+        protein_conc=None,
+        max_iter=200,
+        tol=1e-10,
+        ):
+    """
+    Fits the single-site binding isotherm to every residue at once.
+    
+    Parameters
+    ----------
+    values : :obj:`np.ndarray`, shape=(R, N), dtype=float
+        The perturbation of each residue (R) along the titration (N).
+        NaN values are ignored.
+    
+    x : array-like, shape=(N,)
+        Ligand concentration of each titration point.
+    
+    protein_conc : :obj:`float`, optional
+        Protein concentration. If None, ligand is considered in excess.
+        Defaults to None.
+    
+    max_iter : :obj:`int`, optional
+        Maximum number of Levenberg-Marquardt iterations.
+        Defaults to 200.
+    
+    tol : :obj:`float`, optional
+        Relative change of the residual sum of squares under which
+        a residue is considered converged.
+        Defaults to 1e-10.
+    
+    Returns
+    -------
+    tuple of :obj:`np.ndarray`, each of shape=(R,)
+        kd, dmax, kd_error and dmax_error. Errors are the standard
+        errors derived from the covariance matrix of the fit.
+        Residues with less than 3 valid points are NaN.
+    
+    Raises
+    ------
+    TypeError
+        If values is not np.ndarray of ndim == 2.
+    
+    ValueError
+        If x length differs from values.shape[1] or max_iter
+        is lower than 1.
+    """
+    
+    if not(isinstance(values, np.ndarray)):
+        raise TypeError("values should be an ARRAY")
+    
+    if not(values.ndim == 2):
+        raise TypeError("values should have two dimensions")
+    
+    if max_iter < 1:
+        raise ValueError("max_iter should be a positive integer")
+    
+    x = np.asarray(x, dtype=float)
+    
+    if x.shape != values.shape[1:]:
+        raise ValueError(
+            f"Length of x ({x.size}) differs from number of "
+            f"titration points ({values.shape[1]})"
+            )
+    
+    valid = np.logical_not(np.isnan(values))
+    y = np.where(valid, values, 0.0)
+    num_valid = np.count_nonzero(valid, axis=1)
+    
+    # kd is optimized in logarithmic scale, keeping it positive
+    params = _initial_guess(y, valid, x)
+    ssr = _ssr(y, valid, x, params, protein_conc)
+    lambda_ = np.full(values.shape[0], 1e-3)
+    active = num_valid >= 3
+    
+    for iteration in range(max_iter):
+        
+        # only residues not yet converged are evaluated
+        idx = np.flatnonzero(active)
+        
+        if idx.size == 0:
+            break
+        
+        y_ = y[idx]
+        valid_ = valid[idx]
+        
+        jtj, jtr = _normal_equations(y_, valid_, x, params[idx], protein_conc)
+        
+        new_params = params[idx] + _solve_damped(jtj, jtr, lambda_[idx])
+        new_ssr = _ssr(y_, valid_, x, new_params, protein_conc)
+        
+        improved = new_ssr < ssr[idx]
+        
+        converged = improved & (
+            (ssr[idx] - new_ssr)
+            <= tol * np.maximum(ssr[idx], np.finfo(float).tiny)
+            )
+        
+        params[idx[improved]] = new_params[improved]
+        ssr[idx[improved]] = new_ssr[improved]
+        
+        lambda_[idx] = np.where(improved, lambda_[idx] / 10, lambda_[idx] * 10)
+        
+        # lambda too high means no further improvement is possible
+        active[idx] = np.logical_not(converged) & (lambda_[idx] < 1e12)
+    
+    log.debug("Levenberg-Marquardt iterations: %s", iteration + 1)
+    
+    (a, b, d), _ = _normal_equations(y, valid, x, params, protein_conc)
+    
+    with np.errstate(invalid="ignore", divide="ignore"):
+        variance = ssr / (num_valid - 2)
+        det = a * d - b ** 2
+        logkd_error = np.sqrt(variance * d / det)
+        dmax_error = np.sqrt(variance * a / det)
+    
+    kd = np.exp(params[:, 0])
+    dmax = params[:, 1]
+    kd_error = kd * logkd_error
+    
+    unfitted = num_valid < 3
+    for result in (kd, dmax, kd_error, dmax_error):
+        result[unfitted] = np.nan
+    
+    return kd, dmax, kd_error, dmax_error
+
+
+def calc_fitting(
+        values,
+        titration_x_values,
+        *,
+        num_points=100,
+        protein_conc=None,
+        ):
+    """
+    Fits the single-site binding isotherm to every residue and
+    prepares the fitting for plotting.
+    
+    Parameters
+    ----------
+    values : :obj:`np.ndarray`, shape=(R, N), dtype=float
+        The perturbation of each residue (R) along the titration (N).
+    
+    titration_x_values : array-like, shape=(N,)
+        Ligand concentration of each titration point.
+    
+    num_points : :obj:`int`, optional
+        The number of points where the fitted curves are sampled,
+        evenly spaced between the first and the last
+        titration_x_values.
+        Defaults to 100.
+    
+    protein_conc : :obj:`float`, optional
+        Protein concentration. If None, ligand is considered in excess.
+        Defaults to None.
+    
+    Returns
+    -------
+    tuple
+        fitting : :obj:`np.ndarray`, shape=(R, num_points)
+        fitting_info : :obj:`np.ndarray`, shape=(R,), dtype=str
+        
+        As expected by the ``fitting`` and ``fitting_info`` parameters
+        of :func:`FarseerNMR.plot.parameterevolutionplot.plot`.
+    """
+    
+    x = np.asarray(titration_x_values, dtype=float)
+    
+    kd, dmax, kd_error, dmax_error = fit_single_site(
+        values,
+        x,
+        protein_conc=protein_conc,
+        )
+    
+    grid = np.linspace(x[0], x[-1], num_points)
+    fitting = single_site(grid, kd, dmax, protein_conc=protein_conc)
+    
+    fitting_info = format_fitting_info(kd, dmax, kd_error, dmax_error)
+    
+    return fitting, fitting_info
+
+
+def format_fitting_info(kd, dmax, kd_error, dmax_error):
+    """
+    Formats fitted parameters to information strings.
+    
+    Parameters
+    ----------
+    kd, dmax, kd_error, dmax_error : :obj:`np.ndarray`, shape=(R,)
+        As returned by :func:`~fit_single_site`.
+    
+    Returns
+    -------
+    :obj:`np.ndarray`, shape=(R,), dtype=str
+    """
+    
+    info = [
+        "Kd: not fitted" if np.isnan(k) else
+        f"Kd: {k:.3g} ± {ke:.2g}\n"
+        f"Δδmax: {d:.3g} ± {de:.2g}"
+        for k, d, ke, de in zip(kd, dmax, kd_error, dmax_error)
+        ]
+    
+    return np.array(info, dtype=str)
+
+
+def _bound_fraction(x, kd, protein_conc):
+    """
+    Returns the bound fraction and its derivative regarding kd.
+    """
+    
+    if protein_conc is None:
+        denominator = kd + x
+        fraction = x / denominator
+        dfraction = -x / denominator ** 2
+    
+    else:
+        b = protein_conc + x + kd
+        root = np.sqrt(b ** 2 - 4 * protein_conc * x)
+        fraction = (b - root) / (2 * protein_conc)
+        dfraction = (1 - b / root) / (2 * protein_conc)
+    
+    return fraction, dfraction
+
+
+def _initial_guess(y, valid, x):
+    """
+    Returns initial (log kd, dmax) parameters for each residue.
+    """
+    
+    last = y.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+    dmax = y[np.arange(y.shape[0]), last]
+    
+    positive_x = x[x > 0]
+    kd = np.median(positive_x) if positive_x.size else 1.0
+    
+    params = np.empty((y.shape[0], 2))
+    params[:, 0] = np.log(kd)
+    params[:, 1] = np.where(dmax != 0, dmax, 1.0)
+    
+    return params
+
+
+def _residuals(y, valid, x, params, protein_conc):
+    
+    fraction, _ = _bound_fraction(
+        x,
+        np.exp(params[:, 0:1]),
+        protein_conc,
+        )
+    
+    return np.where(valid, y - params[:, 1:2] * fraction, 0.0)
+
+
+def _ssr(y, valid, x, params, protein_conc):
+    
+    return np.sum(_residuals(y, valid, x, params, protein_conc) ** 2, axis=1)
+
+
+def _normal_equations(y, valid, x, params, protein_conc):
+    """
+    Returns the elements of J^T J, (a, b, d) for [[a, b], [b, d]],
+    and of J^T r, (g0, g1), each of shape=(R,).
+    """
+    
+    kd = np.exp(params[:, 0:1])
+    dmax = params[:, 1:2]
+    
+    fraction, dfraction = _bound_fraction(x, kd, protein_conc)
+    
+    # derivatives regarding log kd and dmax
+    jac0 = np.where(valid, dmax * dfraction * kd, 0.0)
+    jac1 = np.where(valid, fraction, 0.0)
+    
+    residuals = np.where(valid, y - dmax * fraction, 0.0)
+    
+    jtj = (
+        np.sum(jac0 * jac0, axis=1),
+        np.sum(jac0 * jac1, axis=1),
+        np.sum(jac1 * jac1, axis=1),
+        )
+    
+    jtr = (
+        np.sum(jac0 * residuals, axis=1),
+        np.sum(jac1 * residuals, axis=1),
+        )
+    
+    return jtj, jtr
+
+
+def _solve_damped(jtj, jtr, lambda_):
+    """
+    Solves the damped 2x2 normal equations of every residue.
+    """
+    
+    a, b, d = jtj
+    a = a * (1 + lambda_)
+    d = d * (1 + lambda_)
+    
+    with np.errstate(invalid="ignore", divide="ignore"):
+        det = a * d - b ** 2
+        step = np.empty((a.size, 2))
+        step[:, 0] = (d * jtr[0] - b * jtr[1]) / det
+        step[:, 1] = (a * jtr[1] - b * jtr[0]) / det
+    
+    return np.nan_to_num(step, nan=0.0, posinf=0.0, neginf=0.0)
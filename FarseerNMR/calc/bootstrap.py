@@ -0,0 +1,380 @@
+"""
+Bootstrap confidence intervals for binding isotherm fittings.
+
+For each residue, the single-site binding isotherm is fitted
+(:mod:`FarseerNMR.calc.binding`) and new data sets are generated by
+resampling, with replacement, the residuals of the fit. Each generated
+data set is fitted again and the confidence intervals of Kd and
+Δδmax are taken from the percentiles of the refitted parameters.
+
+Residues are split in chunks that are distributed over a process pool.
+The input array is shared with the workers through shared memory and
+each chunk has its own random seed, derived deterministically from
+the user seed, so results are reproducible regardless of the number
+of processes.
+
+The strings of :func:`~format_bootstrap_info` can be passed directly
+as the ``fitting_info`` argument of
+:func:`FarseerNMR.plot.parameterevolutionplot.plot`.
+"""
+# Copyright © 2017-2019 Farseer-NMR
+#
+# @Original Article: http://bit.ly/farseerjbnmr
+# @ResearchGate https://goo.gl/z8dPJU
+# @Twitter https://twitter.com/farseer_nmr
+# @GitHub: http://bit.ly/farseer-nmr
+# @Mailist: http://bit.ly/fs_maillist
+#
+# This file is part of the Farseer-NMR project.
+#
+# Farseer-NMR is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Farseer-NMR is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Farseer-NMR. If not, see <http://www.gnu.org/licenses/>.
+#
+# For full list of author contributors visit:
+#    https://github.com/Farseer-NMR/FarSeer-NMR/wiki/Citing
+#
+# Contributors to this file:
+#    - João M.C. Teixeira (https://github.com/joaomcteixeira)
+import warnings
+
+import numpy as np
+
+from FarseerNMR import logger
+from FarseerNMR.calc import binding
+from FarseerNMR.core import parallel
+
+log = logger.get_log(__name__)
+
+
+def bootstrap_single_site(
+        values,
+        x,
+        *,
+        protein_conc=None,
+        num_boot=1000,
+        confidence=0.95,
+        chunk_size=64,
+        processes=None,
+        seed=0,
+        ):
+    """
+    Calculates bootstrap confidence intervals of the single-site
+    binding isotherm parameters for every residue.
+    
+    Parameters
+    ----------
+    values : :obj:`np.ndarray`, shape=(R, N), dtype=float
+        The perturbation of each residue (R) along the titration (N).
+        NaN values are ignored.
+    
+    x : array-like, shape=(N,)
+        Ligand concentration of each titration point.
+    
+    protein_conc : :obj:`float`, optional
+        Protein concentration. If None, ligand is considered in excess.
+        Defaults to None.
+    
+    num_boot : :obj:`int`, optional
+        Number of bootstrap replicates per residue.
+        Defaults to 1000.
+    
+    confidence : :obj:`float`, optional
+        The confidence level of the intervals.
+        Defaults to 0.95.
+    
+    chunk_size : :obj:`int`, optional
+        Number of residues per chunk. Each chunk is fitted at once
+        in a worker process: memory usage of a worker is proportional
+        to ``chunk_size * num_boot * N``.
+        Defaults to 64.
+    
+    processes : :obj:`int`, optional
+        Number of worker processes. If 1, runs in the current process.
+        Defaults to None, the number of CPUs.
+    
+    seed : :obj:`int`, optional
+        The random seed. Results are reproducible for the same seed
+        and chunk_size.
+        Defaults to 0.
+    
+    Returns
+    -------
+    tuple
+        kd, dmax : :obj:`np.ndarray`, shape=(R,)
+            The fitted parameters.
+        kd_ci, dmax_ci : :obj:`np.ndarray`, shape=(R, 2)
+            The lower and upper limits of the confidence intervals.
+    
+    Raises
+    ------
+    TypeError
+        If values is not np.ndarray of ndim == 2.
+    
+    ValueError
+        If confidence is not in ]0, 1[.
+    """
+    
+    if not(isinstance(values, np.ndarray)):
+        raise TypeError("values should be an ARRAY")
+    
+    if not(values.ndim == 2):
+        raise TypeError("values should have two dimensions")
+    
+    if not(0 < confidence < 1):
+        raise ValueError("confidence should be in ]0, 1[")
+    
+    values = values.astype(float, copy=False)
+    x = np.asarray(x, dtype=float)
+    
+    kd, dmax, _, _ = binding.fit_single_site(
+        values,
+        x,
+        protein_conc=protein_conc,
+        )
+    
+    # workers resample the residuals of these fits, not fitted again
+    fitted = binding.single_site(x, kd, dmax, protein_conc=protein_conc)
+    
+    starts = list(range(0, values.shape[0], chunk_size))
+    stops = starts[1:] + [values.shape[0]]
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    
+    args = (x, protein_conc, num_boot, confidence)
+    
+    log.debug("Bootstrap chunks: %s", len(starts))
+    
+    if processes == 1 or len(starts) == 1:
+        
+        results = [
+            _bootstrap_rows(
+                values[start:stop],
+                fitted[start:stop],
+                *args,
+                s,
+                )
+            for start, stop, s in zip(starts, stops, seeds)
+            ]
+    
+    else:
+        
+        shared = parallel.shared_arrays(values, fitted)
+        
+        with shared as (values_spec, fitted_spec):
+            with parallel.process_pool(processes) as executor:
+                results = list(executor.map(
+                    _bootstrap_chunk,
+                    [values_spec] * len(starts),
+                    [fitted_spec] * len(starts),
+                    starts,
+                    stops,
+                    *[[a] * len(starts) for a in args],
+                    seeds,
+                    ))
+    
+    kd_ci = np.concatenate([r[0] for r in results])
+    dmax_ci = np.concatenate([r[1] for r in results])
+    
+    return kd, dmax, kd_ci, dmax_ci
+
+
+def calc_bootstrap_fitting(
+        values,
+        titration_x_values,
+        *,
+        num_points=100,
+        protein_conc=None,
+        confidence=0.95,
+        **kwargs,
+        ):
+    """
+    Fits the single-site binding isotherm to every residue and
+    prepares the fitting and its bootstrap confidence intervals
+    for plotting.
+    
+    Parameters
+    ----------
+    values : :obj:`np.ndarray`, shape=(R, N), dtype=float
+        The perturbation of each residue (R) along the titration (N).
+    
+    titration_x_values : array-like, shape=(N,)
+        Ligand concentration of each titration point.
+    
+    num_points : :obj:`int`, optional
+        The number of points where the fitted curves are sampled.
+        Defaults to 100.
+    
+    protein_conc : :obj:`float`, optional
+        Protein concentration. If None, ligand is considered in excess.
+        Defaults to None.
+    
+    confidence : :obj:`float`, optional
+        The confidence level of the intervals.
+        Defaults to 0.95.
+    
+    kwargs
+        Other parameters of :func:`~bootstrap_single_site`.
+    
+    Returns
+    -------
+    tuple
+        fitting : :obj:`np.ndarray`, shape=(R, num_points)
+        fitting_info : :obj:`np.ndarray`, shape=(R,), dtype=str
+        
+        As expected by the ``fitting`` and ``fitting_info`` parameters
+        of :func:`FarseerNMR.plot.parameterevolutionplot.plot`.
+    """
+    
+    x = np.asarray(titration_x_values, dtype=float)
+    
+    kd, dmax, kd_ci, dmax_ci = bootstrap_single_site(
+        values,
+        x,
+        protein_conc=protein_conc,
+        confidence=confidence,
+        **kwargs,
+        )
+    
+    grid = np.linspace(x[0], x[-1], num_points)
+    fitting = binding.single_site(grid, kd, dmax, protein_conc=protein_conc)
+    
+    fitting_info = format_bootstrap_info(
+        kd,
+        dmax,
+        kd_ci,
+        dmax_ci,
+        confidence=confidence,
+        )
+    
+    return fitting, fitting_info
+
+
+def format_bootstrap_info(kd, dmax, kd_ci, dmax_ci, confidence=0.95):
+    """
+    Formats bootstrap results to information strings.
+    
+    Parameters
+    ----------
+    kd, dmax, kd_ci, dmax_ci : :obj:`np.ndarray`
+        As returned by :func:`~bootstrap_single_site`.
+    
+    confidence : :obj:`float`, optional
+        The confidence level of the intervals.
+        Defaults to 0.95.
+    
+    Returns
+    -------
+    :obj:`np.ndarray`, shape=(R,), dtype=str
+    """
+    
+    level = f"{confidence * 100:g}%"
+    
+    info = [
+        "Kd: not fitted" if np.isnan(k) else
+        f"Kd: {k:.3g} [{kc[0]:.3g}, {kc[1]:.3g}]\n"
+        f"Δδmax: {d:.3g} [{dc[0]:.3g}, {dc[1]:.3g}]\n"
+        f"{level} CI"
+        for k, d, kc, dc in zip(kd, dmax, kd_ci, dmax_ci)
+        ]
+    
+    return np.array(info, dtype=str)
+
+
+def _bootstrap_chunk(values_spec, fitted_spec, start, stop, *args):
+    """
+    Worker of :func:`~bootstrap_single_site`, reads a chunk of
+    the shared values and fitted arrays.
+    """
+    
+    values_shm, values = parallel.attach_array(values_spec)
+    fitted_shm, fitted = parallel.attach_array(fitted_spec)
+    
+    try:
+        result = _bootstrap_rows(
+            values[start:stop],
+            fitted[start:stop],
+            *args,
+            )
+    
+    finally:
+        del values, fitted
+        values_shm.close()
+        fitted_shm.close()
+    
+    return result
+
+
+def _bootstrap_rows(
+        values,
+        fitted,
+        x,
+        protein_conc,
+        num_boot,
+        confidence,
+        seed,
+        ):
+    """
+    Residual bootstrap of a chunk of residues.
+    
+    <fitted> are the curves of the fits of <values>, computed once
+    by :func:`~bootstrap_single_site`. All replicates of all residues
+    in the chunk are fitted at once.
+    """
+    
+    rng = np.random.default_rng(seed)
+    num_rows, num_points = values.shape
+    
+    valid = np.logical_not(np.isnan(values))
+    num_valid = np.count_nonzero(valid, axis=1)
+    
+    # moves the valid residuals to the beginning of each row
+    order = np.argsort(np.logical_not(valid), axis=1, kind="stable")
+    residuals = np.take_along_axis(values - fitted, order, axis=1)
+    
+    draws = (
+        rng.random((num_rows, num_boot, num_points))
+        * num_valid[:, np.newaxis, np.newaxis]
+        ).astype(int)
+    
+    replicates = np.where(
+        valid[:, np.newaxis, :],
+        fitted[:, np.newaxis, :]
+        + residuals[np.arange(num_rows)[:, np.newaxis, np.newaxis], draws],
+        np.nan,
+        )
+    
+    kd_boot, dmax_boot, _, _ = binding.fit_single_site(
+        replicates.reshape(num_rows * num_boot, num_points),
+        x,
+        protein_conc=protein_conc,
+        )
+    
+    tail = (1 - confidence) / 2 * 100
+    percentiles = [tail, 100 - tail]
+    
+    # residues that could not be fitted have all-NaN replicates
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        
+        kd_ci = np.nanpercentile(
+            kd_boot.reshape(num_rows, num_boot),
+            percentiles,
+            axis=1,
+            ).T
+        
+        dmax_ci = np.nanpercentile(
+            dmax_boot.reshape(num_rows, num_boot),
+            percentiles,
+            axis=1,
+            ).T
+    
+    return kd_ci, dmax_ci
@@ -3,7 +3,6 @@
 This module contains functions that make calculations :-)
 """
 import numpy as np
-from math import ceil
 
 from FarseerNMR import logger
 
@@ -25,6 +24,9 @@ def threshold_std_of_population(
     where, ``pop`` is the ``population`` percentage with the minimum
     values in ``values``.
     
+    NaN values are ignored. See also
+    :func:`~batch_threshold_std_of_population`.
+    
     Parameters
     ----------
     values : :obj:`np.ndarray`, dtype=float, n_dims=1
@@ -48,6 +50,9 @@ def threshold_std_of_population(
     ------
     TypeError
         If values is not np.ndarray type of ndim == 1.
+    
+    ValueError
+        If population is not in ]0, 1].
     """
     
     if not(isinstance(values, np.ndarray)):
@@ -56,24 +61,313 @@ def threshold_std_of_population(
     if not(values.ndim == 1):
         raise TypeError("values should have only one dimension")
     
-    sorted_values = np.copy(np.sort(np.absolute(values)))
-    parsed_values = sorted_values[np.logical_not(np.isnan(sorted_values))]
+    threshold = float(
+        _threshold_std_of_population(
+            values[np.newaxis, :],
+            std,
+            population,
+            )[0]
+        )
     
-    firstpop = parsed_values[0: ceil(0.1 * len(parsed_values))]
-    log.debug(f"<firstpop>: {firstpop}")
+    log.debug("threshold: %s", threshold)
     
-    mean = np.mean(firstpop)
-    log.debug(f"mean: {mean}")
+    assert isinstance(threshold, float), "threshold MUST be float"
+    return threshold
+
+
+def batch_threshold_std_of_population(
+        values,
+        *,
+        std=5,
+        population=0.1,
+        ):
+    """
+    Calculates :func:`~threshold_std_of_population` for every row
+    of a 2-D array in a single vectorized pass.
     
-    stdev = np.std(firstpop)
-    log.debug(f"stdev {stdev}")
+    Each row is evaluated independently, NaN values are ignored
+    row-wise. Rows without valid values have NaN threshold.
     
-    threshold = mean + std * stdev
+    Parameters
+    ----------
+    values : :obj:`np.ndarray`, dtype=float, n_dims=2
+        An array of shape (series, residues) with the values upon
+        which calculate the thresholds.
     
-    log.debug(f"threshold: {threshold}")
+    std : :obj:`int`
+        The standard deviations.
+        Defaults to 5.
     
-    assert isinstance(threshold, float), "threshold MUST be float"
-    return threshold
+    population : :obj:`float`
+        The percentage of population with minimum values
+        upon which the threshold is calculated.
+        Defaults to 0.1.
+    
+    Returns
+    -------
+    :obj:`np.ndarray`, dtype=float, shape=(series,)
+        The threshold value of each row.
+    
+    Raises
+    ------
+    TypeError
+        If values is not np.ndarray type of ndim == 2.
+    
+    ValueError
+        If population is not in ]0, 1].
+    """
+    
+    if not(isinstance(values, np.ndarray)):
+        raise TypeError("values should be an ARRAY")
+    
+    if not(values.ndim == 2):
+        raise TypeError("values should have two dimensions")
+    
+    thresholds = _threshold_std_of_population(values, std, population)
+    
+    log.debug("thresholds: %s", logger.TruncatedRepr(thresholds))
+    
+    return thresholds
+
+
+def _threshold_std_of_population(values, std, population):
+    """
+    Selection based kernel of :func:`~batch_threshold_std_of_population`.
+    
+    Instead of sorting, each row is partitioned so that its ``k``
+    minimum values occupy the first ``k`` positions; ``k`` varies
+    among rows according to the number of NaN values in each row.
+    """
+    
+    if not(0 < population <= 1):
+        raise ValueError("population should be in ]0, 1]")
+    
+    absvalues = np.absolute(values, dtype=float)
+    isnan = np.isnan(absvalues)
+    
+    # NaNs are moved to the end of each row by the partition
+    absvalues[isnan] = np.inf
+    
+    num_valid = values.shape[1] - np.count_nonzero(isnan, axis=1)
+    k = np.ceil(population * num_valid).astype(int)
+    kmax = k.max(initial=0)
+    
+    if kmax == 0:
+        return np.full(values.shape[0], np.nan)
+    
+    kth = np.unique(k[k > 0] - 1)
+    firstpop = np.partition(absvalues, kth, axis=1)[:, :kmax]
+    mask = np.arange(kmax) < k[:, np.newaxis]
+    
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(mask, firstpop, 0).sum(axis=1) / k
+        deviations = np.where(mask, firstpop - mean[:, np.newaxis], 0)
+        stdev = np.sqrt((deviations ** 2).sum(axis=1) / k)
+    
+    return mean + std * stdev
+
+
+class StreamingThreshold():
+    """
+    Incremental estimator of :func:`~threshold_std_of_population`.
+    
+    Values are given chunk by chunk with :meth:`~update` and the
+    current threshold, over all values received so far, is available
+    at any time in :attr:`~threshold` at O(1) cost.
+    
+    Instead of keeping all values, the estimator keeps a bounded-memory
+    sketch of their absolute values: logarithmically spaced bins, each
+    bin storing the count, sum and sum of squares of its values. Bins
+    fully inside the lowest ``population`` are used exactly, only the
+    bin containing the population boundary is approximated.
+    
+    The estimate differs from the exact
+    :func:`~threshold_std_of_population` by at most
+    ``(1 + std) * (gamma - 1) * q``, where
+    ``gamma = (1 + alpha) / (1 - alpha)`` and ``q`` is the largest
+    value of the population. For the default ``alpha`` this is about
+    2% of ``q`` per standard deviation. The bound holds while the
+    number of bins does not exceed ``max_bins``, after which the
+    highest bins are collapsed together.
+    
+    Parameters
+    ----------
+    std : :obj:`int`, optional
+        The standard deviations.
+        Defaults to 5.
+    
+    population : :obj:`float`, optional
+        The percentage of population with minimum values
+        upon which the threshold is calculated.
+        Defaults to 0.1.
+    
+    alpha : :obj:`float`, optional
+        The relative accuracy of the bins, in ]0, 1[.
+        Defaults to 0.01.
+    
+    max_bins : :obj:`int`, optional
+        The maximum number of bins kept in memory.
+        Defaults to 2048.
+    
+    Examples
+    --------
+    >>> st = StreamingThreshold()
+    >>> for chunk in acquired_chunks:
+    ...     st.update(chunk)
+    ...     print(st.threshold)
+    """
+    
+    _zero_key = np.iinfo(np.int64).min
+    
+    def __init__(
+            self,
+            *,
+            std=5,
+            population=0.1,
+            alpha=0.01,
+            max_bins=2048,
+            ):
+        
+        if not(0 < population <= 1):
+            raise ValueError("population should be in ]0, 1]")
+        
+        if not(0 < alpha < 1):
+            raise ValueError("alpha should be in ]0, 1[")
+        
+        if not(isinstance(max_bins, int) and max_bins > 1):
+            raise ValueError("max_bins should be int greater than 1")
+        
+        self.std = std
+        self.population = population
+        self.alpha = alpha
+        self.max_bins = max_bins
+        
+        self._log_gamma = np.log((1 + alpha) / (1 - alpha))
+        
+        self._keys = np.empty(0, dtype=np.int64)
+        self._counts = np.empty(0, dtype=np.int64)
+        self._sums = np.empty(0)
+        self._sumsq = np.empty(0)
+        
+        self._count = 0
+        self._threshold = np.nan
+        
+        return
+    
+    @property
+    def threshold(self):
+        """
+        The threshold of all values given so far.
+        
+        NaN if no values were given.
+        """
+        return self._threshold
+    
+    @property
+    def count(self):
+        """
+        The number of (non NaN) values given so far.
+        """
+        return self._count
+    
+    @property
+    def num_bins(self):
+        """
+        The number of bins currently in memory.
+        """
+        return self._keys.size
+    
+    def update(self, values):
+        """
+        Adds values to the estimator.
+        
+        Parameters
+        ----------
+        values : array-like, dtype=float
+            The new values, of any shape. NaN values are ignored.
+        
+        Returns
+        -------
+        float
+            The updated threshold.
+        """
+        
+        values = np.absolute(np.asarray(values, dtype=float)).ravel()
+        values = values[np.logical_not(np.isnan(values))]
+        
+        if values.size == 0:
+            return self._threshold
+        
+        keys = np.full(values.size, self._zero_key, dtype=np.int64)
+        positive = values > 0
+        keys[positive] = np.ceil(
+            np.log(values[positive]) / self._log_gamma
+            ).astype(np.int64)
+        
+        # merges the new values with the existing bins
+        all_keys, inverse = np.unique(
+            np.concatenate((self._keys, keys)),
+            return_inverse=True,
+            )
+        
+        old = self._keys.size
+        num_bins = all_keys.size
+        
+        counts = np.bincount(inverse[old:], minlength=num_bins)
+        sums = np.bincount(inverse[old:], weights=values, minlength=num_bins)
+        sumsq = np.bincount(
+            inverse[old:],
+            weights=values ** 2,
+            minlength=num_bins,
+            )
+        
+        counts[inverse[:old]] += self._counts
+        sums[inverse[:old]] += self._sums
+        sumsq[inverse[:old]] += self._sumsq
+        
+        # collapses the highest bins
+        if num_bins > self.max_bins:
+            last = self.max_bins - 1
+            counts[last] = counts[last:].sum()
+            sums[last] = sums[last:].sum()
+            sumsq[last] = sumsq[last:].sum()
+            all_keys = all_keys[:self.max_bins]
+            counts = counts[:self.max_bins]
+            sums = sums[:self.max_bins]
+            sumsq = sumsq[:self.max_bins]
+        
+        self._keys = all_keys
+        self._counts = counts
+        self._sums = sums
+        self._sumsq = sumsq
+        self._count += values.size
+        
+        self._threshold = self._estimate()
+        log.debug("streaming threshold: %s", self._threshold)
+        
+        return self._threshold
+    
+    def _estimate(self):
+        """Estimates the threshold from the bins."""
+        
+        k = int(np.ceil(self.population * self._count))
+        
+        cum_counts = np.cumsum(self._counts)
+        
+        # the bin where the population boundary is
+        b = int(np.searchsorted(cum_counts, k))
+        
+        full = cum_counts[b - 1] if b > 0 else 0
+        missing = k - full
+        bin_mean = self._sums[b] / self._counts[b]
+        
+        sum_ = self._sums[:b].sum() + missing * bin_mean
+        sumsq = self._sumsq[:b].sum() + missing * bin_mean ** 2
+        
+        mean = sum_ / k
+        stdev = np.sqrt(max(sumsq / k - mean ** 2, 0))
+        
+        return float(mean + self.std * stdev)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,208 @@
+r"""
+Calculates Chemical Shift Perturbations (CSPs).
+
+All functions operate over the complete experimental data set at once,
+which is represented by a 4-D array of shape
+``(conditions, titration points, residues, nuclei)``.
+
+The combined CSP of each residue is calculated as:
+    
+    ``\sqrt{\frac{1}{n} \sum_{i}^{n} (\alpha_{i} \Delta\delta_{i})^2}``
+
+where ``n`` is the number of nuclei, ``\alpha_{i}`` the weight of
+nucleus ``i`` and ``\Delta\delta_{i}`` its chemical shift difference
+to the reference titration point.
+
+For each condition, the output is shaped as the ``values`` argument
+of the Bar Plot templates, for example:
+:func:`FarseerNMR.plot.barplotcompacted.plot`.
+"""
+# Copyright © 2017-2019 Farseer-NMR
+#
+# @Original Article: http://bit.ly/farseerjbnmr
+# @ResearchGate https://goo.gl/z8dPJU
+# @Twitter https://twitter.com/farseer_nmr
+# @GitHub: http://bit.ly/farseer-nmr
+# @Mailist: http://bit.ly/fs_maillist
+#
+# This file is part of the Farseer-NMR project.
+#
+# Farseer-NMR is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Farseer-NMR is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Farseer-NMR. If not, see <http://www.gnu.org/licenses/>.
+#
+# For full list of author contributors visit:
+#    https://github.com/Farseer-NMR/FarSeer-NMR/wiki/Citing
+#
+# Contributors to this file:
+#    - João M.C. Teixeira (https://github.com/joaomcteixeira)
+import numpy as np
+
+from FarseerNMR import logger
+
+log = logger.get_log(__name__)
+
+nuclei_weights = {
+    "1H": 1.0,
+    "15N": 0.14,
+    "13C": 0.3,
+    }
+"""
+Default weight of each nucleus in the combined CSP.
+"""
+
+
+def calc_cs_diffs(
+        shifts,
+        *,
+        reference=0,
+        dtype=np.float64,
+        ):
+    """
+    Calculates chemical shift differences to a reference titration point.
+    
+    Parameters
+    ----------
+    shifts : :obj:`np.ndarray`, n_dims=4
+        Chemical shifts of shape
+        (conditions, titration points, residues, nuclei).
+        Missing peaks should be NaN.
+    
+    reference : :obj:`int`, optional
+        The index of the reference titration point.
+        Defaults to 0.
+    
+    dtype : {np.float64, np.float32}, optional
+        The precision of the calculation.
+        Defaults to np.float64.
+    
+    Returns
+    -------
+    :obj:`np.ndarray`, shape=shifts.shape
+        The chemical shift differences.
+    
+    Raises
+    ------
+    TypeError
+        If shifts is not np.ndarray of ndim == 4.
+    
+    ValueError
+        If dtype is not float64 or float32.
+    """
+    
+    _validate_shifts(shifts, dtype)
+    
+    diffs = shifts.astype(dtype, copy=True)
+    diffs -= diffs[:, reference:reference + 1]
+    
+    return diffs
+
+
+def calc_csp(
+        shifts,
+        nuclei=("1H", "15N"),
+        *,
+        weights=None,
+        reference=0,
+        dtype=np.float64,
+        ):
+    """
+    Calculates combined Chemical Shift Perturbations.
+    
+    The calculation is performed in a single vectorized pass over all
+    conditions, titration points and residues. NaN values, i.e.
+    missing peaks, propagate to the CSP of the respective residue.
+    
+    Parameters
+    ----------
+    shifts : :obj:`np.ndarray`, n_dims=4
+        Chemical shifts of shape
+        (conditions, titration points, residues, nuclei).
+        Missing peaks should be NaN.
+    
+    nuclei : sequence of str, optional
+        The nucleus of each index of ``shifts`` last axis.
+        Defaults to ("1H", "15N").
+    
+    weights : :obj:`dict`, optional
+        Weights of each nucleus, updates :const:`~nuclei_weights`.
+        Defaults to None, :const:`~nuclei_weights` are used.
+    
+    reference : :obj:`int`, optional
+        The index of the reference titration point.
+        Defaults to 0.
+    
+    dtype : {np.float64, np.float32}, optional
+        The precision of the calculation. np.float32 halves memory
+        usage for large data sets.
+        Defaults to np.float64.
+    
+    Returns
+    -------
+    :obj:`np.ndarray`, shape=(conditions, titration points, residues)
+        The combined CSPs. Each condition, ``csps[i]``, can be used
+        as the ``values`` argument of the Bar Plot templates.
+    
+    Raises
+    ------
+    TypeError
+        If shifts is not np.ndarray of ndim == 4.
+    
+    ValueError
+        If the number of nuclei differs from shifts.shape[3],
+        if a nucleus has no weight defined or
+        if dtype is not float64 or float32.
+    """
+    
+    _validate_shifts(shifts, dtype)
+    
+    if len(nuclei) != shifts.shape[3]:
+        raise ValueError(
+            f"Number of nuclei ({len(nuclei)}) differs from "
+            f"shifts last dimension ({shifts.shape[3]})"
+            )
+    
+    all_weights = {**nuclei_weights, **(weights or {})}
+    
+    try:
+        w = np.array([all_weights[n] for n in nuclei], dtype=dtype)
+    except KeyError as e:
+        raise ValueError(f"No weight defined for nucleus {e}") from e
+    
+    log.debug("CSP weights: %s", dict(zip(nuclei, w)))
+    
+    # operations are performed inplace to avoid array copies
+    diffs = calc_cs_diffs(shifts, reference=reference, dtype=dtype)
+    diffs *= w
+    np.square(diffs, out=diffs)
+    
+    csps = np.mean(diffs, axis=3)
+    np.sqrt(csps, out=csps)
+    
+    return csps
+
+
+def _validate_shifts(shifts, dtype):
+    
+    if not(isinstance(shifts, np.ndarray)):
+        raise TypeError("shifts should be an ARRAY")
+    
+    if not(shifts.ndim == 4):
+        raise TypeError(
+            "shifts should have four dimensions: "
+            "(conditions, titration points, residues, nuclei)"
+            )
+    
+    if np.dtype(dtype) not in (np.float64, np.float32):
+        raise ValueError("dtype should be np.float64 or np.float32")
+    
+    return
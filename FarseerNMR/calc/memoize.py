@@ -0,0 +1,290 @@
+"""
+Content-addressed memoization of calculations over arrays.
+
+Results are cached in a bounded Least Recently Used (LRU) cache and
+keyed by a hash of the array content (bytes, dtype and shape) together
+with the remaining parameters. Calculating the same statistics over
+the same data, for example when rendering the same array with
+different plotting templates, reads the result from the cache.
+
+Example
+-------
+>>> @memoize(maxsize=64)
+... def calculation(values, *, std=5):
+...     ...
+
+>>> calculation.cache_info()
+CacheInfo(hits=0, misses=0, maxsize=64, currsize=0)
+
+The counters of all memoized functions are reported by
+:func:`~cache_info`.
+"""
+# Copyright © 2017-2019 Farseer-NMR
+#
+# @Original Article: http://bit.ly/farseerjbnmr
+# @ResearchGate https://goo.gl/z8dPJU
+# @Twitter https://twitter.com/farseer_nmr
+# @GitHub: http://bit.ly/farseer-nmr
+# @Mailist: http://bit.ly/fs_maillist
+#
+# This file is part of the Farseer-NMR project.
+#
+# Farseer-NMR is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Farseer-NMR is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Farseer-NMR. If not, see <http://www.gnu.org/licenses/>.
+#
+# For full list of author contributors visit:
+#    https://github.com/Farseer-NMR/FarSeer-NMR/wiki/Citing
+#
+# Contributors to this file:
+#    - João M.C. Teixeira (https://github.com/joaomcteixeira)
+import functools
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from FarseerNMR import logger
+
+log = logger.get_log(__name__)
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+_memoized = {}
+_missing = object()
+
+
+class LRUCache():
+    """
+    Bounded Least Recently Used cache with hit and miss counters.
+    
+    Thread safe.
+    
+    Parameters
+    ----------
+    maxsize : :obj:`int`, optional
+        Maximum number of cached results. The least recently used
+        result is evicted when full.
+        Defaults to 128.
+    """
+    
+    def __init__(self, maxsize=128):
+        
+        if not(isinstance(maxsize, int)) or maxsize < 1:
+            raise ValueError("maxsize should be a positive integer")
+        
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        
+        return
+    
+    def __len__(self):
+        return len(self._data)
+    
+    def __contains__(self, key):
+        return key in self._data
+    
+    def get(self, key, default=None):
+        """
+        Returns the result cached under key and counts the hit or miss.
+        """
+        
+        with self._lock:
+            try:
+                value = self._data[key]
+            
+            except KeyError:
+                self.misses += 1
+                return default
+            
+            self._data.move_to_end(key)
+            self.hits += 1
+        
+        return value
+    
+    def put(self, key, value):
+        """
+        Caches value under key, evicting the least recently used
+        result if the cache is full.
+        """
+        
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            
+            while len(self._data) > self.maxsize:
+                evicted, _ = self._data.popitem(last=False)
+                log.debug("Evicted from cache: %s", evicted[0])
+        
+        return
+    
+    def info(self):
+        """
+        Returns a :obj:`CacheInfo` with the cache counters.
+        """
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self))
+    
+    def clear(self):
+        """
+        Removes all cached results and resets the counters.
+        """
+        
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+        
+        return
+
+
+def array_key(array, *args, **kwargs):
+    """
+    Generates a cache key for an array and parameters.
+    
+    The array content is hashed with BLAKE2b, so equal arrays give
+    equal keys regardless of their identity.
+    
+    Parameters
+    ----------
+    array : :obj:`np.ndarray`
+        Array of any fixed size dtype (not object).
+    
+    args, kwargs
+        Other parameters, must be hashable.
+    
+    Returns
+    -------
+    tuple
+        The key.
+    
+    Raises
+    ------
+    TypeError
+        If array is of object dtype or parameters are not hashable.
+    """
+    
+    if array.dtype.hasobject:
+        raise TypeError("arrays of object dtype can not be hashed")
+    
+    digest = hashlib.blake2b(
+        np.ascontiguousarray(array).data,
+        digest_size=16,
+        ).hexdigest()
+    
+    key = (
+        digest,
+        array.dtype.str,
+        array.shape,
+        args,
+        tuple(sorted(kwargs.items())),
+        )
+    
+    hash(key)
+    
+    return key
+
+
+def memoize(maxsize=128):
+    """
+    Decorator that memoizes a function whose first argument is
+    a :obj:`np.ndarray`.
+    
+    Arrays in the results are copied from and to the cache, so
+    modifying a result does not modify the cache. Calls whose first
+    argument is not an array, or with non-hashable parameters, are
+    not cached.
+    
+    The decorated function has ``cache_info()`` and ``cache_clear()``
+    methods, as :func:`functools.lru_cache`.
+    
+    Parameters
+    ----------
+    maxsize : :obj:`int`, optional
+        Maximum number of cached results.
+        Defaults to 128.
+    """
+    
+    def decorator(func):
+        
+        cache = LRUCache(maxsize)
+        
+        @functools.wraps(func)
+        def wrapper(values, *args, **kwargs):
+            
+            if not(isinstance(values, np.ndarray)):
+                return func(values, *args, **kwargs)
+            
+            try:
+                key = array_key(values, *args, **kwargs)
+            
+            except TypeError:
+                return func(values, *args, **kwargs)
+            
+            result = cache.get(key, _missing)
+            
+            if result is _missing:
+                result = func(values, *args, **kwargs)
+                cache.put(key, _copy(result))
+                return result
+            
+            return _copy(result)
+        
+        wrapper.cache = cache
+        wrapper.cache_info = cache.info
+        wrapper.cache_clear = cache.clear
+        
+        _memoized[f"{func.__module__}.{func.__qualname__}"] = cache
+        
+        return wrapper
+    
+    return decorator
+
+
+def cache_info():
+    """
+    Returns the cache counters of all memoized functions.
+    
+    Returns
+    -------
+    :obj:`dict`
+        Function name: :obj:`CacheInfo`.
+    """
+    return {name: cache.info() for name, cache in _memoized.items()}
+
+
+def cache_clear():
+    """
+    Clears the caches of all memoized functions.
+    """
+    
+    for cache in _memoized.values():
+        cache.clear()
+    
+    return
+
+
+def _copy(result):
+    """
+    Copies arrays, also inside tuples.
+    """
+    
+    if isinstance(result, np.ndarray):
+        return result.copy()
+    
+    if isinstance(result, tuple):
+        return tuple(_copy(r) for r in result)
+    
+    return result
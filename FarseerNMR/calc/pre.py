@@ -0,0 +1,290 @@
+r"""
+Calculates Paramagnetic Relaxation Enhancement (PRE) data.
+
+All functions operate over the complete series at once, inputs and
+outputs are arrays of shape ``(series, residues)``, as the ``values``,
+``theo_pre`` and ``tag_position`` arguments of the Bar Plot templates,
+for example: :func:`FarseerNMR.plot.barplotcompacted.plot`.
+
+The theoretical transverse PRE rate of each amide proton is given by
+the Solomon-Bloembergen equation:
+    
+    ``\Gamma_{2} = \frac{K}{r^6} \left(4\tau_{c} +
+    \frac{3\tau_{c}}{1 + \omega_{H}^2\tau_{c}^2}\right)``
+
+where ``r`` is the tag-amide distance, ``\tau_{c}`` the correlation
+time, ``\omega_{H}`` the proton Larmor frequency and ``K`` a
+constant of the electron spin, :const:`~K_NITROXIDE` for a nitroxide
+tag (S=1/2). The theoretical intensity ratio follows from:
+    
+    ``\frac{I_{para}}{I_{dia}} = \frac{R_{2} e^{-\Gamma_{2} t}}
+    {R_{2} + \Gamma_{2}}``
+
+where ``R_{2}`` is the transverse relaxation rate of the diamagnetic
+sample and ``t`` the total INEPT evolution time.
+"""
+# Copyright © 2017-2019 Farseer-NMR
+#
+# @Original Article: http://bit.ly/farseerjbnmr
+# @ResearchGate https://goo.gl/z8dPJU
+# @Twitter https://twitter.com/farseer_nmr
+# @GitHub: http://bit.ly/farseer-nmr
+# @Mailist: http://bit.ly/fs_maillist
+#
+# This file is part of the Farseer-NMR project.
+#
+# Farseer-NMR is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Farseer-NMR is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Farseer-NMR. If not, see <http://www.gnu.org/licenses/>.
+#
+# For full list of author contributors visit:
+#    https://github.com/Farseer-NMR/FarSeer-NMR/wiki/Citing
+#
+# Contributors to this file:
+#    - João M.C. Teixeira (https://github.com/joaomcteixeira)
+import numpy as np
+
+from FarseerNMR import logger
+
+log = logger.get_log(__name__)
+
+_MU0_4PI = 1e-7  # T^2 m^3 J^-1
+_GAMMA_H = 2.6752218744e8  # rad s^-1 T^-1
+_G_E = 2.00231930436
+_MU_B = 9.2740100783e-24  # J T^-1
+
+K_NITROXIDE = (
+    (1 / 15)
+    * _MU0_4PI ** 2
+    * _GAMMA_H ** 2
+    * _G_E ** 2
+    * _MU_B ** 2
+    * 0.5 * (0.5 + 1)
+    * 1e60
+    )
+"""
+Solomon-Bloembergen constant of a nitroxide tag (S=1/2)
+in Å^6 s^-2, about 1.23e-32 cm^6 s^-2.
+"""
+
+
+def calc_intensity_ratios(para, dia):
+    """
+    Calculates paramagnetic/diamagnetic intensity ratios.
+    
+    Parameters
+    ----------
+    para : :obj:`np.ndarray`, shape=(series, residues)
+        Peak intensities of the paramagnetic samples.
+    
+    dia : :obj:`np.ndarray`, shape=(series, residues) or (residues,)
+        Peak intensities of the diamagnetic samples. A single row is
+        used as reference for all series.
+    
+    Returns
+    -------
+    :obj:`np.ndarray`, dtype=float, shape=(series, residues)
+        The intensity ratios. Ratios of missing peaks (NaN) or of
+        zero diamagnetic intensity are NaN.
+    
+    Raises
+    ------
+    TypeError
+        If para or dia are not np.ndarray.
+    
+    ValueError
+        If shapes of para and dia are not compatible.
+    """
+    
+    if not(isinstance(para, np.ndarray)) or not(isinstance(dia, np.ndarray)):
+        raise TypeError("para and dia should be ARRAYS")
+    
+    try:
+        para, dia = np.broadcast_arrays(
+            np.asarray(para, dtype=float),
+            np.asarray(dia, dtype=float),
+            )
+    
+    except ValueError as e:
+        raise ValueError(
+            f"para {para.shape} and dia {dia.shape} shapes not compatible"
+            ) from e
+    
+    ratios = np.full(para.shape, np.nan)
+    
+    np.divide(para, dia, out=ratios, where=(dia != 0))
+    
+    return ratios
+
+
+def calc_distances(tag_coords, amide_coords):
+    """
+    Calculates the distances between tags and amide protons.
+    
+    Parameters
+    ----------
+    tag_coords : :obj:`np.ndarray`, shape=(series, 3)
+        Coordinates of the paramagnetic center in each series.
+    
+    amide_coords : :obj:`np.ndarray`, shape=(residues, 3)
+        Coordinates of the amide protons. Missing atoms should be NaN.
+    
+    Returns
+    -------
+    :obj:`np.ndarray`, shape=(series, residues)
+        The distances, in the units of the coordinates.
+    """
+    
+    tag_coords = np.asarray(tag_coords, dtype=float).reshape(-1, 3)
+    amide_coords = np.asarray(amide_coords, dtype=float).reshape(-1, 3)
+    
+    diffs = tag_coords[:, np.newaxis, :] - amide_coords[np.newaxis, :, :]
+    
+    return np.sqrt(np.einsum("ijk,ijk->ij", diffs, diffs))
+
+
+def calc_gamma2(
+        distances,
+        *,
+        tc=5e-9,
+        field=600,
+        k=K_NITROXIDE,
+        ):
+    """
+    Calculates transverse PRE rates with the Solomon-Bloembergen
+    equation.
+    
+    Parameters
+    ----------
+    distances : :obj:`np.ndarray`
+        Tag-amide distances in Å, of any shape.
+    
+    tc : :obj:`float` or :obj:`np.ndarray`, optional
+        Correlation time in seconds, broadcastable to distances.
+        Defaults to 5e-9.
+    
+    field : :obj:`float`, optional
+        Spectrometer proton frequency in MHz.
+        Defaults to 600.
+    
+    k : :obj:`float`, optional
+        Solomon-Bloembergen constant in Å^6 s^-2.
+        Defaults to :const:`~K_NITROXIDE`.
+    
+    Returns
+    -------
+    :obj:`np.ndarray`, shape=distances.shape
+        The Γ2 rates in s^-1.
+    """
+    
+    distances = np.asarray(distances, dtype=float)
+    tc = np.asarray(tc, dtype=float)
+    
+    omega_h = 2 * np.pi * field * 1e6
+    spectral = 4 * tc + 3 * tc / (1 + (omega_h * tc) ** 2)
+    
+    with np.errstate(divide="ignore"):
+        gamma2 = k * spectral / distances ** 6
+    
+    return gamma2
+
+
+def calc_theo_pre(
+        distances,
+        *,
+        r2=10,
+        t=9e-3,
+        tc=5e-9,
+        field=600,
+        k=K_NITROXIDE,
+        ):
+    """
+    Calculates theoretical paramagnetic/diamagnetic intensity ratios.
+    
+    Parameters
+    ----------
+    distances : :obj:`np.ndarray`, shape=(series, residues)
+        Tag-amide distances in Å, see :func:`~calc_distances`.
+    
+    r2 : :obj:`float` or :obj:`np.ndarray`, optional
+        Transverse relaxation rate of the diamagnetic sample in s^-1,
+        broadcastable to distances, for example, one rate per residue.
+        Defaults to 10.
+    
+    t : :obj:`float`, optional
+        Total INEPT evolution time in seconds.
+        Defaults to 9e-3.
+    
+    tc, field, k
+        See :func:`~calc_gamma2`.
+    
+    Returns
+    -------
+    :obj:`np.ndarray`, shape=(series, residues)
+        The theoretical intensity ratios, as the ``theo_pre`` argument
+        of the Bar Plot templates.
+    
+    Raises
+    ------
+    TypeError
+        If distances is not np.ndarray.
+    """
+    
+    if not(isinstance(distances, np.ndarray)):
+        raise TypeError("distances should be an ARRAY")
+    
+    gamma2 = calc_gamma2(distances, tc=tc, field=field, k=k)
+    r2 = np.asarray(r2, dtype=float)
+    
+    # Γ2 is inf at zero distance, where the ratio is zero
+    theo_pre = r2 * np.exp(-gamma2 * t) / (r2 + gamma2)
+    
+    log.debug("Theoretical PRE shape: %s", theo_pre.shape)
+    
+    return theo_pre
+
+
+def calc_tag_position(
+        tag_index,
+        shape,
+        *,
+        tag_id="*",
+        ):
+    """
+    Generates the tag position array.
+    
+    Parameters
+    ----------
+    tag_index : :obj:`int` or sequence of :obj:`int`
+        The residue index of the tag, one for all series or one
+        for each series.
+    
+    shape : :obj:`tuple`
+        (series, residues)
+    
+    tag_id : :obj:`str`, optional
+        The tag identifier. Defaults to "*".
+    
+    Returns
+    -------
+    :obj:`np.ndarray`, dtype=str, shape=(series, residues)
+        Empty strings where the tag is not present and ``tag_id``
+        at the tag position, as the ``tag_position`` argument of the
+        Bar Plot templates.
+    """
+    
+    tag_position = np.full(shape, "", dtype=f"<U{len(tag_id)}")
+    
+    tag_index = np.broadcast_to(np.asarray(tag_index, dtype=int), shape[:1])
+    tag_position[np.arange(shape[0]), tag_index] = tag_id
+    
+    return tag_position
@@ -0,0 +1,274 @@
+r"""
+Strategies to calculate significance thresholds.
+
+Each strategy is a vectorized kernel that receives a 2-D array of
+shape (series, residues) and returns the threshold of each row,
+an array of shape (series,). All strategies operate on the absolute
+values and ignore NaN values row-wise.
+
+Strategies are registered by name in :const:`~strategies` and are
+selected with :func:`~calc_thresholds`. Plotting templates select the
+strategy with the ``threshold_strategy`` configuration key.
+
+Available strategies:
+
+* ``"std_of_population"``, mean plus ``std`` standard deviations of
+  the population with minimum values, see
+  :func:`FarseerNMR.calc.calc.threshold_std_of_population`.
+
+* ``"mad"``, median plus ``std`` scaled median absolute deviations:
+    
+    ``\tilde{x} + std \ast 1.4826 \ast MAD``
+
+* ``"sigma_clip"``, mean plus ``std`` standard deviations after
+  iterative sigma clipping of outliers.
+
+New strategies can be added with :func:`~register_strategy`.
+
+Thresholds are memoized by the content of ``values``
+(:mod:`FarseerNMR.calc.memoize`), plotting the same data set with
+several templates calculates its thresholds only once.
+"""
+# Copyright © 2017-2019 Farseer-NMR
+#
+# @Original Article: http://bit.ly/farseerjbnmr
+# @ResearchGate https://goo.gl/z8dPJU
+# @Twitter https://twitter.com/farseer_nmr
+# @GitHub: http://bit.ly/farseer-nmr
+# @Mailist: http://bit.ly/fs_maillist
+#
+# This file is part of the Farseer-NMR project.
+#
+# Farseer-NMR is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Farseer-NMR is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Farseer-NMR. If not, see <http://www.gnu.org/licenses/>.
+#
+# For full list of author contributors visit:
+#    https://github.com/Farseer-NMR/FarSeer-NMR/wiki/Citing
+#
+# Contributors to this file:
+#    - João M.C. Teixeira (https://github.com/joaomcteixeira)
+import warnings
+
+import numpy as np
+
+from FarseerNMR import logger
+from FarseerNMR.calc import calc
+from FarseerNMR.calc.memoize import memoize
+
+log = logger.get_log(__name__)
+
+strategies = {}
+"""
+Registered threshold strategies, name: kernel.
+"""
+
+
+def register_strategy(name):
+    """
+    Decorator that registers a threshold kernel in
+    :const:`~strategies`.
+    
+    The kernel receives a 2-D array of shape (series, residues) and
+    the standard deviation multiplier ``std`` as named argument,
+    and returns an array of shape (series,).
+    
+    Parameters
+    ----------
+    name : :obj:`str`
+        The name of the strategy.
+    """
+    
+    def decorator(func):
+        strategies[name] = func
+        # cached results may come from a previous kernel of same name
+        calc_thresholds.cache_clear()
+        return func
+    
+    return decorator
+
+
+def get_strategy(name):
+    """
+    Returns a registered threshold kernel.
+    
+    Raises
+    ------
+    ValueError
+        If strategy is not registered.
+    """
+    
+    try:
+        return strategies[name]
+    
+    except KeyError:
+        raise ValueError(
+            f"Threshold strategy '{name}' not available. "
+            f"Available strategies: {', '.join(strategies)}"
+            ) from None
+
+
+@memoize(maxsize=128)
+def calc_thresholds(
+        values,
+        strategy="std_of_population",
+        **kwargs,
+        ):
+    """
+    Calculates the threshold of each row according to a strategy.
+    
+    Results are memoized, see ``calc_thresholds.cache_info()``.
+    
+    Parameters
+    ----------
+    values : :obj:`np.ndarray`, dtype=float, n_dims=2
+        An array of shape (series, residues).
+    
+    strategy : :obj:`str`, optional
+        The name of the strategy, see :const:`~strategies`.
+        Defaults to "std_of_population".
+    
+    kwargs
+        Parameters of the strategy kernel, for example ``std``.
+    
+    Returns
+    -------
+    :obj:`np.ndarray`, dtype=float, shape=(series,)
+        The threshold of each row.
+    
+    Raises
+    ------
+    TypeError
+        If values is not np.ndarray type of ndim == 2.
+    
+    ValueError
+        If strategy is not registered.
+    """
+    
+    if not(isinstance(values, np.ndarray)):
+        raise TypeError("values should be an ARRAY")
+    
+    if not(values.ndim == 2):
+        raise TypeError("values should have two dimensions")
+    
+    kernel = get_strategy(strategy)
+    
+    thresholds = kernel(values, **kwargs)
+    
+    log.debug("%s thresholds: %s", strategy, logger.TruncatedRepr(thresholds))
+    
+    return thresholds
+
+
+@register_strategy("std_of_population")
+def std_of_population(values, *, std=5, population=0.1):
+    """
+    Mean plus ``std`` standard deviations of the ``population``
+    percentage of minimum values in each row.
+    
+    See :func:`FarseerNMR.calc.calc.batch_threshold_std_of_population`.
+    """
+    return calc.batch_threshold_std_of_population(
+        values,
+        std=std,
+        population=population,
+        )
+
+
+@register_strategy("mad")
+def median_absolute_deviation(values, *, std=5, scale=1.4826):
+    """
+    Median plus ``std`` scaled Median Absolute Deviations of each row.
+    
+    Parameters
+    ----------
+    scale : :obj:`float`, optional
+        The MAD scale factor. The default, 1.4826, makes the scaled
+        MAD a consistent estimator of the standard deviation of
+        normally distributed data.
+    """
+    
+    absvalues = np.absolute(values, dtype=float)
+    
+    # rows of NaN values have NaN threshold
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        
+        median = np.nanmedian(absvalues, axis=1)
+        
+        mad = np.nanmedian(
+            np.absolute(absvalues - median[:, np.newaxis]),
+            axis=1,
+            )
+    
+    return median + std * scale * mad
+
+
+@register_strategy("sigma_clip")
+def sigma_clip(values, *, std=5, clip=3, maxiters=10):
+    """
+    Mean plus ``std`` standard deviations of each row, after
+    iteratively removing values further than ``clip`` standard
+    deviations from the mean.
+    
+    All rows are clipped simultaneously, each iteration is a single
+    pass over the array. Iteration stops when no row changes or after
+    ``maxiters`` passes.
+    
+    Parameters
+    ----------
+    clip : :obj:`float`, optional
+        The clipping limit in standard deviations. Defaults to 3.
+    
+    maxiters : :obj:`int`, optional
+        Maximum number of clipping passes. Defaults to 10.
+    """
+    
+    absvalues = np.absolute(values, dtype=float)
+    mask = np.logical_not(np.isnan(absvalues))
+    
+    for iteration in range(maxiters + 1):
+        
+        mean, stdev = _masked_mean_std(absvalues, mask)
+        
+        if iteration == maxiters:
+            break
+        
+        with np.errstate(invalid="ignore"):
+            new_mask = mask & (
+                np.absolute(absvalues - mean[:, np.newaxis])
+                <= clip * stdev[:, np.newaxis]
+                )
+        
+        if np.array_equal(new_mask, mask):
+            break
+        
+        mask = new_mask
+    
+    log.debug("Sigma clipping passes: %s", iteration)
+    
+    return mean + std * stdev
+
+
+def _masked_mean_std(values, mask):
+    """
+    Row-wise mean and standard deviation of masked values.
+    """
+    
+    count = np.count_nonzero(mask, axis=1)
+    
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(mask, values, 0).sum(axis=1) / count
+        deviations = np.where(mask, values - mean[:, np.newaxis], 0)
+        stdev = np.sqrt((deviations ** 2).sum(axis=1) / count)
+    
+    return mean, stdev
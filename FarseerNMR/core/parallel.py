@@ -0,0 +1,181 @@
+"""
+Helpers to share data with worker processes.
+
+Arrays are placed in shared memory blocks, so that worker processes
+read them directly instead of receiving pickled copies. Only small
+specifications, ``(name, shape, dtype)``, travel to the workers.
+
+Example
+-------
+>>> with shared_arrays(values) as (spec,):
+...     with process_pool() as executor:
+...         executor.map(worker, [spec] * 10, range(10))
+
+where ``worker`` uses :func:`~attach_array` to access ``values``.
+
+Workers of :func:`~process_pool` log as the main process.
+"""
+# Copyright © 2017-2019 Farseer-NMR
+#
+# @Original Article: http://bit.ly/farseerjbnmr
+# @ResearchGate https://goo.gl/z8dPJU
+# @Twitter https://twitter.com/farseer_nmr
+# @GitHub: http://bit.ly/farseer-nmr
+# @Mailist: http://bit.ly/fs_maillist
+#
+# This file is part of the Farseer-NMR project.
+#
+# Farseer-NMR is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Farseer-NMR is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Farseer-NMR. If not, see <http://www.gnu.org/licenses/>.
+#
+# For full list of author contributors visit:
+#    https://github.com/Farseer-NMR/FarSeer-NMR/wiki/Citing
+#
+# Contributors to this file:
+#    - João M.C. Teixeira (https://github.com/joaomcteixeira)
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from FarseerNMR import logger
+
+log = logger.get_log(__name__)
+
+
+def process_pool(processes=None):
+    """
+    Creates a process pool whose workers follow the logging
+    configuration of the main process, see
+    :func:`FarseerNMR.logger.init_worker`.
+    
+    Parameters
+    ----------
+    processes : :obj:`int`, optional
+        Number of worker processes.
+        Defaults to None, the number of CPUs.
+    
+    Returns
+    -------
+    :obj:`concurrent.futures.ProcessPoolExecutor`
+    """
+    return ProcessPoolExecutor(
+        processes,
+        initializer=logger.init_worker,
+        initargs=(logger.worker_settings(),),
+        )
+
+
+def share_array(array):
+    """
+    Copies an array to a new shared memory block.
+    
+    The caller owns the block and must ``close()`` and ``unlink()``
+    it when done, see :func:`~shared_arrays`.
+    
+    Parameters
+    ----------
+    array : :obj:`np.ndarray`
+        Array of any fixed size dtype (not object).
+    
+    Returns
+    -------
+    tuple
+        The :obj:`multiprocessing.shared_memory.SharedMemory` block
+        and the array specification to be used in
+        :func:`~attach_array`.
+    
+    Raises
+    ------
+    TypeError
+        If array is of object dtype.
+    """
+    
+    if array.dtype.hasobject:
+        raise TypeError("arrays of object dtype can not be shared")
+    
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    
+    shared = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    shared[...] = array
+    del shared
+    
+    spec = (shm.name, array.shape, array.dtype.str)
+    log.debug("Shared array: %s", spec)
+    
+    return shm, spec
+
+
+def attach_array(spec):
+    """
+    Attaches to an array shared by :func:`~share_array`.
+    
+    The returned array must be deleted before closing the block.
+    
+    Parameters
+    ----------
+    spec : tuple
+        The array specification.
+    
+    Returns
+    -------
+    tuple
+        The :obj:`multiprocessing.shared_memory.SharedMemory` block
+        and the array.
+    """
+    
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    
+    return shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+@contextmanager
+def shared_arrays(*arrays):
+    """
+    Context manager that shares arrays for the duration of the context.
+    
+    Shared memory blocks are released on exit.
+    
+    Parameters
+    ----------
+    *arrays : :obj:`np.ndarray`
+        Arrays to share. None values are kept as None.
+    
+    Yields
+    ------
+    list
+        The specification of each array, for :func:`~attach_array`.
+    """
+    
+    blocks = []
+    specs = []
+    
+    try:
+        for array in arrays:
+            
+            if array is None:
+                specs.append(None)
+                continue
+            
+            shm, spec = share_array(array)
+            blocks.append(shm)
+            specs.append(spec)
+        
+        yield specs
+    
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
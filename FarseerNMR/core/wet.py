@@ -11,6 +11,19 @@ https://github.com/Farseer-NMR/FarSeer-NMR/wiki/WET-List
 The class :class:`~WetHandler` handles, configures and generates complete
 WET messages. But if you want a simplified used the :func:`~generate`
 straightforwardly.
+
+Known WETs are registered in :const:`~catalog` as machine-readable
+:obj:`WetRecord`, with :func:`~register_wet`, and rendered by their
+number with :func:`~render`:
+
+>>> log.info(wet.render(27))
+
+Rendered messages are cached, rendering the same WET again, with
+the same width and style, does not format the text again.
+
+Each generated WET is counted. The counts of the running process are
+reported by :func:`~counts` and :func:`~summary`, for example, to
+report WET frequencies in a batch of runs without parsing the logs.
 """
 # Copyright © 2017-2019 Farseer-NMR
 #
@@ -40,12 +53,90 @@ straightforwardly.
 #
 # Contributors to this file:
 #    - João M.C. Teixeira (https://github.com/joaomcteixeira)
+import functools
 import textwrap
+import threading
+from collections import Counter, namedtuple
 
 from FarseerNMR import logger
 
 log = logger.get_log(__name__)
 
+WetRecord = namedtuple("WetRecord", ["code", "severity", "message", "link"])
+
+catalog = {}
+"""
+Registered WETs, WET number: :obj:`WetRecord`.
+"""
+
+_counts = Counter()
+_counts_lock = threading.Lock()
+
+
+def register_wet(wetnum, severity, message):
+    """
+    Registers a WET in :const:`~catalog`.
+    
+    Parameters
+    ----------
+    wetnum : :obj:`int`
+        The num of the WET message in the WET list.
+    
+    severity : :obj:`str`
+        "WARNING", "ERROR" or "TROUBLESHOOTING".
+    
+    message : :obj:`str`
+        The WET message.
+    
+    Returns
+    -------
+    :obj:`WetRecord`
+        The registered record.
+    """
+    
+    if not(isinstance(wetnum, int)):
+        raise TypeError("wetnum MUST be integer type")
+    
+    record = WetRecord(
+        wetnum,
+        severity,
+        textwrap.dedent(message).strip(),
+        WetHandler.baselink + str(wetnum),
+        )
+    
+    catalog[wetnum] = record
+    
+    return record
+
+
+def render(wetnum, *, width=70, style="*"):
+    """
+    Returns the formatted WET message of a registered WET.
+    
+    Parameters
+    ----------
+    wetnum : :obj:`int`
+        The WET number, see :const:`~catalog`.
+    
+    width, style
+        See :class:`~WetHandler`.
+    
+    Raises
+    ------
+    KeyError
+        If WET is not registered.
+    """
+    
+    record = catalog[wetnum]
+    
+    return generate(
+        record.severity,
+        record.message,
+        wetnum,
+        width=width,
+        style=style,
+        )
+
 
 def generate(title, msg, wetnum, **kwargs):
     """
@@ -74,19 +165,77 @@ def generate(title, msg, wetnum, **kwargs):
         according to :meth:`WetHandler.gen_wet`.
     """
     
-    w = WetHandler(
-        title,
-        msg,
-        wetnum,
-        **kwargs
-        )
+    wet_message = _generate(title, msg, wetnum, **kwargs)
     
-    wet_message = w.gen_wet()
+    with _counts_lock:
+        _counts[wetnum] += 1
     
     assert isinstance(wet_message, str), "WET message NOT string"
     return wet_message
 
 
+@functools.lru_cache(maxsize=128)
+def _generate(title, msg, wetnum, **kwargs):
+    """
+    Cached generation of WET messages.
+    """
+    return WetHandler(title, msg, wetnum, **kwargs).gen_wet()
+
+
+def counts():
+    """
+    Returns the number of times each WET was generated in this
+    process.
+    
+    Returns
+    -------
+    :obj:`collections.Counter`
+        WET number: count.
+    """
+    
+    with _counts_lock:
+        return Counter(_counts)
+
+
+def reset_counts():
+    """
+    Resets the WET counts, for example, between runs of a batch.
+    """
+    
+    with _counts_lock:
+        _counts.clear()
+    
+    return
+
+
+def summary():
+    """
+    Summarizes the WETs generated in this process.
+    
+    Returns
+    -------
+    list of dict
+        One dict per WET, most frequent first, with keys "code",
+        "severity", "count" and "link". Severity is None for WETs
+        not registered in :const:`~catalog`.
+    """
+    
+    report = []
+    
+    for wetnum, count in counts().most_common():
+        
+        record = catalog.get(wetnum)
+        
+        report.append({
+            "code": wetnum,
+            "severity": record.severity if record else None,
+            "count": count,
+            "link": WetHandler.baselink + str(wetnum),
+            })
+    
+    return report
+
+
 class WetHandler():
     """
     Handles generation of WET messages.
@@ -243,6 +392,13 @@ class WetHandler():
         return wet
 
 
+register_wet(
+    27,
+    "ERROR",
+    "The input colour is not in HEX format.",
+    )
+
+
 if __name__ == "__main__":
     
     testmsg = generate(
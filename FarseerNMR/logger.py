@@ -6,6 +6,47 @@ with each run. *farseernmr.log* contains scientific information
 regarding the run, and *farseernmr.debug* contains information
 for developers. Also, you can send us *.debug* file if you wan to
 comunicate an issue with a run.
+
+Logging is configured only once, when the first message is emitted.
+To choose where messages go, call :func:`~configure` before running
+Farseer-NMR, for example:
+
+>>> from FarseerNMR import logger
+>>> logger.configure(sinks=("console",))  # no log files
+>>> logger.configure(sinks=())  # no output at all
+>>> logger.configure(log_dir="path/to/logs")
+>>> logger.configure(queue=True)  # non-blocking file writing
+
+Parallel runs should not share log files, each run, or each process,
+can write to its own folder:
+
+>>> logger.configure(log_dir="logs/{run}")  # one folder per run
+>>> logger.configure(log_dir="logs/{run}/{pid}")  # one per process
+
+and the logs of all processes of a run merged in timestamp order
+with :func:`~merge_logs`. The workers of the process pools of
+Farseer-NMR, :func:`FarseerNMR.core.parallel.process_pool`, follow
+the configuration of the main process, also when they are started by
+``spawn``, see :func:`~init_worker`.
+
+If :func:`~configure` is not called, the ``FARSEERNMR_LOG_DIR`` and
+``FARSEERNMR_LOG_SINKS`` environment variables, if defined, set the
+log folder and the comma separated sinks of the first emission.
+
+Log messages are formatted only if some sink records them. Use
+%-style arguments instead of f-strings, and :class:`~TruncatedRepr`
+for arrays, so that disabled debug messages cost nothing:
+
+>>> log.debug("ydata: %s", logger.TruncatedRepr(ydata))
+
+The opt-in "trace" sink writes the timings of each stage of the
+plotting templates, one JSON record per line, to
+*farseernmr.trace.jsonl*:
+
+>>> logger.configure(sinks=("console", "files", "trace"))
+
+see :class:`~Trace`. The traces of a batch of runs are aggregated
+with :func:`~summarize_trace`.
 """
 # Copyright © 2017-2019 Farseer-NMR
 #
@@ -36,8 +77,21 @@ comunicate an issue with a run.
 # Contributors to this file:
 #    - João M.C. Teixeira (https://github.com/joaomcteixeira)
 
+import atexit
+import contextlib
+import copy
+import glob
+import heapq
+import json
 import logging
 import logging.config
+import logging.handlers
+import os
+import queue as queue_
+import re
+import reprlib
+import threading
+import time
 
 log_config = {
     "version": 1,
@@ -46,13 +100,16 @@ log_config = {
     "formatters": {
         "debug_format": {
             "format": (
+                "%(asctime)s - %(process)d - "
                 "%(levelname)s - "
                 "%(name)s:%(funcName)s:%(lineno)d - "
                 "%(message)s"
                 )
             },
         "info_format": {
-            "format": "%(message)s"}
+            "format": "%(message)s"},
+        "trace_format": {
+            "()": "FarseerNMR.logger.JSONLinesFormatter"}
         },
     
     "handlers": {
@@ -70,7 +127,8 @@ log_config = {
             "filename": "farseernmr.log",
             "maxBytes": 10485760,
             "backupCount": 20,
-            "encoding": "utf8"
+            "encoding": "utf8",
+            "delay": True
             },
         
         "debug_file_handler": {
@@ -80,7 +138,17 @@ log_config = {
             "filename": "farseernmr.debug",
             "maxBytes": 10485760,
             "backupCount": 20,
-            "encoding": "utf8"
+            "encoding": "utf8",
+            "delay": True
+            },
+        
+        "trace_file_handler": {
+            "class": "logging.FileHandler",
+            "level": "INFO",
+            "formatter": "trace_format",
+            "filename": "farseernmr.trace.jsonl",
+            "encoding": "utf8",
+            "delay": True
             }
         },
     
@@ -96,10 +164,776 @@ Logging configuration dictionary.
 """
 
 
+log_sinks = {
+    "console": ["console"],
+    "files": ["info_file_handler", "debug_file_handler"],
+    "trace": ["trace_file_handler"],
+    }
+"""
+Available logging sinks and their handlers in :const:`~log_config`.
+"""
+
+_package = "FarseerNMR"
+_trace = "FarseerNMR.trace"
+_trace_sink = "trace"
+_configured = False
+_lock = threading.Lock()
+_listeners = []
+_fork_handlers = ()
+_settings = None
+_env_log_dir = "FARSEERNMR_LOG_DIR"
+_env_sinks = "FARSEERNMR_LOG_SINKS"
+_timestamp = re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3} ")
+
+
+class _BootstrapHandler(logging.Handler):
+    """
+    Configures logging with the default settings when the first
+    message is emitted, if :func:`~configure` was not called before.
+    
+    The defaults are overridden by the ``FARSEERNMR_LOG_DIR`` and
+    ``FARSEERNMR_LOG_SINKS`` environment variables.
+    """
+    
+    def emit(self, record):
+        
+        if not(_configured):
+            
+            sinks = os.environ.get(_env_sinks)
+            
+            configure(
+                sinks=("console", "files") if sinks is None
+                else [s for s in sinks.split(",") if s],
+                log_dir=os.environ.get(_env_log_dir),
+                )
+        
+        return
+
+
+def configure(
+        sinks=("console", "files"),
+        *,
+        log_dir=None,
+        level=None,
+        queue=False,
+        ):
+    """
+    Configures Farseer-NMR logging.
+    
+    If not called explicitly, is called with the default arguments
+    when the first message is emitted. Calling it again
+    reconfigures logging.
+    
+    Parameters
+    ----------
+    sinks : iterable of str, optional
+        Where messages are sent, any combination of "console",
+        "files" and "trace", see :const:`~log_sinks`. An empty
+        iterable or None disables Farseer-NMR logging output.
+        The "trace" sink receives only the stage timings of
+        :class:`~Trace`.
+        Defaults to ("console", "files").
+    
+    log_dir : str, optional
+        The folder where log files are written, created if needed.
+        May contain the fields ``{run}``, replaced by an identifier
+        unique to this call, and ``{pid}``, replaced by the id of each
+        process: child processes write to their own folder.
+        Defaults to None, the current working directory.
+    
+    level : str, optional
+        The level of Farseer-NMR loggers. Messages of lower levels are
+        discarded before being created or formatted.
+        Defaults to None, the lowest level of the selected sinks, or
+        "WARNING" if there are no sinks. For example, debug messages
+        are discarded if the files sink is not selected.
+    
+    queue : bool, optional
+        If True, records are put in in-memory queues and written
+        by background threads that own the sinks handlers, one for
+        the trace sink and one for the others.
+        The emitting threads never wait for disk writing or log file
+        rollover. The queue is flushed by :func:`~shutdown`, which
+        runs at exit.
+        Defaults to False.
+    
+    Raises
+    ------
+    ValueError
+        If a sink is not available.
+    """
+    
+    global _configured, _settings
+    
+    sinks = list(sinks or [])
+    
+    for sink in sinks:
+        if sink not in log_sinks:
+            raise ValueError(
+                f"Logging sink '{sink}' not available. "
+                f"Available sinks: {', '.join(log_sinks)}"
+                )
+    
+    if log_dir is not None:
+        log_dir = log_dir.replace("{run}", _run_id())
+    
+    with _lock:
+        
+        for handler in _stop_listeners():
+            handler.close()
+        
+        _settings = {
+            "sinks": sinks,
+            "log_dir": log_dir,
+            "level": level,
+            "queue": queue,
+            }
+        
+        config = copy.deepcopy(log_config)
+        handlers = [h for sink in sinks for h in log_sinks[sink]]
+        
+        for name in handlers:
+            
+            handler = config["handlers"][name]
+            
+            if "filename" in handler and log_dir is not None:
+                folder = log_dir.replace("{pid}", str(os.getpid()))
+                os.makedirs(folder, exist_ok=True)
+                handler["filename"] = os.path.join(
+                    folder,
+                    handler["filename"],
+                    )
+        
+        config["handlers"] = {
+            name: config["handlers"][name] for name in handlers
+            }
+        
+        # trace records go only to the trace sink
+        if _trace_sink in sinks:
+            config["loggers"][_trace] = {
+                "level": "INFO",
+                "handlers": log_sinks[_trace_sink],
+                "propagate": False,
+                }
+            handlers = [
+                h for h in handlers
+                if h not in log_sinks[_trace_sink]
+                ]
+        
+        config["root"]["handlers"] = handlers
+        
+        # without handlers, warnings would reach logging.lastResort
+        if not(handlers):
+            config["handlers"]["null"] = {"class": "logging.NullHandler"}
+            config["root"]["handlers"] = ["null"]
+        
+        # replaces, and closes, the handlers of previous calls
+        logging.config.dictConfig(config)
+        
+        if queue and handlers:
+            _start_listener(logging.getLogger())
+        
+        if queue and _trace_sink in sinks:
+            _start_listener(_trace_log)
+        
+        if _trace_sink not in sinks:
+            _disable_trace()
+        
+        if level is None and handlers:
+            level = min(
+                logging.getLevelName(config["handlers"][h]["level"])
+                for h in handlers
+                )
+        
+        elif level is None:
+            level = logging.WARNING
+        
+        package_log = logging.getLogger(_package)
+        package_log.setLevel(level)
+        
+        # a new list so that loggers iterating handlers are not affected
+        package_log.handlers = [
+            h for h in package_log.handlers
+            if not(isinstance(h, _BootstrapHandler))
+            ]
+        
+        _configured = True
+    
+    return
+
+
+def shutdown():
+    """
+    Stops the queue listeners, if any, after writing all queued records.
+    
+    Handlers are closed and Farseer-NMR stops logging to the
+    sinks until :func:`~configure` is called again.
+    Registered to run at exit.
+    """
+    
+    with _lock:
+        handlers = _stop_listeners()
+    
+    for handler in handlers:
+        handler.close()
+    
+    return
+
+
+def worker_settings():
+    """
+    Returns the logging settings for worker processes, those of the
+    last :func:`~configure` call, see :func:`~init_worker`.
+    
+    Returns
+    -------
+    dict or None
+        None if logging is not configured.
+    """
+    
+    if _settings is None:
+        return None
+    
+    # workers exit without running atexit, the queue would be lost
+    return {**_settings, "queue": False}
+
+
+def init_worker(settings=None):
+    """
+    Configures logging in a worker process.
+    
+    Use as initializer of process pools, with the settings of the
+    main process, see :func:`FarseerNMR.core.parallel.process_pool`:
+    
+    >>> ProcessPoolExecutor(
+    ...     initializer=logger.init_worker,
+    ...     initargs=(logger.worker_settings(),),
+    ...     )
+    
+    A ``{pid}`` field in the log folder is replaced by the id of the
+    worker.
+    
+    Parameters
+    ----------
+    settings : dict, optional
+        Given by :func:`~worker_settings`.
+        Defaults to None, logging is configured on first emission.
+    """
+    
+    if settings is not None:
+        configure(**settings)
+    
+    return
+
+
+def _start_listener(logger):
+    """
+    Moves the handlers of a logger to a queue listener thread.
+    """
+    
+    handlers = list(logger.handlers)
+    
+    for handler in handlers:
+        logger.removeHandler(handler)
+    
+    records = queue_.SimpleQueue()
+    
+    queue_handler = logging.handlers.QueueHandler(records)
+    queue_handler.setLevel(min(h.level for h in handlers))
+    logger.addHandler(queue_handler)
+    
+    listener = logging.handlers.QueueListener(
+        records,
+        *handlers,
+        respect_handler_level=True,
+        )
+    listener.start()
+    
+    _listeners.append((logger, queue_handler, listener))
+    
+    return
+
+
+def _stop_listeners():
+    """
+    Stops the queue listeners, writing all queued records.
+    
+    Returns
+    -------
+    list
+        The handlers of the listeners.
+    """
+    
+    global _listeners
+    
+    handlers = []
+    
+    for logger, queue_handler, listener in _listeners:
+        listener.stop()
+        logger.removeHandler(queue_handler)
+        handlers.extend(listener.handlers)
+    
+    _listeners = []
+    
+    return handlers
+
+
+def _before_fork():
+    """
+    Waits until the listener threads finish writing the current
+    records, so that the child does not inherit half written file
+    streams. Nothing is done if records are not queued.
+    """
+    
+    global _fork_handlers
+    
+    _fork_handlers = [
+        handler
+        for _, _, listener in _listeners
+        for handler in listener.handlers
+        ]
+    
+    for handler in _fork_handlers:
+        handler.acquire()
+    
+    return
+
+
+def _after_fork_in_parent():
+    
+    global _fork_handlers
+    
+    for handler in _fork_handlers:
+        handler.release()
+    
+    _fork_handlers = ()
+    
+    return
+
+
+def _after_fork_in_child():
+    """
+    Child processes have no listener threads, handlers are attached
+    back to their loggers and records are written directly.
+    
+    Handler locks are reset by :mod:`logging`. Logging is not
+    reconfigured, worker processes configure their own log folder
+    with :func:`~init_worker`.
+    """
+    
+    global _listeners, _lock, _fork_handlers
+    
+    # the lock may have been held by another thread of the parent
+    _lock = threading.Lock()
+    _fork_handlers = ()
+    
+    for logger, queue_handler, listener in _listeners:
+        
+        logger.removeHandler(queue_handler)
+        
+        for handler in listener.handlers:
+            logger.addHandler(handler)
+    
+    _listeners = []
+    
+    return
+
+
+def merge_logs(
+        log_dir,
+        filename="farseernmr.debug",
+        output=None,
+        ):
+    """
+    Merges the log files of several processes in timestamp order.
+    
+    Searches ``log_dir`` and its subfolders for ``filename`` and its
+    rotated backups, for example, the files written by each process
+    when logging is configured with ``log_dir="logs/{run}/{pid}"``.
+    
+    Multi-line messages are kept together. Messages with the same
+    timestamp keep the order of the files.
+    
+    Parameters
+    ----------
+    log_dir : str
+        The folder of the run.
+    
+    filename : str, optional
+        The log file name. Defaults to "farseernmr.debug".
+    
+    output : str, optional
+        The merged file path.
+        Defaults to None, ``merged_<filename>`` in ``log_dir``.
+    
+    Returns
+    -------
+    str
+        The merged file path.
+    """
+    
+    if output is None:
+        output = os.path.join(log_dir, f"merged_{filename}")
+    
+    paths = sorted(
+        p for p in glob.glob(
+            os.path.join(glob.escape(log_dir), "**", f"{filename}*"),
+            recursive=True,
+            )
+        if os.path.abspath(p) != os.path.abspath(output)
+        )
+    
+    with open(output, "w", encoding="utf8") as fout:
+        for _, record in heapq.merge(
+                *(_read_records(p) for p in paths),
+                key=lambda r: r[0],
+                ):
+            fout.write(record)
+    
+    return output
+
+
+def _read_records(path):
+    """
+    Yields (timestamp, record) from a log file.
+    
+    Lines without timestamp belong to the previous record.
+    """
+    
+    with open(path, encoding="utf8") as fin:
+        
+        stamp = ""
+        lines = []
+        
+        for line in fin:
+            
+            if _timestamp.match(line):
+                
+                if lines:
+                    yield stamp, "".join(lines)
+                    lines = []
+                
+                stamp = line[:23]
+            
+            lines.append(line)
+        
+        if lines:
+            yield stamp, "".join(lines)
+    
+    return
+
+
+def _run_id():
+    """
+    Identifier of a run, time and process id.
+    """
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+
+
+class TruncatedRepr():
+    """
+    Defers and truncates the string representation of an object.
+    
+    Use it as argument of log messages, the object is converted to
+    string only if the message is emitted. Long arrays and
+    containers are abbreviated.
+    
+    Parameters
+    ----------
+    obj : object
+        The object to represent, usually a :obj:`np.ndarray`.
+    
+    max_items : int, optional
+        Maximum number of items represented.
+        Defaults to 6.
+    """
+    
+    __slots__ = ("obj", "max_items")
+    
+    def __init__(self, obj, max_items=6):
+        self.obj = obj
+        self.max_items = max_items
+    
+    def __str__(self):
+        
+        obj = self.obj
+        
+        # numpy arrays, numpy is not imported if not needed
+        if hasattr(obj, "shape") and hasattr(obj, "dtype"):
+            
+            import numpy as np
+            
+            array = np.array2string(
+                np.asarray(obj),
+                threshold=self.max_items,
+                edgeitems=max(1, self.max_items // 2),
+                )
+            
+            return f"{array} shape={obj.shape} dtype={obj.dtype}"
+        
+        r = reprlib.Repr()
+        r.maxlist = r.maxtuple = r.maxdict = r.maxset = self.max_items
+        r.maxstring = r.maxother = 80
+        
+        return r.repr(obj)
+    
+    __repr__ = __str__
+
+
+class JSONLinesFormatter(logging.Formatter):
+    """
+    Formats the ``trace`` attribute of records as a JSON line.
+    """
+    
+    def format(self, record):
+        
+        return json.dumps({
+            "time": record.created,
+            "pid": record.process,
+            **getattr(record, "trace", {"message": record.getMessage()}),
+            })
+
+
+class Trace():
+    """
+    Traces the wall and CPU time of the stages of a plotting run.
+    
+    Records are sent to the "trace" sink, see :func:`~configure`.
+    If the sink is not selected, stages are not timed.
+    
+    Parameters
+    ----------
+    template : str
+        The name of the template, usually the module ``__name__``.
+    
+    fields
+        Fields written in every record of the run, for example,
+        array shapes. Must be JSON serializable.
+    
+    Example
+    -------
+    >>> trace = logger.Trace(__name__, shapes={"values": values.shape})
+    >>> with trace.stage("draw_figure"):
+    ...     figure, axs = plottingbase.draw_figure(...)
+    >>> for i in range(num_subplots):
+    ...     with trace.stage("subplot", subplot=i):
+    ...         _subplot(...)
+    >>> trace.update(path=config["figure_path"])
+    >>> trace.finish()
+    """
+    
+    __slots__ = ("template", "fields", "enabled", "_wall", "_cpu")
+    
+    def __init__(self, template, **fields):
+        
+        self.template = template
+        self.fields = fields
+        self.enabled = _trace_log.isEnabledFor(logging.INFO)
+        
+        if self.enabled:
+            self._wall = time.perf_counter()
+            self._cpu = time.process_time()
+        
+        return
+    
+    def update(self, **fields):
+        """
+        Adds fields to the next records of the run.
+        """
+        
+        self.fields.update(fields)
+        
+        return
+    
+    @contextlib.contextmanager
+    def stage(self, name, **fields):
+        """
+        Context manager that writes a record with the time spent
+        in its block.
+        
+        Parameters
+        ----------
+        name : str
+            The name of the stage.
+        
+        fields
+            Fields written only in this record, for example, the
+            subplot index.
+        """
+        
+        if not(self.enabled):
+            yield
+            return
+        
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        
+        yield
+        
+        self._emit(
+            name,
+            time.perf_counter() - wall,
+            time.process_time() - cpu,
+            fields,
+            )
+        
+        return
+    
+    def finish(self):
+        """
+        Writes the record of the complete run, stage "total".
+        """
+        
+        if self.enabled:
+            self._emit(
+                "total",
+                time.perf_counter() - self._wall,
+                time.process_time() - self._cpu,
+                {},
+                )
+        
+        return
+    
+    def _emit(self, name, wall, cpu, fields):
+        
+        _trace_log.info(
+            name,
+            extra={"trace": {
+                "template": self.template,
+                "stage": name,
+                "wall": wall,
+                "cpu": cpu,
+                **self.fields,
+                **fields,
+                }},
+            )
+        
+        return
+
+
+def summarize_trace(
+        log_dir,
+        filename="farseernmr.trace.jsonl",
+        percentiles=(50, 95),
+        ):
+    """
+    Aggregates the stage timings of trace files.
+    
+    Searches ``log_dir`` and its subfolders for ``filename``, as
+    :func:`~merge_logs`, so the traces of all processes of a batch
+    are aggregated together.
+    
+    Parameters
+    ----------
+    log_dir : str
+        The folder of the batch.
+    
+    filename : str, optional
+        The trace file name. Defaults to "farseernmr.trace.jsonl".
+    
+    percentiles : tuple of float, optional
+        The percentiles calculated. Defaults to (50, 95).
+    
+    Returns
+    -------
+    dict
+        {template: {stage: summary}}, where summary is a dict with
+        the number of records, "count", and the wall and CPU times
+        percentiles in seconds, for example, "wall_p50", "cpu_p95".
+    """
+    
+    timings = {}
+    
+    paths = sorted(glob.glob(
+        os.path.join(glob.escape(log_dir), "**", filename),
+        recursive=True,
+        ))
+    
+    for path in paths:
+        with open(path, encoding="utf8") as fin:
+            for line in fin:
+                
+                record = json.loads(line)
+                
+                stage = timings.setdefault(
+                    record["template"], {}).setdefault(
+                    record["stage"], {"wall": [], "cpu": []})
+                
+                stage["wall"].append(record["wall"])
+                stage["cpu"].append(record["cpu"])
+    
+    summary = {}
+    
+    for template, stages in timings.items():
+        for name, times in stages.items():
+            
+            stage = summary.setdefault(template, {})[name] = {
+                "count": len(times["wall"]),
+                }
+            
+            for kind in ("wall", "cpu"):
+                values = sorted(times[kind])
+                for q in percentiles:
+                    stage[f"{kind}_p{q:g}"] = _percentile(values, q)
+    
+    return summary
+
+
+def _percentile(values, q):
+    """
+    Percentile of sorted values with linear interpolation,
+    as :func:`numpy.percentile`.
+    """
+    
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def _disable_trace():
+    """
+    Trace records are discarded before being created.
+    """
+    
+    _trace_log.handlers = []
+    _trace_log.propagate = False
+    _trace_log.setLevel(logging.CRITICAL + 1)
+    
+    return
+
+
 def get_log(name):
     """
-    Returns logger according to :const:`~log_config`.
+    Returns logger.
+    
+    Logging is configured by :func:`~configure` on the first
+    emitted message.
     """
-    # logging.addLevelName(15, "DEBUG")
-    logging.config.dictConfig(log_config)
     return logging.getLogger(name)
+
+
+def _install_bootstrap():
+    """
+    Installs the handler that configures logging on first emission.
+    """
+    
+    package_log = logging.getLogger(_package)
+    
+    # messages must reach the handler to trigger configuration
+    package_log.setLevel(logging.DEBUG)
+    package_log.addHandler(_BootstrapHandler())
+    
+    return
+
+
+_trace_log = logging.getLogger(_trace)
+_disable_trace()
+_install_bootstrap()
+atexit.register(shutdown)
+os.register_at_fork(
+    before=_before_fork,
+    after_in_parent=_after_fork_in_parent,
+    after_in_child=_after_fork_in_child,
+    )
@@ -27,16 +27,15 @@ to tweak the plotting style and details - see :func:`~get_config`.
 import numpy as np
 import json
 
-from matplotlib import pyplot as plt
-
 from FarseerNMR import logger
 from FarseerNMR.plot.base import (
     plottingbase,
     experimentplotbase,
     barplotbase,
     plotvalidators,
+    plotconfig,
+    renderplan,
     )
-from FarseerNMR.plot.examples import barplotxmpls
 
 log = logger.get_log(__name__)
 
@@ -97,6 +96,7 @@ _default_config = {
     "bar_alpha": 1,
     "bar_linewidth": 0,
     
+    "mark_batched_flag": True,
     "mark_fontsize": 4,
     "mark_prolines_flag": False,
     "mark_prolines_symbol": "P",
@@ -114,6 +114,7 @@ _default_config = {
         },
     
     "threshold_flag": True,
+    "threshold_strategy": "std_of_population",
     "threshold_color": "red",
     "threshold_linewidth": 0.5,
     "threshold_alpha": 0.8,
@@ -134,6 +135,8 @@ _default_config = {
     "figure_header": "No header provided",
     "header_fontsize": 5,
     
+    "paginate_flag": False,
+    "render_processes": 1,
     "figure_path": "bar_compacted.pdf",
     "figure_dpi": 300,
     "fig_height": 11.69,
@@ -141,6 +144,22 @@ _default_config = {
 
     }
 
+_config_schema = plotvalidators.ConfigSchema(
+    _default_config,
+    name="Compacted Bar Plot",
+    )
+
+Config = plotconfig.make_config_class(
+    "Config",
+    _default_config,
+    _config_schema,
+    __name__,
+    )
+"""
+Immutable and hashable configuration of the template,
+see :mod:`FarseerNMR.plot.base.plotconfig`.
+"""
+
 
 def get_config():
     """
@@ -183,6 +202,9 @@ def plot(
         details=None,
         tag_position=None,
         theo_pre=None,
+        config=None,
+        pool=None,
+        cache=None,
         **kwargs,
         ):
     """
@@ -231,6 +253,25 @@ def plot(
         If None provided, Tag tick is not drawn.
         Defaults to None.
     
+    config : :obj:`Config`, optional
+        An immutable configuration of the template, validated when
+        created, which is not merged nor validated again. ``kwargs``,
+        if given, replace its values.
+        Defaults to None, the default configuration updated with
+        ``kwargs``.
+    
+    pool : :obj:`FarseerNMR.plot.base.figurepool.FigurePool`, optional
+        A pool of figures, reused by plots of the same layout,
+        see :mod:`FarseerNMR.plot.base.figurepool`.
+        Defaults to None, figures are drawn and closed.
+    
+    cache : :obj:`FarseerNMR.plot.base.outputcache.OutputCache`, optional
+        A cache of output files. If it holds the files of a plot of
+        the same data and configuration, they are written to the
+        output path and the plot is not rendered,
+        see :mod:`FarseerNMR.plot.base.outputcache`.
+        Defaults to None, the plot is always rendered.
+    
     **kwargs :
         Plot details (colors, shapes, fonts, ...) can be highly
         configured through additional named parameters.
@@ -263,131 +304,362 @@ def plot(
     if suptitles is None:
         suptitles = [str(i) for i in range(values.shape[0])]
     
-    plotvalidators.validate_barplot_params(
-        values,
-        labels,
-        header,
-        suptitles,
-        letter_code,
-        peak_status,
-        details,
-        tag_position,
-        theo_pre,
-        )
-    
-    # assigned and validates config
-    config = {**_default_config, **kwargs}
-    
-    plotvalidators.validate_config(
-        _default_config,
-        config,
-        name="Compacted Bar Plot",
-        )
+    trace = logger.Trace(__name__, shapes={"values": values.shape})
     
-    """Runs all operations to plot."""
-    num_subplots = experimentplotbase.calc_num_subplots(values)
+    with trace.stage("validation"):
+        
+        plotvalidators.validate_barplot_params(
+            values,
+            labels,
+            header,
+            suptitles,
+            letter_code,
+            peak_status,
+            details,
+            tag_position,
+            theo_pre,
+            )
+        
+        config = _resolve_config(config, kwargs)
     
-    figure, axs = plottingbase.draw_figure(
-        num_subplots,
-        config["rows_page"],
-        config["cols_page"],
-        config["fig_height"],
-        config["fig_width"],
-        )
+    trace.update(path=config["figure_path"])
     
-    for i in range(values.shape[0]):
+    if cache is not None:
+        
+        with trace.stage("cache"):
+            cache_key = cache.key(
+                __name__,
+                config,
+                values=values,
+                labels=labels,
+                header=header,
+                suptitles=suptitles,
+                letter_code=letter_code,
+                peak_status=peak_status,
+                details=details,
+                tag_position=tag_position,
+                theo_pre=theo_pre,
+                )
+            cached = cache.fetch(cache_key, config)
         
-        log.debug("Starting subplot no: {}".format(i))
-        # other parameters are not passed because they are None by default
-        # and may lead to IndexError
-        _subplot(
-            axs[i],
-            values[i],
+        if cached is not None:
+            trace.finish()
+            return
+    
+    """Runs all operations to plot."""
+    # all subplots are computed at once, pages only draw the plan
+    with trace.stage("plan"):
+        render_plan = _calc_plan(
+            values,
             labels,
-            i,
-            config,
             suptitles,
             letter_code,
             peak_status,
             details,
             tag_position,
             theo_pre,
+            config,
             )
     
-    plottingbase.adjust_subplots(
-        figure,
-        config["hspace"],
-        config["wspace"],
-        )
+    if config["paginate_flag"]:
+        pages = plottingbase.calc_pages(
+            len(render_plan),
+            config["rows_page"],
+            config["cols_page"],
+            )
     
-    plottingbase.clean_subplots(axs, num_subplots)
+    else:
+        pages = [range(len(render_plan))]
     
-    plottingbase.save_figure(
-        figure,
+    writer = plottingbase.PageWriter(
         config["figure_path"],
-        header=header,
-        header_fs=config["header_fontsize"],
-        dpi=config["figure_dpi"],
+        paginate=config["paginate_flag"],
         )
     
-    plt.close(figure)
+    with writer:
+        plottingbase.render_pages(
+            _draw_page,
+            pages,
+            writer,
+            render_plan,
+            trace=trace,
+            processes=config["render_processes"],
+            pool=pool,
+            header=header,
+            header_fs=config["header_fontsize"],
+            dpi=config["figure_dpi"],
+            config=config,
+            )
+    
+    if cache is not None:
+        cache.store(cache_key, writer.paths)
+    
+    trace.finish()
     
     return
 
 
-def _subplot(
-        ax,
+def calc_plan(
+        values,
+        labels,
+        suptitles=None,
+        letter_code=None,
+        peak_status=None,
+        details=None,
+        tag_position=None,
+        theo_pre=None,
+        config=None,
+        **kwargs,
+        ):
+    """
+    Computes the render plan of :func:`~plot` without drawing,
+    see :mod:`FarseerNMR.plot.base.renderplan`.
+    
+    Parameters
+    ----------
+    See :func:`~plot`.
+    
+    Returns
+    -------
+    :obj:`FarseerNMR.plot.base.renderplan.RenderPlan`
+        Figure elements: ``xticks``, ``xticks_labels`` and
+        ``proline_marks``.
+        Subplot elements: ``titles``, ``ydata``, ``facecolors``,
+        ``edgecolors``, ``linewidths``, ``thresholds``,
+        ``detail_marks``, ``theo_pre`` and ``tag_index``.
+    """
+    
+    if suptitles is None:
+        suptitles = [str(i) for i in range(values.shape[0])]
+    
+    plotvalidators.validate_barplot_params(
+        values,
+        labels,
+        "",
+        suptitles,
+        letter_code,
+        peak_status,
+        details,
+        tag_position,
+        theo_pre,
+        )
+    
+    return _calc_plan(
         values,
         labels,
-        i,
-        c,
         suptitles,
         letter_code,
         peak_status,
         details,
         tag_position,
         theo_pre,
+        _resolve_config(config, kwargs),
+        )
+
+
+def _resolve_config(config, kwargs):
+    """
+    Returns the configuration of a plot, validated.
+    """
+    
+    if config is None:
+        
+        _config_schema.validate(kwargs)
+        
+        # assigned config
+        return {**_default_config, **kwargs}
+    
+    if not(isinstance(config, Config)):
+        raise TypeError("config should be a Config instance")
+    
+    if kwargs:
+        return config.replace(**kwargs)
+    
+    return config
+
+
+def _calc_plan(
+        values,
+        labels,
+        suptitles,
+        letter_code,
+        peak_status,
+        details,
+        tag_position,
+        theo_pre,
+        c,
+        ):
+    """
+    Computes the elements of all the subplots at once.
+    """
+    
+    num_subplots = experimentplotbase.calc_num_subplots(values)
+    
+    ydata = np.nan_to_num(values).astype(float)
+    log.debug("ydata: %s", logger.TruncatedRepr(ydata))
+    
+    # ticks are the same in all subplots
+    xticks, xticks_labels = barplotbase.compacted_bar_xticks(
+        ydata.shape[1],
+        labels,
+        )
+    
+    facecolors, edgecolors, linewidths = barplotbase.bar_style(
+        ydata.shape,
+        c,
+        peak_status=peak_status,
+        details=details,
+        default='black',
+        )
+    
+    if c["threshold_flag"]:
+        thresholds = barplotbase.calc_thresholds(
+            values,
+            strategy=c["threshold_strategy"],
+            )
+    
+    else:
+        thresholds = None
+    
+    if letter_code is not None and c["mark_prolines_flag"]:
+        proline_marks = experimentplotbase.calc_text_marks(
+            letter_code,
+            {'P': c["mark_prolines_symbol"]},
+            )
+    
+    else:
+        proline_marks = None
+    
+    if details is not None and c["mark_user_details_flag"]:
+        detail_marks = experimentplotbase.calc_text_marks(
+            details,
+            c["user_marks_dict"],
+            )
+    
+    else:
+        detail_marks = None
+    
+    if theo_pre is not None \
+            and tag_position is not None \
+            and c["plot_theoretical_pre"]:
+        
+        tag_index = experimentplotbase.find_paramagnetic_tags(
+            tag_position,
+            tag_id=c["tag_id"],
+            )
+    
+    else:
+        theo_pre = None
+        tag_index = None
+    
+    log.debug("Plan of %s subplots: OK", num_subplots)
+    
+    return renderplan.RenderPlan(
+        __name__,
+        figure={
+            "xticks": xticks,
+            "xticks_labels": xticks_labels,
+            "proline_marks": proline_marks,
+            },
+        subplots={
+            "titles": np.asarray(suptitles, dtype=str),
+            "ydata": ydata,
+            "facecolors": facecolors,
+            "edgecolors": edgecolors,
+            "linewidths": linewidths,
+            "thresholds": thresholds,
+            "detail_marks": detail_marks,
+            "theo_pre": theo_pre,
+            "tag_index": tag_index,
+            },
+        )
+
+
+def _draw_page(
+        subplots,
+        plan,
+        *,
+        page,
+        trace,
+        pool,
+        config,
         ):
-    """Subplot routine."""
+    """
+    Draws the figure of a page, see
+    :func:`FarseerNMR.plot.base.plottingbase.render_pages`.
+    """
+    
+    with trace.stage("draw_figure", page=page):
+        figure, axs = plottingbase.draw_figure(
+            len(subplots),
+            config["rows_page"],
+            config["cols_page"],
+            config["fig_height"],
+            config["fig_width"],
+            pool=pool,
+            key=config,
+            )
+    
+    for ax, i in zip(axs, subplots):
+        
+        log.debug("Starting subplot no: %s", i)
+        with trace.stage("subplot", subplot=i):
+            _subplot(ax, plan.figure, plan.subplot(i), config)
+    
+    with trace.stage("adjust_subplots", page=page):
+        plottingbase.adjust_subplots(
+            figure,
+            config["hspace"],
+            config["wspace"],
+            )
+    
+    plottingbase.clean_subplots(axs, len(subplots))
+    
+    return figure
+
+
+def _subplot(ax, figure, subplot, c):
+    """Draws a subplot of the plan."""
     
     ###################
     # configures vars
-    ydata = np.nan_to_num(values).astype(float)
-    log.debug("ydata: {}".format(ydata))
+    ydata = subplot["ydata"]
     num_of_bars = ydata.size
-    log.debug("Number of bars to represented: {}".format(num_of_bars))
-    log.debug("Suptitle: {}".format(suptitles[i]))
+    log.debug("Number of bars to represented: %s", num_of_bars)
+    log.debug("Suptitle: %s", subplot["titles"])
     
     ###################
     # Plots bars
+    
     bars = ax.bar(
         range(num_of_bars),
         ydata,
         width=c["bar_width"],
         align='center',
         alpha=c["bar_alpha"],
-        linewidth=c["bar_linewidth"],
-        color='black',
+        linewidth=subplot["linewidths"],
+        color=subplot["facecolors"],
+        edgecolor=subplot["edgecolors"],
         zorder=4,
         )
     
-    log.debug(f"Number of bars plotted: {len(bars)}")
+    log.debug("Number of bars plotted: %s", len(bars))
     log.debug(
-        "Number of expected bars equals num of bars: "
-        f"{num_of_bars == len(bars)}"
+        "Number of expected bars equals num of bars: %s",
+        num_of_bars == len(bars),
         )
     
     ###################
     # Set subplot title
     ax.set_title(
-        suptitles[i],
+        subplot["titles"],
         y=c["suptitle_pad"],
         fontsize=c["suptitle_fs"],
         fontname=c["suptitle_fn"],
         weight=c["suptitle_weight"],
         )
     
-    log.debug("Subplot title set to : {}".format(suptitles[i]))
+    log.debug("Subplot title set to : %s", subplot["titles"])
     
     ###################
     # Configures spines
@@ -398,18 +670,13 @@ def _subplot(
     ###################
     # Configures X ticks and X ticks labels
     
-    xticks, xticks_labels = barplotbase.compacted_bar_xticks(
-        num_of_bars,
-        labels,
-        )
-    
     # Set X ticks
-    ax.set_xticks(xticks)
+    ax.set_xticks(figure["xticks"])
     
     # Set X ticks labels
     # https://github.com/matplotlib/matplotlib/issues/6266
     ax.set_xticklabels(
-        xticks_labels,
+        figure["xticks_labels"],
         fontname=c["x_ticks_fn"],
         fontsize=c["x_ticks_fs"],
         fontweight=c["x_ticks_weight"],
@@ -443,7 +710,7 @@ def _subplot(
     ymin = c["y_lims"][0]
     ymax = c["y_lims"][1]
     ax.set_ylim(ymin, ymax)
-    log.debug("Set y max {} and ymin {}".format(ymin, ymax))
+    log.debug("Set y max %s and ymin %s", ymin, ymax)
     
     # sets number of y ticks
     ax.locator_params(axis='y', tight=True, nbins=c["y_ticks_nbins"])
@@ -484,19 +751,6 @@ def _subplot(
     
     ax.margins(x=0.01, tight=True)
     
-    # defines bars colors
-    if peak_status is not None:
-        experimentplotbase.set_item_colors(
-            bars,
-            peak_status[i],
-            {
-                'measured': c["measured_color"],
-                'missing': c["missing_color"],
-                'unassigned': c["unassigned_color"]
-                }
-            )
-        log.debug("set_item_colors: OK")
-    
     ###################
     # Additional representation features
     
@@ -512,11 +766,12 @@ def _subplot(
         log.debug("Configured grid: OK")
     
     # Adds red line to identify significant changes.
-    if c["threshold_flag"]:
+    if subplot["thresholds"] is not None:
         log.debug("... Starting threshold draw")
         barplotbase.plot_threshold(
             ax,
             ydata,
+            threshold=subplot["thresholds"],
             threshold_color=c["threshold_color"],
             threshold_linewidth=c["threshold_linewidth"],
             threshold_alpha=c["threshold_alpha"],
@@ -524,60 +779,46 @@ def _subplot(
             )
         log.debug("Threshold: OK")
     
-    if letter_code is not None and c["mark_prolines_flag"]:
+    if figure["proline_marks"] is not None:
         log.debug("... Starting Prolines Mark")
         experimentplotbase.text_marker(
             ax,
             range(num_of_bars),
             ydata,
-            letter_code,
-            {'P': c["mark_prolines_symbol"]},
+            figure["proline_marks"],
+            None,
             fs=c["mark_fontsize"],
+            batched=c["mark_batched_flag"],
             )
         log.debug("Prolines Marked: OK")
     
-    if details is not None and c["mark_user_details_flag"]:
+    if subplot["detail_marks"] is not None:
         log.debug("... Starting User Details Mark")
         experimentplotbase.text_marker(
             ax,
             range(num_of_bars),
             ydata,
-            details[i],
-            c["user_marks_dict"],
+            subplot["detail_marks"],
+            None,
             fs=c["mark_fontsize"],
+            batched=c["mark_batched_flag"],
             )
         log.debug("User marks: OK")
     
-    if details is not None and c["color_user_details_flag"]:
-        log.debug("... Starting User Colors Mark")
-        experimentplotbase.set_item_colors(
-            bars,
-            details[i],
-            c["user_bar_colors_dict"],
-            )
-        log.debug("Color user details: OK")
-           
-    if theo_pre is not None \
-            and tag_position is not None \
-            and c["plot_theoretical_pre"]:
+    if subplot["theo_pre"] is not None:
         
         experimentplotbase.plot_theo_pre(
             ax,
             range(num_of_bars),
-            theo_pre[i],
+            subplot["theo_pre"],
             theo_pre_color=c["theo_pre_color"],
             theo_pre_lw=c["theo_pre_lw"],
             )
         
-        tag_found = experimentplotbase.finds_paramagnetic_tag(
-            bars,
-            tag_position[i],
-            )
-        
-        if tag_found:
+        if subplot["tag_index"] >= 0:
             experimentplotbase.draw_paramagnetic_tag(
                 ax,
-                tag_found,
+                subplot["tag_index"],
                 ymax,
                 tag_cartoon_color=c["tag_cartoon_color"],
                 tag_cartoon_ls=c["tag_cartoon_ls"],
@@ -589,6 +830,8 @@ def _subplot(
 
 if __name__ == "__main__":
     
+    from FarseerNMR.plot.examples import barplotxmpls
+    
     name = "barplotcompacted"
     
     for example in barplotxmpls.list_of_examples:
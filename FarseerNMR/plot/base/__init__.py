@@ -1,4 +1,32 @@
 """
 This subpackage contains modules with functions that serve all or
 multiple plotting templates.
+
+Submodules are imported on first access, ``import FarseerNMR.plot.base`` does
+not import them:
+
+>>> from FarseerNMR.plot import base
+>>> base.plottingbase.calc_pages(12, 3, 2)
 """
+import importlib
+
+_submodules = frozenset((
+    "barplotbase",
+    "experimentplotbase",
+    "figurepool",
+    "outputcache",
+    "plotconfig",
+    "plottingbase",
+    "plotvalidators",
+    "renderplan",
+    ))
+
+
+def __getattr__(name):
+    if name in _submodules:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | _submodules)
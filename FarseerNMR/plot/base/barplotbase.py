@@ -32,15 +32,134 @@ This module contains functions that serve Bar Plot templates.
 import numpy as np
 
 from FarseerNMR import logger
-from FarseerNMR.calc import calc
+from FarseerNMR.calc import calc, threshold
+from FarseerNMR.plot.base import experimentplotbase
 
 log = logger.get_log(__name__)
 
 
+def calc_thresholds(values, std=5, strategy="std_of_population"):
+    """
+    Calculates the threshold of every subplot at once.
+    
+    NaN values are considered as zero, as they are represented
+    in the Bar Plots.
+    
+    Parameters
+    ----------
+    values : np.ndarray, shape=(y,x)
+        Values to evaluate, where each row (Y) is a subplot.
+    
+    std : int, optional
+        Standard deviation multiplier. Defaults to 5.
+    
+    strategy : str, optional
+        The threshold strategy, see :mod:`FarseerNMR.calc.threshold`.
+        Defaults to "std_of_population".
+    
+    Returns
+    -------
+    np.ndarray, shape=(y,)
+        The threshold of each subplot.
+    """
+    return threshold.calc_thresholds(
+        np.nan_to_num(values).astype(float),
+        strategy=strategy,
+        std=std,
+        )
+
+
+def bar_style(
+        num_of_bars,
+        c,
+        peak_status=None,
+        details=None,
+        default=None,
+        ):
+    """
+    Resolves the face colours, edge colours and line widths of the
+    bars of a subplot, or of all the subplots at once.
+    
+    Styles are resolved for all the bars at once, and given to
+    :meth:`matplotlib.axes.Axes.bar` when the bars are created,
+    the same as colouring each bar with
+    :func:`FarseerNMR.plot.base.experimentplotbase.set_item_colors`.
+    
+    Parameters
+    ----------
+    num_of_bars : int or tuple
+        The number of bars, or the shape (y, x) of the bars of all
+        the subplots.
+    
+    c : dict
+        The template configuration.
+    
+    peak_status : np.ndarray of shape <num_of_bars>, optional
+        Bars are coloured by peak status, see ``measured_color``,
+        ``missing_color`` and ``unassigned_color`` config keys.
+    
+    details : np.ndarray of shape <num_of_bars>, optional
+        Bars are coloured according to the ``user_bar_colors_dict``
+        config key, if ``color_user_details_flag``, after peak status.
+    
+    default : str, optional
+        The colour of the bars without condition.
+        Defaults to None, ``measured_color``.
+    
+    Returns
+    -------
+    tuple of np.ndarray of shape <num_of_bars>
+        The face colours, the edge colours and the line widths.
+    """
+    
+    import matplotlib
+    
+    if default is None:
+        default = c["measured_color"]
+    
+    # edges of bars without condition are not coloured
+    if matplotlib.rcParams["patch.force_edgecolor"]:
+        default_edge = matplotlib.rcParams["patch.edgecolor"]
+    
+    else:
+        default_edge = "none"
+    
+    facecolors = np.full(num_of_bars, default, dtype=object)
+    edgecolors = np.full(num_of_bars, default_edge, dtype=object)
+    
+    conditions = []
+    
+    if peak_status is not None:
+        conditions.append((
+            peak_status,
+            {
+                'measured': c["measured_color"],
+                'missing': c["missing_color"],
+                'unassigned': c["unassigned_color"],
+                },
+            ))
+    
+    if details is not None and c["color_user_details_flag"]:
+        conditions.append((details, c["user_bar_colors_dict"]))
+    
+    # each condition is resolved once, for faces and edges
+    for values, d in conditions:
+        colors = experimentplotbase.resolve_colors(values, d)
+        found = np.not_equal(colors, None)
+        facecolors[found] = colors[found]
+        edgecolors[found] = colors[found]
+    
+    # 'none' edges are not drawn, otherwise bar alpha makes them visible
+    linewidths = np.where(edgecolors == "none", 0, c["bar_linewidth"])
+    
+    return facecolors, edgecolors, linewidths
+
+
 def plot_threshold(
         ax,
         values,
         std=5,
+        threshold=None,
         orientation='horizontal',
         threshold_color="red",
         threshold_linewidth=0.5,
@@ -60,6 +179,11 @@ def plot_threshold(
     std : int, optional
         Standard deviation multiplier. Defaults to 5.
     
+    threshold : float, optional
+        A precomputed threshold, for example, from
+        :func:`~calc_thresholds`. If given, <values> and <std>
+        are ignored. Defaults to None, threshold is calculated.
+    
     orientation : ['horizontal', 'vertical'], optional
         Wheter plotting in a vertical or horizontal plot.
         Defaults to 'horizontal'
@@ -77,9 +201,10 @@ def plot_threshold(
         The matplotlib zorder for the plot.
         Defaults to 10, plots on top of everything.
     """
-    threshold = calc.threshold_std_of_population(values)
+    if threshold is None:
+        threshold = calc.threshold_std_of_population(values, std=std)
     
-    log.debug("Threshold defined: {}".format(threshold))
+    log.debug("Threshold defined: %s", threshold)
     
     line_details = {
         "color": threshold_color,
@@ -160,10 +285,10 @@ def compacted_bar_xticks(num_of_bars, labels):
                 mod_ *= 10
                 sanity_counter += 1
         
-        log.debug("sanity_counter: {}".format(sanity_counter))
+        log.debug("sanity_counter: %s", sanity_counter)
     
-    log.debug("Setting xticks: {}".format([a for a in xticks]))
-    log.debug("xticklabels: {}".format(xticks_labels))
+    log.debug("Setting xticks: %s", logger.TruncatedRepr(xticks))
+    log.debug("xticklabels: %s", logger.TruncatedRepr(xticks_labels))
     
     return xticks, xticks_labels
 
@@ -192,6 +317,6 @@ def _extended_bar_xticks(num_of_bars):
             mod_ = j // 100
             break
     
-    log.debug("Tick spacing set to: {}".format(mod_))
+    log.debug("Tick spacing set to: %s", mod_)
     
     return mod_
@@ -48,7 +48,7 @@ def calc_num_subplots(values):
         Y (axis=0) is the evolution of that data along the titration.
     """
     num_subplots = values.shape[0]
-    log.debug(f"Number of subplots: {num_subplots}")
+    log.debug("Number of subplots: %s", num_subplots)
     
     return num_subplots
 
@@ -178,13 +178,13 @@ def finds_paramagnetic_tag(
         log.info(_)
         raise ValueError(_)
     
-    log.debug("Tag info: {}".format(tag_data))
+    log.debug("Tag info: %s", logger.TruncatedRepr(tag_data))
     
     where_tag = np.where(tag_data == tag_id)
-    log.debug("Tag mask found: {}".format(where_tag))
+    log.debug("Tag mask found: %s", logger.TruncatedRepr(where_tag))
     
     tag_position = list(range(len(data)))[where_tag[0][0]]
-    log.debug("Tag bar index position: {}".format(tag_position))
+    log.debug("Tag bar index position: %s", tag_position)
     
     return tag_position
 
@@ -259,14 +259,163 @@ def set_item_colors(items, values, d):
         Keys are conditions matching <values>, and values are colours.
     """
     
-    log.debug("Setting colours: {}".format(values))
+    log.debug("Setting colours: %s", logger.TruncatedRepr(values))
+    
+    apply_colors(items, resolve_colors(values, d))
     
-    for v, item_ in zip(values, items):
-        if str(v) in d.keys():
-            item_.set_color(d[str(v)])
     return
 
 
+def apply_colors(items, colors):
+    """
+    Colours <items> with resolved colours.
+    
+    Items are coloured one by one, with ``set_color``. Prefer giving
+    the colours when the items are created, see
+    :func:`~resolve_colors`. Tick labels are the exception:
+    matplotlib creates them with a single style for all labels, and
+    even a common colour given to
+    :meth:`matplotlib.axes.Axes.set_xticklabels` is set label by
+    label, so labels of different colours are coloured here.
+    
+    Parameters
+    ----------
+    items : matplotib's items obj
+        Either plot bars, ticks, etc...
+    
+    colors : np.ndarray of shape (x,)
+        The colour of each item, items with None or empty colours
+        are not coloured.
+    """
+    
+    for item_, color in zip(items, colors):
+        if color is not None and color != "":
+            item_.set_color(color)
+    
+    return
+
+
+def resolve_colors(values, d, default=None):
+    """
+    Resolves the colours of <values> according to <d>.
+    
+    Values are looked up in <d> once per category, not per value.
+    Use the resolved colours when creating artists instead of
+    colouring each artist, for example, with the ``color`` argument
+    of :meth:`matplotlib.axes.Axes.bar`.
+    
+    Parameters
+    ----------
+    values : np.ndarray of shape (x,)
+        Containing the condition information, compared as strings.
+    
+    d : dict
+        Keys are conditions matching <values>, and values are colours.
+    
+    default : str or np.ndarray of shape (x,), optional
+        The colours of values not in <d>, for example, the colours
+        resolved from a previous condition.
+        Defaults to None.
+    
+    Returns
+    -------
+    np.ndarray of shape (x,), dtype=object
+        The colours.
+    """
+    
+    return map_categories(values, d, default)
+
+
+def map_categories(values, d, default=None):
+    """
+    Maps <values> to the values of <d>, looking up each category
+    once, not each value.
+    
+    Parameters
+    ----------
+    values : np.ndarray
+        The categories, compared as strings. Of any shape,
+        for example, (y, x) to map all the subplots at once.
+    
+    d : dict
+        Keys are categories matching <values>.
+    
+    default : object or np.ndarray of the shape of <values>, optional
+        The result for values not in <d>.
+        Defaults to None.
+    
+    Returns
+    -------
+    np.ndarray of the shape of <values>, dtype=object
+    """
+    
+    values = np.asarray(values).astype(str)
+    
+    categories, inverse = np.unique(values, return_inverse=True)
+    inverse = inverse.reshape(values.shape)
+    
+    found = np.array([cat in d for cat in categories], dtype=bool)[inverse]
+    lookup = np.array([d.get(cat) for cat in categories], dtype=object)
+    
+    mapped = np.empty(values.shape, dtype=object)
+    mapped[:] = default
+    mapped[found] = lookup[inverse[found]]
+    
+    return mapped
+
+
+def calc_text_marks(series, d):
+    """
+    Resolves the text marks of :func:`~text_marker` for a whole
+    data set at once.
+    
+    Parameters
+    ----------
+    series : np.ndarray
+        Information source to convert to text marks, of any shape,
+        for example, (y, x).
+    
+    d : dict
+        Keys are conditions matching <series>, and values are
+        the text markers.
+    
+    Returns
+    -------
+    np.ndarray of the shape of <series>, dtype=str
+        The text marks, empty strings where there is no mark.
+    """
+    return map_categories(series, d, default="").astype(str)
+
+
+def find_paramagnetic_tags(tag_position, tag_id="*"):
+    """
+    Finds the bar index of the paramagnetic tag of each subplot,
+    as :func:`~finds_paramagnetic_tag`, for all the subplots at once.
+    
+    Parameters
+    ----------
+    tag_position : np.ndarray, shape=(y, x), dtype=str
+        Null values where tag not present, <tag_id> character
+        denotes the position of the of the paramagnetic tag.
+    
+    tag_id : str, optional
+        The tag identifier. Defaults to "*".
+    
+    Returns
+    -------
+    np.ndarray, shape=(y,), dtype=int
+        The index of the first tag of each row, -1 where there
+        is no tag.
+    """
+    
+    found = np.asarray(tag_position) == tag_id
+    
+    tags = np.where(found.any(axis=1), found.argmax(axis=1), -1)
+    log.debug("Tag bar index positions: %s", logger.TruncatedRepr(tags))
+    
+    return tags
+
+
 def text_marker(
         ax,
         values_x,
@@ -275,6 +424,7 @@ def text_marker(
         d,
         fs=3,
         orientation='horizontal',
+        batched=False,
         ):
     """
     Places a text mark over the bars of a Bar Plot.
@@ -292,9 +442,11 @@ def text_marker(
     series : np.ndarray of shape (x,)
         Series with information source to convert to text mark.
         
-    d : dict
+    d : dict or None
         Keys are conditions matching <series>, and values are
             the text markers.
+        If None, <series> are the text markers, as given by
+        :func:`~calc_text_marks`, and empty strings are not drawn.
         
     fs : float, optional
         Text mark font size.
@@ -302,11 +454,30 @@ def text_marker(
     orientation : ['horizontal', 'vertical'], optional
         Wheter plotting in a vertical or horizontal plot.
         Defaults to 'horizontal'
+    
+    batched : bool, optional
+        If True, marks are drawn with :func:`~batch_text_marker`,
+        otherwise, one text artist is created for each mark.
+        Defaults to False.
     """
     
-    log.debug(f"Text marker series: {series}")
+    log.debug("Text marker series: %s", logger.TruncatedRepr(series))
     
-    if orientation == 'vertical':
+    if d is None:
+        d = {m: m for m in np.unique(np.asarray(series, dtype=str)) if m}
+    
+    if batched:
+        batch_text_marker(
+            ax,
+            values_x,
+            values_y,
+            series,
+            d,
+            fs=fs,
+            orientation=orientation,
+            )
+    
+    elif orientation == 'vertical':
         
         for s, x, y in zip(series, values_x, values_y):
             if str(s) in d.keys():
@@ -353,3 +524,119 @@ def text_marker(
                     )
     
     return
+
+
+def batch_text_marker(
+        ax,
+        values_x,
+        values_y,
+        series,
+        d,
+        fs=3,
+        orientation='horizontal',
+        ):
+    """
+    Places text marks over the bars of a Bar Plot, as
+    :func:`~text_marker`, drawing all the marks of the same text
+    and alignment as the markers of a single artist.
+    
+    Positions and alignments are calculated for the whole series at
+    once. Each text is converted to a path once, and the marks are
+    not laid out as text, so figures with thousands of marks are
+    drawn and saved faster. Texts are drawn with the default font.
+    
+    Parameters
+    ----------
+    See :func:`~text_marker`.
+    """
+    
+    import matplotlib
+    from matplotlib.lines import Line2D
+    
+    marks = map_categories(series, d)
+    selected = np.not_equal(marks, None)
+    
+    if not(selected.any()):
+        return
+    
+    marks = marks[selected].astype(str)
+    x = np.nan_to_num(np.asarray(values_x, dtype=float))[selected]
+    y = np.nan_to_num(np.asarray(values_y, dtype=float))[selected]
+    
+    # alignments as in text_marker
+    if orientation == 'vertical':
+        x, y = y, x
+        ha = np.where(x > 0, 'left', np.where(x < 0, 'right', 'center'))
+        va = np.full(x.shape, 'center')
+    
+    elif orientation == 'horizontal':
+        ha = np.full(x.shape, 'center')
+        va = np.where(y < 0, 'top', 'bottom')
+    
+    else:
+        return
+    
+    # one artist for each text and alignment
+    groups, inverse = np.unique(
+        np.stack([marks, ha, va], axis=1),
+        axis=0,
+        return_inverse=True,
+        )
+    inverse = inverse.ravel()
+    
+    for k, (mark, ha_, va_) in enumerate(groups):
+        
+        marker, size = _text_marker_style(mark, fs, ha_, va_)
+        
+        if marker is None:
+            continue
+        
+        members = inverse == k
+        
+        ax.add_artist(Line2D(
+            x[members],
+            y[members],
+            linestyle='none',
+            marker=marker,
+            markersize=size,
+            markerfacecolor=matplotlib.rcParams["text.color"],
+            markeredgewidth=0,
+            clip_on=False,
+            zorder=3,
+            ))
+    
+    return
+
+
+def _text_marker_style(text, fs, ha, va):
+    """
+    Converts text to a marker aligned to the marker position.
+    
+    Returns
+    -------
+    tuple
+        (:obj:`matplotlib.markers.MarkerStyle`, size in points), or
+        (None, None) if the text has no glyphs.
+    """
+    
+    from matplotlib.markers import MarkerStyle
+    from matplotlib.path import Path
+    from matplotlib.textpath import TextPath
+    
+    path = TextPath((0, 0), text, size=fs)
+    
+    if not(len(path.vertices)):
+        return None, None
+    
+    (x0, y0), (x1, y1) = path.get_extents().get_points()
+    
+    dx = {'left': -x0, 'right': -x1, 'center': -(x0 + x1) / 2}[ha]
+    dy = {'bottom': -y0, 'top': -y1, 'center': -(y0 + y1) / 2}[va]
+    
+    path = Path(path.vertices + (dx, dy), path.codes)
+    
+    # markers are normalized to their largest coordinate,
+    # this size keeps the path coordinates in points
+    size = 2 * np.max(np.abs(path.vertices))
+    
+    return MarkerStyle(path), size
@@ -0,0 +1,313 @@
+"""
+Pool of reusable figures for batch plotting.
+
+Drawing the figure and the axes grid of a plot, and styling the axes,
+takes a large part of the time of a plotting run. When many plots of
+the same layout are drawn, a :class:`~FigurePool` keeps the figures
+of finished plots and gives them to the next plots of the same layout,
+from which only the data artists are removed:
+
+>>> config = barplotcompacted.Config(y_lims=(0, 1))
+>>> with figurepool.FigurePool() as pool:
+...     for i, values in enumerate(data_sets):
+...         barplotcompacted.plot(
+...             values,
+...             labels,
+...             config=config,
+...             pool=pool,
+...             figure_path=f"plot_{i}.pdf",
+...             )
+
+Figures are reused by plots with the same number of subplots, page
+layout, figure size and configuration, apart from the output
+configuration keys, see :const:`~OUTPUT_KEYS`.
+"""
+# Copyright © 2017-2019 Farseer-NMR
+#
+# @Original Article: http://bit.ly/farseerjbnmr
+# @ResearchGate https://goo.gl/z8dPJU
+# @Twitter https://twitter.com/farseer_nmr
+# @GitHub: http://bit.ly/farseer-nmr
+# @Mailist: http://bit.ly/fs_maillist
+#
+# This file is part of the Farseer-NMR project.
+#
+# Farseer-NMR is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Farseer-NMR is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Farseer-NMR. If not, see <http://www.gnu.org/licenses/>.
+#
+# For full list of author contributors visit:
+#    https://github.com/Farseer-NMR/FarSeer-NMR/wiki/Citing
+#
+# Contributors to this file:
+#    - João M.C. Teixeira (https://github.com/joaomcteixeira)
+from collections import OrderedDict, namedtuple
+
+from FarseerNMR import logger
+from FarseerNMR.plot.base import plotconfig, plottingbase
+
+log = logger.get_log(__name__)
+
+PoolInfo = namedtuple("PoolInfo", ["hits", "misses", "maxsize", "currsize"])
+
+OUTPUT_KEYS = frozenset((
+    "figure_path",
+    "figure_dpi",
+    "figure_header",
+    "header_fontsize",
+    "paginate_flag",
+    "render_processes",
+    ))
+"""
+Configuration keys that do not change the figure, plots differing
+only in these keys share figures.
+"""
+
+
+class FigurePool():
+    """
+    Bounded pool of figures drawn by
+    :func:`FarseerNMR.plot.base.plottingbase.draw_figure`.
+    
+    Figures are taken with :meth:`~draw_figure` and given back with
+    :meth:`~release`. Released figures are kept idle until a plot of
+    the same layout takes them. When more than <maxsize> figures are
+    idle, the least recently released is closed.
+    
+    Use as a context manager, which closes the idle figures.
+    
+    Parameters
+    ----------
+    maxsize : :obj:`int`, optional
+        Maximum number of idle figures.
+        Defaults to 8.
+    """
+    
+    def __init__(self, maxsize=8):
+        
+        if not(isinstance(maxsize, int)) or maxsize < 1:
+            raise ValueError("maxsize should be a positive integer")
+        
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._idle = OrderedDict()
+        self._in_use = {}
+        
+        return
+    
+    def __len__(self):
+        return sum(len(figures) for figures in self._idle.values())
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self.close()
+        return False
+    
+    def draw_figure(
+            self,
+            num_subplots,
+            rows_page,
+            cols_page,
+            fig_height,
+            fig_width,
+            key=None,
+            ):
+        """
+        Draws a figure, as
+        :func:`FarseerNMR.plot.base.plottingbase.draw_figure`,
+        or takes an idle figure of the same layout, cleared with
+        :func:`~clear_figure`.
+        
+        Parameters
+        ----------
+        key : mapping, optional
+            The template configuration, see :func:`~style_key`.
+            Defaults to None.
+        
+        Returns
+        -------
+        tuple
+            (Figure, Axes)
+        """
+        
+        layout = (
+            num_subplots,
+            rows_page,
+            cols_page,
+            fig_height,
+            fig_width,
+            None if key is None else style_key(key),
+            )
+        
+        idle = self._idle.get(layout)
+        
+        if idle:
+            figure, axs = idle.pop()
+            
+            if not(idle):
+                del self._idle[layout]
+            
+            clear_figure(figure, axs)
+            self.hits += 1
+            log.debug("Figure taken from pool")
+        
+        else:
+            figure, axs = plottingbase.draw_figure(
+                num_subplots,
+                rows_page,
+                cols_page,
+                fig_height,
+                fig_width,
+                )
+            self.misses += 1
+        
+        self._in_use[figure] = (layout, axs)
+        
+        return figure, axs
+    
+    def release(self, figure):
+        """
+        Gives back a figure taken with :meth:`~draw_figure`.
+        
+        Figures not taken from the pool are closed.
+        """
+        
+        try:
+            layout, axs = self._in_use.pop(figure)
+        
+        except KeyError:
+            plottingbase.import_pyplot().close(figure)
+            return
+        
+        self._idle.setdefault(layout, []).append((figure, axs))
+        self._idle.move_to_end(layout)
+        
+        while len(self) > self.maxsize:
+            
+            oldest = next(iter(self._idle))
+            evicted, _ = self._idle[oldest].pop(0)
+            
+            if not(self._idle[oldest]):
+                del self._idle[oldest]
+            
+            plottingbase.import_pyplot().close(evicted)
+            log.debug("Figure evicted from pool")
+        
+        return
+    
+    def info(self):
+        """
+        Returns a :obj:`PoolInfo` with the pool counters.
+        """
+        return PoolInfo(self.hits, self.misses, self.maxsize, len(self))
+    
+    def close(self):
+        """
+        Closes the idle figures and resets the counters.
+        """
+        
+        plt = plottingbase.import_pyplot()
+        
+        for figures in self._idle.values():
+            for figure, _ in figures:
+                plt.close(figure)
+        
+        self._idle.clear()
+        self.hits = 0
+        self.misses = 0
+        
+        return
+
+
+def style_key(config):
+    """
+    Hashable key of the configuration keys that change the figure.
+    
+    Parameters
+    ----------
+    config : mapping
+        A template configuration dictionary or Config.
+    
+    Returns
+    -------
+    frozenset
+    """
+    
+    return frozenset(
+        (k, plotconfig._hashable(plotconfig._freeze(v)))
+        for k, v in config.items()
+        if k not in OUTPUT_KEYS
+        )
+
+
+def clear_figure(figure, axes):
+    """
+    Removes the data artists from a figure drawn by
+    :func:`FarseerNMR.plot.base.plottingbase.draw_figure`.
+    
+    Axes, and their styling, are kept. Texts of the figure, such as the
+    header, are removed, and the limits, orientation and autoscaling
+    of the axes are reset.
+    
+    Ticks are recreated, so that tick labels styled from the data of
+    a previous plot, for example, coloured by peak status, are
+    discarded. Styling given with ``tick_params`` is kept, templates
+    style the labels again when setting them.
+    
+    Parameters
+    ----------
+    figure : :obj:`matplotlib.figure.Figure`
+    
+    axes : sequence of :obj:`matplotlib.axes.Axes`
+        Axes removed from the figure, by
+        :func:`FarseerNMR.plot.base.plottingbase.clean_subplots`,
+        are ignored.
+    """
+    
+    for text in list(figure.texts):
+        text.remove()
+    
+    for ax in axes:
+        
+        if ax.get_figure() is None:
+            continue
+        
+        for container in list(ax.containers):
+            container.remove()
+        
+        for artist in (
+                *ax.collections,
+                *ax.images,
+                *ax.lines,
+                *ax.patches,
+                *ax.texts,
+                *ax.artists,
+                *ax.tables,
+                ):
+            artist.remove()
+        
+        if ax.get_legend() is not None:
+            ax.get_legend().remove()
+        
+        # labels styled by a previous plot are discarded
+        ax.xaxis.reset_ticks()
+        ax.yaxis.reset_ticks()
+        
+        ax.relim()
+        ax.set_xlim(0, 1)
+        ax.set_ylim(0, 1)
+        ax.set_autoscale_on(True)
+    
+    return
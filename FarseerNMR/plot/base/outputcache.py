@@ -0,0 +1,512 @@
+"""
+Content-addressed cache of the output files of the plotting templates.
+
+Re-running a project after a small edit plots again every figure,
+most of them from the same data and configuration as the previous run.
+An :class:`~OutputCache` keeps a copy of the files written by each
+plot, addressed by a key that hashes everything the output depends on:
+the input arrays, the configuration, the version of the template, the
+version of matplotlib and its rcParams. When the key of a plot is in the cache, the
+cached files are copied to the output path, or left untouched if the
+output files are already equal, and the plot is not rendered:
+
+>>> cache = outputcache.OutputCache("farseer_cache")
+>>> for i, values in enumerate(data_sets):
+...     barplotcompacted.plot(
+...         values,
+...         labels,
+...         cache=cache,
+...         figure_path=f"plot_{i}.pdf",
+...         )
+
+The cache folder holds the cached files and a manifest,
+:const:`~MANIFEST`, with the files, size and last use of each entry.
+The manifest is read when the cache is created, so the cache persists
+between runs. When the cached files exceed ``maxsize`` bytes, the
+least recently used entries are evicted.
+
+The template version is a digest of the source code of the template
+module and of the :mod:`FarseerNMR.plot.base` and
+:mod:`FarseerNMR.calc` modules, editing the plotting code invalidates
+the cached files.
+"""
+# Copyright © 2017-2019 Farseer-NMR
+#
+# @Original Article: http://bit.ly/farseerjbnmr
+# @ResearchGate https://goo.gl/z8dPJU
+# @Twitter https://twitter.com/farseer_nmr
+# @GitHub: http://bit.ly/farseer-nmr
+# @Mailist: http://bit.ly/fs_maillist
+#
+# This file is part of the Farseer-NMR project.
+#
+# Farseer-NMR is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Farseer-NMR is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Farseer-NMR. If not, see <http://www.gnu.org/licenses/>.
+#
+# For full list of author contributors visit:
+#    https://github.com/Farseer-NMR/FarSeer-NMR/wiki/Citing
+#
+# Contributors to this file:
+#    - João M.C. Teixeira (https://github.com/joaomcteixeira)
+import filecmp
+import functools
+import glob
+import hashlib
+import importlib
+import json
+import os
+import shutil
+import time
+from collections import namedtuple
+from importlib import metadata
+from types import MappingProxyType
+
+import numpy as np
+
+from FarseerNMR import logger
+from FarseerNMR.plot.base import plottingbase
+
+log = logger.get_log(__name__)
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+MANIFEST = "manifest.json"
+"""
+File name of the manifest in the cache folder.
+"""
+
+_MANIFEST_VERSION = 1
+
+UNKEYED = frozenset((
+    "figure_path",
+    "render_processes",
+    ))
+"""
+Configuration keys that do not change the output files, plots
+differing only in these keys share cached files. The extension of
+``figure_path``, the file format, is part of the key.
+"""
+
+UNKEYED_RCPARAMS = frozenset((
+    "backend",
+    "interactive",
+    ))
+"""
+matplotlib rcParams that do not change the output files.
+"""
+
+_source_packages = ("FarseerNMR.plot.base", "FarseerNMR.calc")
+
+
+class OutputCache():
+    """
+    Cache of the output files of plots, stored in a folder.
+    
+    Plotting templates compute the key of a plot with :meth:`~key`,
+    restore its files with :meth:`~fetch` and, if not cached, store
+    the files written with :meth:`~store`.
+    
+    Parameters
+    ----------
+    directory : :obj:`str`
+        The cache folder, created if it does not exist.
+    
+    maxsize : :obj:`int`, optional
+        Maximum size of the cached files, in bytes.
+        Defaults to 1 GiB.
+    
+    Raises
+    ------
+    ValueError
+        If maxsize is not a positive integer.
+    """
+    
+    def __init__(self, directory, maxsize=2 ** 30):
+        
+        if not(isinstance(maxsize, int)) or maxsize < 1:
+            raise ValueError("maxsize should be a positive integer")
+        
+        self.directory = directory
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        
+        os.makedirs(directory, exist_ok=True)
+        
+        self._entries = self._read_manifest()
+        
+        return
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def __contains__(self, key):
+        return key in self._entries
+    
+    @property
+    def currsize(self):
+        """
+        The size of the cached files, in bytes.
+        """
+        return sum(entry["size"] for entry in self._entries.values())
+    
+    def key(self, template, config, **data):
+        """
+        Calculates the key of a plot.
+        
+        The key includes the current matplotlib rcParams, except
+        :const:`~UNKEYED_RCPARAMS`.
+        
+        Parameters
+        ----------
+        template : :obj:`str`
+            The name of the template module, see
+            :func:`~template_version`.
+        
+        config : mapping
+            The resolved template configuration, a dictionary
+            or Config.
+        
+        data
+            The input arguments of the plot: arrays, strings, lists
+            or None.
+        
+        Returns
+        -------
+        :obj:`str`
+            Hexadecimal digest.
+        """
+        
+        import matplotlib
+        
+        h = hashlib.blake2b(digest_size=16)
+        
+        _update(h, "template", template)
+        _update(h, "template_version", template_version(template))
+        _update(h, "matplotlib", matplotlib_version())
+        
+        # unkeyed names are skipped before reading them,
+        # reading rcParams["backend"] would resolve the default backend
+        _update(
+            h,
+            "rcParams",
+            {
+                k: matplotlib.rcParams[k]
+                for k in matplotlib.rcParams
+                if k not in UNKEYED_RCPARAMS
+                },
+            )
+        
+        _update(
+            h,
+            "config",
+            {k: v for k, v in config.items() if k not in UNKEYED},
+            )
+        
+        _update(
+            h,
+            "format",
+            os.path.splitext(config["figure_path"])[1].lower(),
+            )
+        
+        for name in sorted(data):
+            _update(h, name, data[name])
+        
+        return h.hexdigest()
+    
+    def fetch(self, key, config):
+        """
+        Writes the cached files of a plot to its output paths.
+        
+        Output files equal to the cached files are not rewritten.
+        
+        Parameters
+        ----------
+        key : :obj:`str`
+            The key of the plot, see :meth:`~key`.
+        
+        config : mapping
+            The resolved template configuration, which gives the
+            output paths, see :func:`~output_paths`.
+        
+        Returns
+        -------
+        list of str or None
+            The output paths, None if the plot is not cached.
+        """
+        
+        entry = self._entries.get(key)
+        
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        sources = [
+            os.path.join(self.directory, name)
+            for name in entry["files"]
+            ]
+        
+        if not(all(os.path.isfile(source) for source in sources)):
+            log.debug("Cached files of %s missing, entry removed", key)
+            self._remove(key)
+            self._write_manifest()
+            self.misses += 1
+            return None
+        
+        paths = output_paths(config, len(sources))
+        
+        for source, path in zip(sources, paths):
+            
+            unchanged = (
+                os.path.isfile(path)
+                and filecmp.cmp(source, path, shallow=False)
+                )
+            
+            if unchanged:
+                continue
+            
+            shutil.copyfile(source, path)
+            log.info("**Restored plot figure from cache** %s\n", path)
+        
+        # entries are kept from least to most recently used
+        self._entries[key] = self._entries.pop(key)
+        entry["used"] = time.time()
+        self._write_manifest()
+        self.hits += 1
+        
+        return paths
+    
+    def store(self, key, paths):
+        """
+        Copies the output files of a plot to the cache.
+        
+        Least recently used entries are evicted if the cached files
+        exceed <maxsize>.
+        
+        Parameters
+        ----------
+        key : :obj:`str`
+            The key of the plot, see :meth:`~key`.
+        
+        paths : list of str
+            The output files, in page order, as
+            :attr:`FarseerNMR.plot.base.plottingbase.PageWriter.paths`.
+        """
+        
+        self._remove(key)
+        
+        files = []
+        
+        for i, path in enumerate(paths):
+            name = f"{key}_{i:03d}{os.path.splitext(path)[1]}"
+            shutil.copyfile(path, os.path.join(self.directory, name))
+            files.append(name)
+        
+        self._entries[key] = {
+            "files": files,
+            "size": sum(
+                os.path.getsize(os.path.join(self.directory, name))
+                for name in files
+                ),
+            "used": time.time(),
+            }
+        
+        while self.currsize > self.maxsize:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            log.debug("Output cache entry evicted: %s", oldest)
+        
+        self._write_manifest()
+        
+        return
+    
+    def info(self):
+        """
+        Returns a :obj:`CacheInfo` with the cache counters,
+        sizes in bytes.
+        """
+        return CacheInfo(self.hits, self.misses, self.maxsize, self.currsize)
+    
+    def clear(self):
+        """
+        Removes the cached files and resets the counters.
+        """
+        
+        for key in list(self._entries):
+            self._remove(key)
+        
+        self._write_manifest()
+        self.hits = 0
+        self.misses = 0
+        
+        return
+    
+    def _remove(self, key):
+        
+        entry = self._entries.pop(key, None)
+        
+        if entry is None:
+            return
+        
+        for name in entry["files"]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            
+            except FileNotFoundError:
+                pass
+        
+        return
+    
+    def _read_manifest(self):
+        
+        path = os.path.join(self.directory, MANIFEST)
+        
+        try:
+            with open(path) as fin:
+                manifest = json.load(fin)
+        
+        except FileNotFoundError:
+            return {}
+        
+        except ValueError:
+            log.warning("Output cache manifest %s not readable, ignored", path)
+            return {}
+        
+        if manifest.get("version") != _MANIFEST_VERSION:
+            log.warning("Output cache manifest %s outdated, ignored", path)
+            return {}
+        
+        return manifest["entries"]
+    
+    def _write_manifest(self):
+        
+        path = os.path.join(self.directory, MANIFEST)
+        
+        # the manifest is replaced at once, never left half written
+        with open(f"{path}.tmp", "w") as fout:
+            json.dump(
+                {"version": _MANIFEST_VERSION, "entries": self._entries},
+                fout,
+                indent=1,
+                )
+        
+        os.replace(f"{path}.tmp", path)
+        
+        return
+
+
+def output_paths(config, num_files):
+    """
+    Returns the output paths of a plot, as written by
+    :class:`FarseerNMR.plot.base.plottingbase.PageWriter`.
+    
+    Parameters
+    ----------
+    config : mapping
+        The template configuration, ``figure_path`` and, if present,
+        ``paginate_flag`` keys.
+    
+    num_files : int
+        The number of files written.
+    
+    Returns
+    -------
+    list of str
+    """
+    
+    writer = plottingbase.PageWriter(
+        config["figure_path"],
+        paginate=config.get("paginate_flag", False),
+        )
+    
+    return [
+        writer.page_path(i) or config["figure_path"]
+        for i in range(num_files)
+        ]
+
+
+@functools.lru_cache(maxsize=None)
+def template_version(template):
+    """
+    Digest of the source code of a template module and of the
+    :mod:`FarseerNMR.plot.base` and :mod:`FarseerNMR.calc` modules.
+    
+    Parameters
+    ----------
+    template : :obj:`str`
+        The name of the template module, usually its ``__name__``.
+    
+    Returns
+    -------
+    :obj:`str`
+    """
+    
+    files = [importlib.import_module(template).__file__]
+    
+    for package in _source_packages:
+        folder = os.path.dirname(importlib.import_module(package).__file__)
+        files.extend(sorted(glob.glob(os.path.join(folder, "*.py"))))
+    
+    h = hashlib.blake2b(digest_size=16)
+    
+    for file_path in files:
+        with open(file_path, "rb") as fin:
+            h.update(fin.read())
+    
+    return h.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def matplotlib_version():
+    """
+    The installed matplotlib version, read without importing it.
+    """
+    return metadata.version("matplotlib")
+
+
+def _update(h, name, value):
+    """
+    Updates hash <h> with a named value.
+    """
+    
+    h.update(name.encode())
+    h.update(b"\0")
+    
+    if isinstance(value, np.ndarray) and not(value.dtype.hasobject):
+        h.update(f"{value.dtype.str}{value.shape}".encode())
+        h.update(np.ascontiguousarray(value).data)
+    
+    else:
+        h.update(json.dumps(
+            value,
+            sort_keys=True,
+            default=_to_json,
+            ).encode())
+    
+    h.update(b"\0")
+    
+    return
+
+
+def _to_json(value):
+    """
+    Converts values not serializable by json.
+    """
+    
+    if isinstance(value, MappingProxyType):
+        return dict(value)
+    
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    
+    return repr(value)
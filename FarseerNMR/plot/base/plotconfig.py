@@ -0,0 +1,279 @@
+"""
+Immutable configuration objects of the plotting templates.
+
+Each template provides a ``Config`` class, made with
+:func:`~make_config_class`, with the keys of its default
+configuration dictionary as attributes. Configs are validated once,
+when created, and the ``plot()`` function of the template accepts
+them with the ``config`` parameter, skipping the merge and validation
+of the configuration in each call:
+
+>>> config = barplotcompacted.Config(y_lims=(0, 1), figure_dpi=150)
+>>> for values in data_sets:
+...     barplotcompacted.plot(values, labels, config=config)
+
+Configs are hashable, equal configs have equal hashes, and can be
+used as keys of caches.
+"""
+# Copyright © 2017-2019 Farseer-NMR
+#
+# @Original Article: http://bit.ly/farseerjbnmr
+# @ResearchGate https://goo.gl/z8dPJU
+# @Twitter https://twitter.com/farseer_nmr
+# @GitHub: http://bit.ly/farseer-nmr
+# @Mailist: http://bit.ly/fs_maillist
+#
+# This file is part of the Farseer-NMR project.
+#
+# Farseer-NMR is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Farseer-NMR is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Farseer-NMR. If not, see <http://www.gnu.org/licenses/>.
+#
+# For full list of author contributors visit:
+#    https://github.com/Farseer-NMR/FarSeer-NMR/wiki/Citing
+#
+# Contributors to this file:
+#    - João M.C. Teixeira (https://github.com/joaomcteixeira)
+from types import MappingProxyType
+
+from FarseerNMR import logger
+from FarseerNMR.plot.base import plotvalidators
+
+log = logger.get_log(__name__)
+
+
+class PlotConfig():
+    """
+    Base class of the immutable configuration of plotting templates.
+    
+    Not used directly, see :func:`~make_config_class`.
+    
+    Parameters
+    ----------
+    kwargs
+        Config keys different from the template defaults.
+    
+    Raises
+    ------
+    TypeError
+        If a key is not a config key of the template or values are
+        not of the type of the defaults.
+    """
+    
+    __slots__ = ("_hash",)
+    
+    _defaults = {}
+    _schema = None
+    
+    def __init__(self, **kwargs):
+        
+        self._assign(self._defaults, kwargs)
+        
+        return
+    
+    def _assign(self, base, kwargs):
+        
+        for key in kwargs:
+            if key not in self._defaults:
+                raise TypeError(
+                    f"'{key}' is not a config key of "
+                    f"{self._schema.name}"
+                    )
+        
+        self._schema.validate(kwargs)
+        
+        setattr_ = object.__setattr__
+        
+        for key, value in base.items():
+            setattr_(self, key, _freeze(kwargs.get(key, value)))
+        
+        setattr_(
+            self,
+            "_hash",
+            hash(tuple(_hashable(getattr(self, k)) for k in self._defaults)),
+            )
+        
+        return
+    
+    def __setattr__(self, key, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+    
+    def __delattr__(self, key):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+    
+    def __getitem__(self, key):
+        
+        if key not in self._defaults:
+            raise KeyError(key)
+        
+        return getattr(self, key)
+    
+    def __contains__(self, key):
+        return key in self._defaults
+    
+    def __iter__(self):
+        return iter(self._defaults)
+    
+    def __hash__(self):
+        return self._hash
+    
+    def __eq__(self, other):
+        
+        if type(other) is not type(self):
+            return NotImplemented
+        
+        return self._hash == other._hash and all(
+            getattr(self, k) == getattr(other, k) for k in self._defaults
+            )
+    
+    def __repr__(self):
+        
+        changed = ", ".join(
+            f"{k}={getattr(self, k)!r}" for k in self._defaults
+            if getattr(self, k) != _freeze(self._defaults[k])
+            )
+        
+        return f"{type(self).__name__}({changed})"
+    
+    def __reduce__(self):
+        return (_unpickle, (type(self), self.asdict()))
+    
+    def get(self, key, default=None):
+        """
+        Returns the value of key, default if key is not a config key.
+        """
+        
+        try:
+            return self[key]
+        
+        except KeyError:
+            return default
+    
+    def keys(self):
+        return self._defaults.keys()
+    
+    def items(self):
+        return ((k, getattr(self, k)) for k in self._defaults)
+    
+    def asdict(self):
+        """
+        Returns the config as a new mutable dictionary, as the
+        template default configuration dictionary.
+        """
+        return {
+            k: _thaw(getattr(self, k), v) for k, v in self._defaults.items()
+            }
+    
+    def replace(self, **kwargs):
+        """
+        Returns a new config with some keys replaced.
+        
+        Only the replaced keys are validated.
+        """
+        
+        new = object.__new__(type(self))
+        new._assign(self.asdict(), kwargs)
+        
+        return new
+
+
+def make_config_class(name, defaults, schema, module):
+    """
+    Makes the config class of a plotting template.
+    
+    Parameters
+    ----------
+    name : str
+        The name of the class.
+    
+    defaults : dict
+        The template default configuration dictionary, its keys
+        are the attributes (``__slots__``) of the class.
+    
+    schema : :class:`FarseerNMR.plot.base.plotvalidators.ConfigSchema`
+        The template config schema.
+    
+    module : str
+        The module where the class is defined, the template
+        ``__name__``, the class must be a module attribute with
+        the same name to be pickled.
+    
+    Returns
+    -------
+    type
+        A subclass of :class:`~PlotConfig`.
+    """
+    
+    return type(
+        name,
+        (PlotConfig,),
+        {
+            "__slots__": tuple(defaults),
+            "__module__": module,
+            "__doc__": (
+                f"Immutable configuration of the {schema.name} template.\n"
+                "\n"
+                "See :class:`FarseerNMR.plot.base.plotconfig.PlotConfig`."
+                ),
+            "_defaults": defaults,
+            "_schema": schema,
+            },
+        )
+
+
+def _freeze(value):
+    """
+    Immutable view of config values.
+    """
+    
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    
+    return value
+
+
+def _thaw(value, default):
+    """
+    Mutable copy of frozen config values, of the type of the default.
+    """
+    
+    if isinstance(value, MappingProxyType):
+        return {k: _thaw(v, None) for k, v in value.items()}
+    
+    if isinstance(default, list):
+        return [_thaw(v, None) for v in value]
+    
+    return value
+
+
+def _hashable(value):
+    
+    if isinstance(value, MappingProxyType):
+        return frozenset((k, _hashable(v)) for k, v in value.items())
+    
+    if isinstance(value, tuple):
+        return tuple(_hashable(v) for v in value)
+    
+    return value
+
+
+def _unpickle(cls, values):
+    
+    config = object.__new__(cls)
+    
+    with plotvalidators.trusted():
+        config._assign(values, {})
+    
+    return config
@@ -1,6 +1,9 @@
 """
 This module contains general functions that serve (or can serve)
 any/all of the plotting templates.
+
+matplotlib is imported when the first figure is drawn, not when
+plotting modules are imported, see :func:`~import_pyplot`.
 """
 # Copyright © 2017-2019 Farseer-NMR
 #
@@ -30,16 +33,86 @@ any/all of the plotting templates.
 #
 # Contributors to this file:
 #    - João M.C. Teixeira (https://github.com/joaomcteixeira)
+import functools
+import os
+import pickle
+import sys
 from math import ceil
 
-from matplotlib import pyplot as plt
+import numpy as np
 
 from FarseerNMR import logger
-from FarseerNMR.core import (core, wet)
+from FarseerNMR.core import (core, parallel, wet)
 
 log = logger.get_log(__name__)
 
 
+def import_pyplot():
+    """
+    Imports and returns :mod:`matplotlib.pyplot`.
+    
+    Plotting modules import pyplot with this function when it is
+    first needed, so that importing them, or the calculation
+    modules, does not import matplotlib.
+    
+    When running headless, without a display, and no backend has
+    been selected, with the MPLBACKEND environment variable or
+    :func:`matplotlib.use`, the non-interactive Agg backend is
+    selected, instead of probing the interactive backends.
+    
+    Returns
+    -------
+    module
+        :mod:`matplotlib.pyplot`
+    """
+    
+    try:
+        return sys.modules["matplotlib.pyplot"]
+    
+    except KeyError:
+        pass
+    
+    import matplotlib
+    
+    if _headless() and not(_backend_selected(matplotlib)):
+        matplotlib.use("Agg")
+        log.debug("Headless, using the Agg backend")
+    
+    from matplotlib import pyplot
+    
+    return pyplot
+
+
+def _backend_selected(matplotlib):
+    """
+    Whether a backend was selected, with the MPLBACKEND environment
+    variable, a matplotlibrc file or :func:`matplotlib.use`.
+    """
+    
+    if os.environ.get("MPLBACKEND"):
+        return True
+    
+    # not public API, reading rcParams["backend"] instead would
+    # resolve the default backend
+    try:
+        return matplotlib.rcParams._get_backend_or_none() is not None
+    
+    except AttributeError:
+        # matplotlib selects the backend itself
+        return True
+
+
+def _headless():
+    """
+    Whether there is no display to show figures.
+    """
+    
+    if not(sys.platform.startswith("linux")):
+        return False
+    
+    return not(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+
 def hex_to_RGB(hexx):
     """    
     Converts HEX color to RGB.
@@ -76,9 +149,7 @@ def hex_to_RGB(hexx):
     # IF STATEMENT not part of the original function,
     # added for the Farseer-NMR Project.
     if not(hexx.startswith("#") and len(hexx) == 7):
-        msg = "The input colour is not in HEX format."
-        wet = wet.generate("ERROR", msg, 27)
-        log.info(wet)
+        log.info(wet.render(27))
         sys.exit(core.abort_message)
     # Pass 16 to the integer function for change of base
     return [int(hexx[i:i + 2], 16) for i in range(1, 6, 2)]
@@ -257,12 +328,45 @@ def calc_real_fig_height(rows_page, numrows, fig_hgt):
     return (fig_hgt / rows_page) * numrows
 
 
+def calc_pages(num_subplots, rows_page, cols_page):
+    """
+    Distributes subplots over pages.
+    
+    Each page holds up to <rows_page> x <cols_page> subplots.
+    
+    Parameters
+    ----------
+    num_subplots : :obj:`int`
+        The total number of subplots
+    
+    rows_page: :obj:`int`
+        The desired number os subplot rows per figure's page.
+    
+    cols_page : :obj:`int`
+        The desired number os subplot columns per figure's page.
+    
+    Returns
+    -------
+    list of range
+        The indexes of the subplots in each page.
+    """
+    
+    per_page = rows_page * cols_page
+    
+    return [
+        range(start, min(start + per_page, num_subplots))
+        for start in range(0, num_subplots, per_page)
+        ]
+
+
 def draw_figure(
         num_subplots,
         rows_page,
         cols_page,
         fig_height,
         fig_width,
+        pool=None,
+        key=None,
         ):
     """
     Draws the matplotlib figure architecture.
@@ -287,6 +391,16 @@ def draw_figure(
     fig_width : :obj:`float`
         Width of the figure's page.
     
+    pool : :obj:`FarseerNMR.plot.base.figurepool.FigurePool`, optional
+        If given, the figure is taken from the pool.
+        Defaults to None.
+    
+    key : mapping, optional
+        The template configuration, identifies the pool figures
+        that can be reused, see
+        :meth:`FarseerNMR.plot.base.figurepool.FigurePool.draw_figure`.
+        Defaults to None.
+    
     Returns
     -------
     tuple
@@ -294,6 +408,16 @@ def draw_figure(
         matplotlib.pyplot.axes objects.
     """
     
+    if pool is not None:
+        return pool.draw_figure(
+            num_subplots,
+            rows_page,
+            cols_page,
+            fig_height,
+            fig_width,
+            key=key,
+            )
+    
     numrows = calc_num_rows(
         num_subplots,
         cols_page,
@@ -305,6 +429,8 @@ def draw_figure(
         fig_height,
         )
     
+    plt = import_pyplot()
+    
     # http://stackoverflow.com/questions/17210646/python-subplot-within-a-loop-first-panel-appears-in-wrong-position
     figure, axs = plt.subplots(
         nrows=numrows,
@@ -357,7 +483,8 @@ def clean_subplots(axes, num_subplots):
     Removes unsed subplots from figure.
     
     <axes> length is compared to <num_subplots> and elements
-    in <axes> that have not been used are removed from figure.
+    in <axes> that have not been used are removed from figure,
+    if not removed before.
     
     Parameters
     ----------
@@ -369,10 +496,12 @@ def clean_subplots(axes, num_subplots):
     
     len_axs = len(axes)
     
-    log.debug(f"Length Axes: {len_axs}")
+    log.debug("Length Axes: %s", len_axs)
     
     for i in range(num_subplots, len_axs):
-        axes[i].remove()
+        
+        if axes[i].get_figure() is not None:
+            axes[i].remove()
     
     return
 
@@ -427,6 +556,369 @@ def save_figure(
     
     figure.savefig(file_path, dpi=dpi)
     
-    log.info(f"**Saved plot figure** {file_path}\n")
+    log.info("**Saved plot figure** %s\n", file_path)
+    
+    return
+
+
+class PageWriter():
+    """
+    Writes the pages of a plot, one figure per page.
+    
+    Pages are written as soon as they are saved, so that each page
+    figure can be closed before the next page is drawn and memory
+    does not grow with the number of pages.
+    
+    Use as a context manager, which closes the output file.
+    
+    Parameters
+    ----------
+    file_path : :obj:`str`
+        File name path of the output file, see :func:`~save_figure`.
+    
+    paginate : :obj:`bool`, optional
+        If False, a single page is written to <file_path>, as
+        :func:`~save_figure`. If True, pages are written to a
+        multi-page PDF file if <file_path> extension is ".pdf",
+        otherwise, to numbered files, "figure_001.png",
+        "figure_002.png", ...
+        Defaults to False.
+    
+    Attributes
+    ----------
+    paths : list of str
+        The paths of the written files.
+    
+    num_pages : int
+        The number of written pages.
+    """
+    
+    def __init__(self, file_path, paginate=False):
+        
+        self.file_path = file_path
+        self.paginate = paginate
+        self.paths = []
+        self.num_pages = 0
+        self._pdf = None
+        
+        return
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self.close()
+        return False
+    
+    def save(self, figure, header="", header_fs=5, dpi=300):
+        """
+        Saves figure as the next page.
+        
+        Parameters are those of :func:`~save_figure`.
+        """
+        
+        path = self.page_path(self.num_pages)
+        
+        if path is None:
+            
+            if self._pdf is None:
+                from matplotlib.backends.backend_pdf import PdfPages
+                self._pdf = PdfPages(self.file_path)
+                self.paths.append(self.file_path)
+            
+            figure.text(
+                0.01,
+                0.01,
+                header,
+                fontsize=header_fs,
+                )
+            
+            self._pdf.savefig(figure, dpi=dpi)
+            self.num_pages += 1
+            
+            log.info(
+                "**Saved plot page** %s of %s\n",
+                self.num_pages,
+                self.file_path,
+                )
+            
+            return
+        
+        save_figure(
+            figure,
+            path,
+            header=header,
+            header_fs=header_fs,
+            dpi=dpi,
+            )
+        
+        self.paths.append(path)
+        self.num_pages += 1
+        
+        return
+    
+    def page_path(self, page):
+        """
+        Returns the file path of a page.
+        
+        Parameters
+        ----------
+        page : int
+            The page index, starting at 0.
+        
+        Returns
+        -------
+        str or None
+            None if pages are written to a multi-page PDF file.
+        """
+        
+        root, ext = os.path.splitext(self.file_path)
+        
+        if not(self.paginate):
+            return self.file_path
+        
+        if ext.lower() == ".pdf":
+            return None
+        
+        return f"{root}_{page + 1:03d}{ext}"
+    
+    def add(self, path):
+        """
+        Registers the next page, already saved to <path>, for
+        example, by a worker process.
+        """
+        
+        self.paths.append(path)
+        self.num_pages += 1
+        
+        return
+    
+    def close(self):
+        """
+        Closes the multi-page output file, if any.
+        """
+        
+        if self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
+        
+        return
+
+
+def render_pages(
+        draw_page,
+        pages,
+        writer,
+        plan,
+        *,
+        trace,
+        processes=1,
+        pool=None,
+        header="",
+        header_fs=5,
+        dpi=300,
+        **kwargs,
+        ):
+    """
+    Draws and saves the pages of a plot, in order.
+    
+    With several processes, pages are drawn in worker processes,
+    which read the arrays of the plan from shared memory
+    (:mod:`FarseerNMR.core.parallel`). Numbered image files are saved
+    by the workers, while pages of a multi-page PDF file are returned
+    to the current process and written in order. The output is the
+    same as with a single process.
+    
+    Parameters
+    ----------
+    draw_page : callable
+        Module level function that draws and returns the figure
+        of a page: ``draw_page(subplots, plan, page=page,
+        trace=trace, pool=pool, **kwargs)``, where ``subplots`` are
+        the indexes of the subplots in the page, and ``pool`` the
+        figure pool, or None.
+    
+    pages : list of range
+        The subplots of each page, see :func:`~calc_pages`.
+    
+    writer : :obj:`PageWriter`
+    
+    plan : :obj:`FarseerNMR.plot.base.renderplan.RenderPlan`
+        The render plan of the plot.
+    
+    trace : :obj:`FarseerNMR.logger.Trace`
+    
+    processes : int, optional
+        Number of worker processes. If 1, pages are drawn in the
+        current process.
+        Defaults to 1.
+    
+    pool : :obj:`FarseerNMR.plot.base.figurepool.FigurePool`, optional
+        Pool where figures of pages drawn in the current process
+        are taken from and released to, instead of being closed.
+        Defaults to None.
+    
+    header, header_fs, dpi
+        See :func:`~save_figure`.
+    
+    kwargs
+        Other named parameters of ``draw_page``.
+    """
+    
+    plt = import_pyplot()
+    
+    if processes == 1 or len(pages) < 2:
+        
+        for page, subplots in enumerate(pages):
+            
+            figure = draw_page(
+                subplots,
+                plan,
+                page=page,
+                trace=trace,
+                pool=pool,
+                **kwargs,
+                )
+            
+            with trace.stage("save_figure", page=page):
+                writer.save(
+                    figure,
+                    header=header,
+                    header_fs=header_fs,
+                    dpi=dpi,
+                    )
+            
+            # each page is freed before the next page is drawn
+            if pool is None:
+                plt.close(figure)
+            
+            else:
+                pool.release(figure)
+        
+        return
+    
+    shared = [
+        name
+        for name, array in plan.subplots.items()
+        if isinstance(array, np.ndarray) and not(array.dtype.hasobject)
+        ]
+    
+    # elements that can not be shared are pickled to the workers
+    plain = plan.replace(**dict.fromkeys(shared))
+    
+    paths = [writer.page_path(page) for page in range(len(pages))]
+    
+    log.debug("Rendering %s pages in %s processes", len(pages), processes)
+    
+    with parallel.shared_arrays(
+            *(plan.subplots[name] for name in shared)
+            ) as specs:
+        
+        worker = functools.partial(
+            _render_page,
+            draw_page,
+            dict(zip(shared, specs)),
+            plain,
+            kwargs,
+            trace=trace,
+            header=header,
+            header_fs=header_fs,
+            dpi=dpi,
+            )
+        
+        with parallel.process_pool(processes) as executor:
+            
+            results = executor.map(worker, range(len(pages)), pages, paths)
+            
+            for page, (path, result) in enumerate(zip(paths, results)):
+                
+                if result is None:
+                    writer.add(path)
+                    continue
+                
+                figure = pickle.loads(result)
+                
+                with trace.stage("save_figure", page=page):
+                    writer.save(
+                        figure,
+                        header=header,
+                        header_fs=header_fs,
+                        dpi=dpi,
+                        )
+                
+                plt.close(figure)
     
     return
+
+
+def _render_page(
+        draw_page,
+        specs,
+        plain,
+        kwargs,
+        page,
+        subplots,
+        path,
+        *,
+        trace,
+        header,
+        header_fs,
+        dpi,
+        ):
+    """
+    Worker of :func:`~render_pages`.
+    
+    Returns
+    -------
+    bytes or None
+        The pickled figure if <path> is None, otherwise, the figure
+        is saved to <path> and None is returned.
+    """
+    
+    plt = import_pyplot()
+    
+    arrays = {}
+    blocks = []
+    
+    try:
+        for name, spec in specs.items():
+            
+            shm, shared = parallel.attach_array(spec)
+            blocks.append(shm)
+            
+            # artists may keep references to the data,
+            # which would outlive the shared memory block
+            arrays[name] = shared.copy()
+            del shared
+    
+    finally:
+        for shm in blocks:
+            shm.close()
+    
+    figure = draw_page(
+        subplots,
+        plain.replace(**arrays),
+        page=page,
+        trace=trace,
+        pool=None,
+        **kwargs,
+        )
+    
+    if path is None:
+        result = pickle.dumps(figure)
+    
+    else:
+        with trace.stage("save_figure", page=page):
+            save_figure(
+                figure,
+                path,
+                header=header,
+                header_fs=header_fs,
+                dpi=dpi,
+                )
+        
+        result = None
+    
+    plt.close(figure)
+    
+    return result
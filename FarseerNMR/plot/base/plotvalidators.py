@@ -1,4 +1,8 @@
+import contextlib
 import sys
+import threading
+from collections import namedtuple
+
 import numpy as np
 
 from FarseerNMR import logger
@@ -7,6 +11,230 @@ from FarseerNMR.core import core, validate
 log = logger.get_log(__name__)
 
 
+_state = threading.local()
+
+Param = namedtuple("Param", ["name", "type", "check", "required"])
+"""
+A parameter of a :class:`~ParamSchema`.
+
+check is None, "shape", the shape must be equal to the reference
+shape, "len_x", the length must be equal to the reference
+shape[1], or "len_y", the length must be equal to shape[0].
+"""
+
+
+class ParamSchema():
+    """
+    Compiled validation schema of the parameters of a plotting template.
+    
+    Compiled once, when the template is imported, and validates all
+    the parameters in a single pass.
+    
+    Parameters
+    ----------
+    params : sequence of :obj:`Param`
+        The parameters, the first is the reference array, of
+        :obj:`np.ndarray` type.
+    
+    ndim : int, optional
+        The number of dimensions of the reference array.
+        Defaults to None, not validated.
+    """
+    
+    __slots__ = ("params", "reference", "ndim")
+    
+    def __init__(self, params, ndim=None):
+        
+        self.params = tuple(Param(*p) for p in params)
+        self.reference = self.params[0].name
+        self.ndim = ndim
+        
+        return
+    
+    def validate(self, *args):
+        """
+        Validates parameters, given in the order of the schema.
+        
+        Optional parameters are validated only if not None.
+        Does nothing inside a :func:`~trusted` block.
+        
+        Raises
+        ------
+        TypeError
+            If a parameter is not of the correct type.
+        
+        ValueError
+            If shapes or lengths differ from the reference.
+        """
+        
+        if getattr(_state, "trusted", False):
+            return
+        
+        reference = args[0]
+        
+        if not(isinstance(reference, np.ndarray)):
+            validate.validate_types((self.reference, reference, np.ndarray))
+        
+        if self.ndim is not None and reference.ndim != self.ndim:
+            msg_ = (
+                f"* DATA ERROR * VALUES must have {self.ndim} "
+                f"dimensions. {reference.ndim} given."
+                )
+            
+            log.info(msg_)
+            sys.exit(core.abort_message)
+        
+        for (name, type_, check, required), value in zip(self.params, args):
+            
+            if value is None and not(required):
+                continue
+            
+            if not(isinstance(value, type_)):
+                validate.validate_types((name, value, type_))
+            
+            if check is None:
+                continue
+            
+            # errors are raised by the non-compiled validators
+            elif check == "shape":
+                if value.shape != reference.shape:
+                    validate_shapes(reference, (name, value))
+            
+            elif check == "len_x":
+                if len(value) != reference.shape[1]:
+                    validate_len(reference[0, :], (name, value))
+            
+            elif check == "len_y":
+                if len(value) != reference.shape[0]:
+                    validate_len(reference[:, 0], (name, value))
+        
+        return
+
+
+class ConfigSchema():
+    """
+    Compiled validation schema of the config of a plotting template.
+    
+    The expected type of each key is read once from the reference
+    configuration dictionary, and only the user given keys are
+    validated.
+    
+    Parameters
+    ----------
+    ref : dict
+        The reference configuration dictionary.
+    
+    name : str, optional
+        The name of the dict for Error identification.
+    """
+    
+    __slots__ = ("types", "name")
+    
+    def __init__(self, ref, name="some config"):
+        
+        self.types = {key: type(value) for key, value in ref.items()}
+        self.name = name
+        
+        return
+    
+    def validate(self, kwargs):
+        """
+        Validates the types of the user given config keys.
+        
+        Keys not in the reference are ignored.
+        Does nothing inside a :func:`~trusted` block.
+        
+        Raises
+        ------
+        TypeError
+            If a value is not of the reference type.
+        """
+        
+        if getattr(_state, "trusted", False):
+            return
+        
+        types = self.types
+        
+        for key, value in kwargs.items():
+            
+            expected = types.get(key)
+            
+            if expected is not None and type(value) is not expected:
+                msg = (
+                    f"Argument '{key}' in {self.name} Plot is not of "
+                    f"correct type, is {type(value)}, should be {expected}."
+                    )
+                log.info(msg)
+                raise TypeError(msg)
+        
+        log.debug("Parameters type for %s evaluated successfully", self.name)
+        
+        return
+
+
+@contextlib.contextmanager
+def trusted():
+    """
+    Context manager where plotting parameters and config are not
+    validated, in the current thread.
+    
+    For pipelines that already validated their data sets,
+    for example, plotting the same data with different templates
+    or many data sets of the same shapes:
+    
+    >>> with plotvalidators.trusted():
+    ...     for values in data_sets:
+    ...         barplotcompacted.plot(values, labels)
+    
+    Invalid parameters are not detected and may fail later with
+    less informative errors.
+    """
+    
+    previous = getattr(_state, "trusted", False)
+    _state.trusted = True
+    
+    try:
+        yield
+    
+    finally:
+        _state.trusted = previous
+    
+    return
+
+
+barplot_params = ParamSchema(
+    (
+        ("values", np.ndarray, None, True),
+        ("labels", np.ndarray, "len_x", True),
+        ("header", str, None, False),
+        ("suptitles", list, "len_y", False),
+        ("letter_code", np.ndarray, "len_x", False),
+        ("peak_status", np.ndarray, "shape", False),
+        ("details", np.ndarray, "shape", False),
+        ("tag_position", np.ndarray, "shape", False),
+        ("theo_pre", np.ndarray, "shape", False),
+        ),
+    ndim=2,
+    )
+"""
+Parameters schema of the Bar Plot templates.
+"""
+
+subplot_per_residue_params = ParamSchema(
+    (
+        ("values", np.ndarray, None, True),
+        ("header", str, None, False),
+        ("suptitles", list, "len_y", False),
+        ("peak_status", np.ndarray, "shape", False),
+        ("fitting", np.ndarray, "len_y", False),
+        ("fitting_info", np.ndarray, "len_y", False),
+        ),
+    )
+"""
+Parameters schema of the templates with a subplot per residue.
+"""
+
+
 def validate_barplot_params(
         values,
         labels,
@@ -18,55 +246,22 @@ def validate_barplot_params(
         tag_position,
         theo_pre,
         ):
+    """
+    Validates the parameters of the Bar Plot templates,
+    see :const:`~barplot_params`.
+    """
     
-    if not(values.ndim == 2):
-        msg_ = (
-            "* DATA ERROR * VALUES must have 2 dimensions. "
-            f"{values.ndim} given."
-            )
-        
-        log.info(msg_)
-        sys.exit(core.abort_message)
-    
-    # validates type of positional arguments
-    args2validate = [
-        ("values", values, np.ndarray),
-        ("label", labels, np.ndarray),
-        ]
-    
-    [validate.validate_types(t) for t in args2validate]
-    
-    # validates type of optional named arguments
-    args2validate = [
-        ("header", header, str),
-        ("suptitles", suptitles, list),
-        ("letter_code", letter_code, np.ndarray),
-        ("peak_status", peak_status, np.ndarray),
-        ("details", details, np.ndarray),
-        ("tag_position", tag_position, np.ndarray),
-        ("theo_pre", theo_pre, np.ndarray),
-        ]
-    
-    [validate.validate_types(t) for t in args2validate if t[1] is not None]
-    
-    # validates shapes and lenghts of arguments
-    args2validate = [
-        ("peak_status", peak_status),
-        ("details", details),
-        ("tag_position", tag_position),
-        ("theo_pre", theo_pre),
-        ]
-    
-    [validate_shapes(values, t) for t in args2validate if t[1] is not None]
-    
-    args2validate = [
-        ("labels", labels),
-        ("letter_code", letter_code),
-        ]
-    
-    [validate_len(values[0, :], t) for t in args2validate if t[1] is not None]
-    
-    validate_len(values[:, 0], ("suptitles", suptitles))
+    barplot_params.validate(
+        values,
+        labels,
+        header,
+        suptitles,
+        letter_code,
+        peak_status,
+        details,
+        tag_position,
+        theo_pre,
+        )
     
     return
 
@@ -79,43 +274,23 @@ def validate_subplot_per_residue(
         fitting,
         fitting_info,
         ):
+    """
+    Validates the parameters of the templates with a subplot per
+    residue, see :const:`~subplot_per_residue_params`.
+    """
     
-    # validates type of positional arguments
-    args2validate = [
-        ("values", values, np.ndarray),
-        ]
-    
-    [validate.validate_types(t) for t in args2validate]
-    
-    # validates type of named optional arguments
-    args2validate = [
-        ("header", header, str),
-        ("suptitles", suptitles, list),
-        ("peak_status", peak_status, np.ndarray),
-        ("fitting", fitting, np.ndarray),
-        ("fitting_info", fitting_info, np.ndarray),
-        ]
-    
-    [validate.validate_types(t)
-        for t in args2validate if t[1] is not None]
-    
-    # validates shapes and lenghts
-    args2validate = [
-        ("peak_status", peak_status),
-        ]
-    
-    [validate_shapes(values, t) for t in args2validate if t[1] is not None]
-    
-    args2validate = [
-        ("suptitles", suptitles),
-        ("fitting", fitting),
-        ("fitting_info", fitting_info)
-        ]
-    
-    [validate_len(values[:, 0], t) for t in args2validate if t[1] is not None]
+    subplot_per_residue_params.validate(
+        values,
+        header,
+        suptitles,
+        peak_status,
+        fitting,
+        fitting_info,
+        )
     
     return
 
+
 def validate_config(ref, target, name="some config"):
     """
     Validate config dictionary for DeltaPRE Heat Map Plot template.
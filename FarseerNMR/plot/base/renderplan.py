@@ -0,0 +1,295 @@
+"""
+Render plans of the plotting templates.
+
+A render plan holds what a template computes from the data before
+drawing: the values of the bars, their colours, the thresholds, the
+text marks, the tick positions, etc. Templates compute the plan of
+all the subplots at once, with their ``calc_plan()`` function, and
+draw it with a renderer that only translates the plan and the style
+configuration keys to matplotlib calls.
+
+Plans contain no matplotlib objects. They can be computed without
+drawing, compared, diffed between runs and serialized to JSON:
+
+>>> plan = barplotcompacted.calc_plan(values, labels)
+>>> plan.subplot(0)["thresholds"]
+0.12
+>>> with open("plan.json", "w") as fout:
+...     json.dump(plan.to_dict(), fout)
+
+>>> with open("plan.json") as fin:
+...     previous = renderplan.RenderPlan.from_dict(json.load(fin))
+>>> plan.diff(previous)
+{'thresholds': [2], 'ydata': [2]}
+"""
+# Copyright © 2017-2019 Farseer-NMR
+#
+# @Original Article: http://bit.ly/farseerjbnmr
+# @ResearchGate https://goo.gl/z8dPJU
+# @Twitter https://twitter.com/farseer_nmr
+# @GitHub: http://bit.ly/farseer-nmr
+# @Mailist: http://bit.ly/fs_maillist
+#
+# This file is part of the Farseer-NMR project.
+#
+# Farseer-NMR is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Farseer-NMR is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Farseer-NMR. If not, see <http://www.gnu.org/licenses/>.
+#
+# For full list of author contributors visit:
+#    https://github.com/Farseer-NMR/FarSeer-NMR/wiki/Citing
+#
+# Contributors to this file:
+#    - João M.C. Teixeira (https://github.com/joaomcteixeira)
+import numpy as np
+
+from FarseerNMR import logger
+
+log = logger.get_log(__name__)
+
+_missing = object()
+
+
+class RenderPlan():
+    """
+    The elements of a plot, computed by a template, to be drawn.
+    
+    Parameters
+    ----------
+    template : :obj:`str`
+        The name of the template module.
+    
+    figure : :obj:`dict`, optional
+        Elements shared by all the subplots, computed once per
+        figure, for example, the tick positions.
+    
+    subplots : :obj:`dict`, optional
+        Elements of each subplot, arrays whose first axis is the
+        subplot, or None for elements that are not drawn.
+    
+    Raises
+    ------
+    ValueError
+        If the arrays in <subplots> have different lengths.
+    """
+    
+    def __init__(self, template, figure=None, subplots=None):
+        
+        self.template = template
+        self.figure = dict(figure or {})
+        self.subplots = dict(subplots or {})
+        
+        lengths = {
+            len(array)
+            for array in self.subplots.values()
+            if array is not None
+            }
+        
+        if len(lengths) > 1:
+            raise ValueError(
+                "subplot elements should have the same length, "
+                f"got lengths {sorted(lengths)}"
+                )
+        
+        self.num_subplots = lengths.pop() if lengths else 0
+        
+        return
+    
+    def __len__(self):
+        return self.num_subplots
+    
+    def __eq__(self, other):
+        
+        if not(isinstance(other, RenderPlan)):
+            return NotImplemented
+        
+        return self.template == other.template and not(self.diff(other))
+    
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}("
+            f"template={self.template!r}, "
+            f"figure={sorted(self.figure)}, "
+            f"subplots={sorted(self.subplots)}, "
+            f"num_subplots={self.num_subplots})"
+            )
+    
+    def subplot(self, i):
+        """
+        Returns the elements of subplot <i>.
+        
+        Returns
+        -------
+        :obj:`dict`
+            Element name: the element of the subplot, or None.
+        """
+        return {
+            name: None if array is None else array[i]
+            for name, array in self.subplots.items()
+            }
+    
+    def replace(self, **subplots):
+        """
+        Returns a new plan with subplot elements replaced.
+        """
+        return RenderPlan(
+            self.template,
+            self.figure,
+            {**self.subplots, **subplots},
+            )
+    
+    def diff(self, other):
+        """
+        Compares the elements of two plans.
+        
+        Parameters
+        ----------
+        other : :obj:`RenderPlan`
+        
+        Returns
+        -------
+        :obj:`dict`
+            Name of each differing element: the indexes of the
+            differing subplots, or None for figure elements and for
+            elements that differ in shape or are missing in a plan.
+            Equal plans give an empty dictionary.
+        """
+        
+        differences = {}
+        
+        for name in set(self.figure) | set(other.figure):
+            
+            if not(_equal(
+                    self.figure.get(name, _missing),
+                    other.figure.get(name, _missing),
+                    )):
+                differences[name] = None
+        
+        for name in set(self.subplots) | set(other.subplots):
+            
+            a = self.subplots.get(name, _missing)
+            b = other.subplots.get(name, _missing)
+            
+            if a is None and b is None:
+                continue
+            
+            try:
+                rows = _differing_rows(a, b)
+            
+            except (TypeError, ValueError):
+                differences[name] = None
+                continue
+            
+            if rows:
+                differences[name] = rows
+        
+        return dict(sorted(differences.items()))
+    
+    def to_dict(self):
+        """
+        Converts the plan to a dictionary of built-in types,
+        that can be serialized to JSON.
+        
+        Returns
+        -------
+        :obj:`dict`
+            See :meth:`~from_dict`.
+        """
+        return {
+            "template": self.template,
+            "figure": {
+                name: _to_builtin(element)
+                for name, element in self.figure.items()
+                },
+            "subplots": {
+                name: _to_builtin(array)
+                for name, array in self.subplots.items()
+                },
+            }
+    
+    @classmethod
+    def from_dict(cls, d):
+        """
+        Creates a plan from a dictionary given by :meth:`~to_dict`.
+        
+        Subplot elements are converted to arrays, figure elements
+        are kept as given.
+        """
+        return cls(
+            d["template"],
+            d["figure"],
+            {
+                name: None if array is None else np.asarray(array)
+                for name, array in d["subplots"].items()
+                },
+            )
+
+
+def _equal(a, b):
+    """
+    Compares two elements, NaN values are equal.
+    """
+    
+    if a is _missing or b is _missing:
+        return a is b
+    
+    try:
+        return np.array_equal(a, b, equal_nan=True)
+    
+    except TypeError:
+        return np.array_equal(a, b)
+
+
+def _differing_rows(a, b):
+    """
+    Indexes of the rows of two arrays that differ.
+    
+    Raises
+    ------
+    ValueError
+        If shapes of a and b differ.
+    
+    TypeError
+        If a or b are missing.
+    """
+    
+    if a is _missing or b is _missing or a is None or b is None:
+        raise TypeError("element missing")
+    
+    a = np.asarray(a)
+    b = np.asarray(b)
+    
+    if a.shape != b.shape:
+        raise ValueError("shapes differ")
+    
+    different = np.asarray(a != b)
+    
+    if a.dtype.kind in "fc" and b.dtype.kind in "fc":
+        different &= ~(np.isnan(a) & np.isnan(b))
+    
+    different = different.reshape(len(a), -1).any(axis=1)
+    
+    return np.flatnonzero(different).tolist()
+
+
+def _to_builtin(element):
+    """
+    Converts arrays and numpy scalars to built-in types.
+    """
+    
+    if isinstance(element, (np.ndarray, np.generic)):
+        return element.tolist()
+    
+    if isinstance(element, (list, tuple)):
+        return [_to_builtin(e) for e in element]
+    
+    return element
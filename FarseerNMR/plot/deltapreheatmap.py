@@ -0,0 +1,597 @@
+"""
+The DeltaPRE Heat Map template draws the complete data set as a single
+heat map.
+
+Each row of the heat map represents a datapoint in the experimental
+series, i.e., a peaklist, and each column a residue. The value of the
+parameter is represented by the colour of each cell.
+
+The whole (series x residues) matrix is drawn as one image artist,
+hence, rendering time is nearly independent of the number of residues,
+contrary to the Bar Plot templates, which draw one artist per bar.
+Large data sets, thousands of residues, can be represented in a
+single figure.
+
+The position of the paramagnetic tag of each series is marked on the
+heat map and on a dedicated strip above it.
+
+The configuration dictionary provided with this module can be used
+to tweak the plotting style and details - see :func:`~get_config`.
+
+.. note::
+    
+    The implementation of plot style ``kwargs`` as a dictionary apart from
+    the :func:`~plot` parameters is part of the conscious design of the
+    Farseer-NMR plotting modules.
+"""
+# Copyright © 2017-2019 Farseer-NMR
+#
+# @Original Article: http://bit.ly/farseerjbnmr
+# @ResearchGate https://goo.gl/z8dPJU
+# @Twitter https://twitter.com/farseer_nmr
+# @GitHub: http://bit.ly/farseer-nmr
+# @Mailist: http://bit.ly/fs_maillist
+#
+# This file is part of the Farseer-NMR project.
+#
+# Farseer-NMR is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Farseer-NMR is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Farseer-NMR. If not, see <http://www.gnu.org/licenses/>.
+#
+# For full list of author contributors visit:
+#    https://github.com/Farseer-NMR/FarSeer-NMR/wiki/Citing
+#
+# Contributors to this file:
+#    - João M.C. Teixeira (https://github.com/joaomcteixeira)
+import json
+from math import ceil
+
+import numpy as np
+
+from FarseerNMR import logger
+from FarseerNMR.plot.base import (
+    plottingbase,
+    experimentplotbase,
+    plotvalidators,
+    plotconfig,
+    renderplan,
+    )
+
+log = logger.get_log(__name__)
+
+_default_config = {
+    "x_label": "Residues",
+    "y_label": "",
+    
+    "title": "",
+    "title_fn": "Arial",
+    "title_fs": 8,
+    "title_weight": "normal",
+    
+    "x_label_fn": "Arial",
+    "x_label_fs": 8,
+    "x_label_pad": 2,
+    "x_label_weight": "bold",
+    
+    "y_label_fn": "Arial",
+    "y_label_fs": 8,
+    "y_label_pad": 3,
+    "y_label_weight": "bold",
+    
+    "x_ticks_max": 50,
+    "x_ticks_pad": 2,
+    "x_ticks_len": 2,
+    "x_ticks_fn": "monospace",
+    "x_ticks_fs": 5,
+    "x_ticks_rot": 90,
+    "x_ticks_weight": "normal",
+    
+    "y_ticks_fn": "Arial",
+    "y_ticks_fs": 5,
+    "y_ticks_pad": 1,
+    "y_ticks_len": 2,
+    "y_ticks_weight": "normal",
+    
+    "colormap": "Greys",
+    "color_lims": (0.0, 1.0),
+    "missing_color": "lightgrey",
+    "interpolation": "antialiased",
+    
+    "colorbar_flag": True,
+    "colorbar_label": "",
+    "colorbar_fs": 6,
+    
+    "tag_id": "*",
+    "tag_strip_flag": True,
+    "tag_marker": "v",
+    "tag_marker_color": "red",
+    "tag_marker_size": 2.0,
+    "tag_cartoon_color": "black",
+    "tag_cartoon_ls": "-",
+    "tag_cartoon_lw": 1.0,
+    
+    "figure_header": "No header provided",
+    "header_fontsize": 5,
+    
+    "figure_path": "deltapre_heatmap.pdf",
+    "figure_dpi": 300,
+    "fig_height": 5.0,
+    "fig_width": 8.69,
+    }
+
+_config_schema = plotvalidators.ConfigSchema(
+    _default_config,
+    name="DeltaPRE Heat Map",
+    )
+
+Config = plotconfig.make_config_class(
+    "Config",
+    _default_config,
+    _config_schema,
+    __name__,
+    )
+"""
+Immutable and hashable configuration of the template,
+see :mod:`FarseerNMR.plot.base.plotconfig`.
+"""
+
+
+def get_config():
+    """
+    Returns the module's default config dictionary.
+    """
+    return _default_config
+
+
+def print_config(indent=4, sort_keys=True):
+    """
+    Nicely prints module's default config.
+    
+    Parameters
+    ----------
+    indent : int, optional
+        Indentation for sublevels. Defaults to 4.
+    
+    sort_keys : bool, optional
+        Sorts config keys. Default to True.
+    """
+    
+    if not(isinstance(indent, int)):
+        raise ValueError("indent should be int type")
+    
+    if not(isinstance(sort_keys, bool)):
+        raise ValueError("sort_keys should be bool type")
+    
+    print(json.dumps(_default_config, indent=indent, sort_keys=sort_keys))
+    
+    return
+
+
+def plot(
+        values,
+        labels,
+        header="",
+        suptitles=None,
+        tag_position=None,
+        config=None,
+        cache=None,
+        **kwargs,
+        ):
+    """
+    Plots according to the DeltaPRE Heat Map Template.
+    
+    Parameters
+    ----------
+    values : np.ndarray, shape=(y,x), dtype=float
+        Where X (axis=1) is the data to plot for each residue,
+        Y (axis=0) is the evolution of that data along the
+        series. NaN values are represented with ``missing_color``.
+    
+    labels : np.ndarray, shape=(x,), dtype=str
+        Residue labels which are drawn as xtick labels. At most
+        ``x_ticks_max`` labels are drawn, evenly spaced.
+    
+    header : str, optional
+        Multi-line string with additional human-readable notes.
+        Header will be written in the output figure file in a dedicated
+        blank space.
+    
+    suptitles : list of str, optional
+        Titles of each row, drawn as ytick labels,
+        length must be equal to values.shape[0].
+        Defaults to a range of values.shape[0], ["0", "1", "2", ...
+    
+    tag_position : np.ndarray, shape=(y,x), dtype=str, optional
+        Null values where tag not present, ``tag_id`` character denotes
+        the position of the of the paramagnetic tag.
+        If None provided, Tag ticks are not drawn.
+        Defaults to None.
+    
+    config : :obj:`Config`, optional
+        An immutable configuration of the template, validated when
+        created, which is not merged nor validated again. ``kwargs``,
+        if given, replace its values.
+        Defaults to None, the default configuration updated with
+        ``kwargs``.
+    
+    cache : :obj:`FarseerNMR.plot.base.outputcache.OutputCache`, optional
+        A cache of output files. If it holds the files of a plot of
+        the same data and configuration, they are written to the
+        output path and the plot is not rendered,
+        see :mod:`FarseerNMR.plot.base.outputcache`.
+        Defaults to None, the plot is always rendered.
+    
+    **kwargs :
+        Plot details (colors, shapes, fonts, ...) can be highly
+        configured through additional named parameters.
+        
+        The available options for named parameters are stored in a
+        default configuration dictionary that can be obtained through
+        the module's :func:`~get_config` (see also :func:`~print_config`).
+        
+        Example:
+        
+        >>> plot(some_values, some_labels, figure_path="super_plot.pdf")
+    """
+    
+    log.debug("* Starting deltapreheatmap")
+    
+    if suptitles is None:
+        suptitles = [str(i) for i in range(values.shape[0])]
+    
+    trace = logger.Trace(__name__, shapes={"values": values.shape})
+    
+    with trace.stage("validation"):
+        
+        plotvalidators.validate_barplot_params(
+            values,
+            labels,
+            header,
+            suptitles,
+            None,
+            None,
+            None,
+            tag_position,
+            None,
+            )
+        
+        config = _resolve_config(config, kwargs)
+    
+    c = config
+    
+    trace.update(path=c["figure_path"])
+    
+    if cache is not None:
+        
+        with trace.stage("cache"):
+            cache_key = cache.key(
+                __name__,
+                c,
+                values=values,
+                labels=labels,
+                header=header,
+                suptitles=suptitles,
+                tag_position=tag_position,
+                )
+            cached = cache.fetch(cache_key, c)
+        
+        if cached is not None:
+            trace.finish()
+            return
+    
+    with trace.stage("plan"):
+        render_plan = _calc_plan(values, labels, suptitles, tag_position, c)
+    
+    figure = _draw(render_plan, c, trace)
+    
+    with trace.stage("save_figure"):
+        plottingbase.save_figure(
+            figure,
+            c["figure_path"],
+            header=header,
+            header_fs=c["header_fontsize"],
+            dpi=c["figure_dpi"],
+            )
+    
+    plottingbase.import_pyplot().close(figure)
+    
+    if cache is not None:
+        cache.store(cache_key, [c["figure_path"]])
+    
+    trace.finish()
+    
+    return
+
+
+def calc_plan(
+        values,
+        labels,
+        suptitles=None,
+        tag_position=None,
+        config=None,
+        **kwargs,
+        ):
+    """
+    Computes the render plan of :func:`~plot` without drawing,
+    see :mod:`FarseerNMR.plot.base.renderplan`.
+    
+    Parameters
+    ----------
+    See :func:`~plot`.
+    
+    Returns
+    -------
+    :obj:`FarseerNMR.plot.base.renderplan.RenderPlan`
+        A plan without subplot elements, the heat map is a single
+        subplot. Figure elements: ``values``, ``extent``, ``xticks``,
+        ``xticks_labels``, ``yticks``, ``yticks_labels``,
+        ``tag_rows``, ``tag_cols`` and ``tag_strip``.
+    """
+    
+    if suptitles is None:
+        suptitles = [str(i) for i in range(values.shape[0])]
+    
+    plotvalidators.validate_barplot_params(
+        values,
+        labels,
+        "",
+        suptitles,
+        None,
+        None,
+        None,
+        tag_position,
+        None,
+        )
+    
+    return _calc_plan(
+        values,
+        labels,
+        suptitles,
+        tag_position,
+        _resolve_config(config, kwargs),
+        )
+
+
+def _resolve_config(config, kwargs):
+    """
+    Returns the configuration of a plot, validated.
+    """
+    
+    if config is None:
+        
+        _config_schema.validate(kwargs)
+        
+        # assigned config
+        return {**_default_config, **kwargs}
+    
+    if not(isinstance(config, Config)):
+        raise TypeError("config should be a Config instance")
+    
+    if kwargs:
+        return config.replace(**kwargs)
+    
+    return config
+
+
+def _calc_plan(values, labels, suptitles, tag_position, c):
+    """
+    Computes the elements of the heat map.
+    """
+    
+    num_series, num_residues = values.shape
+    log.debug("Heat map shape: %s", values.shape)
+    
+    # at most x_ticks_max labels, evenly spaced
+    step = max(1, ceil(num_residues / c["x_ticks_max"]))
+    xticks = np.arange(0, num_residues, step)
+    
+    if tag_position is not None:
+        tag_rows, tag_cols = np.nonzero(tag_position == c["tag_id"])
+        log.debug("Tags found: %s", len(tag_rows))
+    
+    else:
+        tag_rows, tag_cols = None, None
+    
+    if tag_position is not None and c["tag_strip_flag"]:
+        tag_strip = np.unique(tag_cols)
+    
+    else:
+        tag_strip = None
+    
+    return renderplan.RenderPlan(
+        __name__,
+        figure={
+            "values": values,
+            "extent": (-0.5, num_residues - 0.5, num_series - 0.5, -0.5),
+            "xticks": xticks,
+            "xticks_labels": labels[xticks],
+            "yticks": np.arange(num_series),
+            "yticks_labels": list(suptitles),
+            "tag_rows": tag_rows,
+            "tag_cols": tag_cols,
+            "tag_strip": tag_strip,
+            },
+        )
+
+
+def _draw(plan, c, trace):
+    """
+    Draws the figure of the plan.
+    """
+    
+    f = plan.figure
+    draw_strip = f["tag_strip"] is not None
+    
+    plt = plottingbase.import_pyplot()
+    
+    with trace.stage("draw_figure"):
+        figure, axs = plt.subplots(
+            nrows=2,
+            ncols=1,
+            figsize=(c["fig_width"], c["fig_height"]),
+            sharex=True,
+            gridspec_kw={
+                "height_ratios": [1, 20],
+                "hspace": 0.02,
+                },
+            )
+    
+    tag_ax, ax = axs
+    
+    ###################
+    # Draws the heat map, a single artist
+    
+    with trace.stage("heatmap"):
+        
+        cmap = plt.get_cmap(c["colormap"]).with_extremes(
+            bad=c["missing_color"],
+            )
+        
+        image = ax.imshow(
+            np.ma.masked_invalid(f["values"]),
+            cmap=cmap,
+            vmin=c["color_lims"][0],
+            vmax=c["color_lims"][1],
+            aspect="auto",
+            interpolation=c["interpolation"],
+            origin="upper",
+            extent=f["extent"],
+            )
+    
+    log.debug("Heat map drawn: OK")
+    
+    ###################
+    # Configures X ticks and X ticks labels
+    
+    ax.set_xticks(f["xticks"])
+    ax.set_xticklabels(
+        f["xticks_labels"],
+        fontname=c["x_ticks_fn"],
+        fontsize=c["x_ticks_fs"],
+        fontweight=c["x_ticks_weight"],
+        rotation=c["x_ticks_rot"],
+        )
+    
+    ax.tick_params(
+        axis='x',
+        pad=c["x_ticks_pad"],
+        length=c["x_ticks_len"],
+        direction='out',
+        )
+    
+    ax.set_xlabel(
+        c["x_label"],
+        fontname=c["x_label_fn"],
+        fontsize=c["x_label_fs"],
+        labelpad=c["x_label_pad"],
+        weight=c["x_label_weight"],
+        )
+    log.debug("Configured X axis: OK")
+    
+    ###################
+    # Configures Y ticks and Y ticks labels
+    
+    ax.set_yticks(f["yticks"])
+    ax.set_yticklabels(
+        f["yticks_labels"],
+        fontname=c["y_ticks_fn"],
+        fontsize=c["y_ticks_fs"],
+        fontweight=c["y_ticks_weight"],
+        )
+    
+    ax.tick_params(
+        axis='y',
+        pad=c["y_ticks_pad"],
+        length=c["y_ticks_len"],
+        direction='out',
+        )
+    
+    ax.set_ylabel(
+        c["y_label"],
+        fontname=c["y_label_fn"],
+        fontsize=c["y_label_fs"],
+        labelpad=c["y_label_pad"],
+        weight=c["y_label_weight"],
+        )
+    log.debug("Configured Y axis: OK")
+    
+    ###################
+    # Paramagnetic tags
+    
+    if f["tag_rows"] is not None:
+        
+        # a single artist for all tags
+        ax.plot(
+            f["tag_cols"],
+            f["tag_rows"],
+            linestyle="none",
+            marker=c["tag_marker"],
+            markersize=c["tag_marker_size"],
+            color=c["tag_marker_color"],
+            zorder=10,
+            )
+        
+        if draw_strip:
+            experimentplotbase.draw_paramagnetic_tag(
+                tag_ax,
+                f["tag_strip"],
+                0,
+                plottype='heatmap',
+                tag_cartoon_color=c["tag_cartoon_color"],
+                tag_cartoon_ls=c["tag_cartoon_ls"],
+                tag_cartoon_lw=c["tag_cartoon_lw"],
+                )
+    
+    if draw_strip:
+        tag_ax.set_ylim(0, 2)
+        tag_ax.set_axis_off()
+        tag_ax.set_title(
+            c["title"],
+            fontname=c["title_fn"],
+            fontsize=c["title_fs"],
+            weight=c["title_weight"],
+            )
+    
+    else:
+        tag_ax.remove()
+        ax.set_title(
+            c["title"],
+            fontname=c["title_fn"],
+            fontsize=c["title_fs"],
+            weight=c["title_weight"],
+            )
+    
+    ###################
+    # Colorbar
+    
+    if c["colorbar_flag"]:
+        colorbar = figure.colorbar(
+            image,
+            ax=axs if draw_strip else ax,
+            fraction=0.03,
+            pad=0.01,
+            )
+        colorbar.ax.tick_params(labelsize=c["colorbar_fs"])
+        colorbar.set_label(c["colorbar_label"], fontsize=c["colorbar_fs"])
+        log.debug("Colorbar: OK")
+    
+    return figure
+
+
+if __name__ == "__main__":
+    
+    from FarseerNMR.plot.examples import deltapreheatmapxmpls
+    
+    name = "deltapreheatmap"
+    
+    for example in deltapreheatmapxmpls.list_of_examples:
+        example(plot, name)
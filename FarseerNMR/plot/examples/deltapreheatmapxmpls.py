@@ -0,0 +1,132 @@
+"""
+This module generates examples for the DeltaPRE Heat Map.
+
+Use this module to create plots that exploit plotting templates features.
+"""
+# Copyright © 2017-2019 Farseer-NMR
+#
+# @Original Article: http://bit.ly/farseerjbnmr
+# @ResearchGate https://goo.gl/z8dPJU
+# @Twitter https://twitter.com/farseer_nmr
+# @GitHub: http://bit.ly/farseer-nmr
+# @Mailist: http://bit.ly/fs_maillist
+#
+# This file is part of the Farseer-NMR project.
+#
+# Farseer-NMR is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Farseer-NMR is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Farseer-NMR. If not, see <http://www.gnu.org/licenses/>.
+#
+# For full list of author contributors visit:
+#    https://github.com/Farseer-NMR/FarSeer-NMR/wiki/Citing
+#
+# Contributors to this file:
+#    - João M.C. Teixeira (https://github.com/joaomcteixeira)
+
+import numpy as np
+
+from FarseerNMR.calc import pre
+from FarseerNMR.plot import deltapreheatmap
+
+ext = "png"
+
+c = {
+    "colorbar_label": "ΔPRE",
+    "figure_dpi": 200,
+    }
+
+
+def make_data(shape, seed=0):
+    """
+    Generates theoretical DeltaPRE data for a linear chain with the
+    tag of each series moving along the sequence.
+    """
+    
+    rng = np.random.default_rng(seed)
+    
+    num_series, num_residues = shape
+    
+    amides = np.zeros((num_residues, 3))
+    amides[:, 0] = np.arange(num_residues) * 3.8
+    
+    tag_index = np.linspace(0, num_residues - 1, num_series).astype(int)
+    tags = amides[tag_index] + (0, 5, 0)
+    
+    theo_pre = pre.calc_theo_pre(pre.calc_distances(tags, amides))
+    
+    values = 1 - theo_pre * rng.uniform(0.9, 1.1, size=shape)
+    labels = np.arange(1, num_residues + 1).astype(str)
+    suptitles = [f"tag {i + 1}" for i in tag_index]
+    tag_position = pre.calc_tag_position(tag_index, shape)
+    
+    return values, labels, suptitles, tag_position
+
+
+def example1(plot, name):
+    
+    shape = (7, 80)
+    name = f"{name}_1.{ext}"
+    
+    values, labels, suptitles, tag_position = make_data(shape)
+    
+    values[2, 30:35] = np.nan
+    
+    plot(
+        values,
+        labels,
+        suptitles=suptitles,
+        tag_position=tag_position,
+        header="1",
+        figure_path=name,
+        **c
+        )
+    
+    return
+
+
+def example2(plot, name):
+    
+    shape = (100, 20000)
+    name = f"{name}_2.{ext}"
+    
+    values, labels, suptitles, tag_position = make_data(shape)
+    
+    plot(
+        values,
+        labels,
+        suptitles=suptitles,
+        tag_position=tag_position,
+        header="2",
+        figure_path=name,
+        **{**c, **{"y_ticks_fs": 2}}
+        )
+    
+    return
+
+
+def run():
+    
+    for example in list_of_examples:
+        example(deltapreheatmap.plot, "deltapreheatmap")
+    
+    return
+
+
+list_of_examples = [
+    example1,
+    example2,
+    ]
+
+
+if __name__ == "__main__":
+    
+    run()
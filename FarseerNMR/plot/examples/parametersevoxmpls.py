@@ -97,6 +97,33 @@ def example1(plot, name):
     return
 
 
+def example2(plot, name):
+    
+    shape = (50, 8)  # 50 residues, 8 data points
+    name = f"{name}_2.{ext}"
+    
+    values, suptitles, peak_status, fitting, \
+        fitting_info, = make_data(shape)
+    
+    titration_x_values = [0, 0.5, 1, 2, 4, 8, 16, 32]
+    
+    # hyperbolic binding curves with Kd from 1 to 10
+    kd = np.linspace(1, 10, shape[0])[:, np.newaxis]
+    values = 0.2 * np.array(titration_x_values) / (kd + titration_x_values)
+    
+    plot(
+        values,
+        suptitles=suptitles,
+        header="2",
+        figure_path=name,
+        perform_resevo_fitting=True,
+        titration_x_values=titration_x_values,
+        **c
+        )
+    
+    return
+
+
 def run():
     
     for module, name in zip(list_of_templates, list_of_names):
@@ -110,6 +137,7 @@ def run():
 
 list_of_examples = [
     example1,
+    example2,
     ]
 
 
@@ -23,14 +23,14 @@ to tweak the plotting style and details - see :func:`~get_config`.
 import numpy as np
 import json
 
-from matplotlib import pyplot as plt
-
 from FarseerNMR import logger
+from FarseerNMR.calc import binding
 from FarseerNMR.plot.base import (
     plottingbase,
     plotvalidators,
+    plotconfig,
+    renderplan,
     )
-from FarseerNMR.plot.examples import parametersevoxmpls
 
 log = logger.get_log(__name__)
 
@@ -91,10 +91,15 @@ _default_config = {
     "fill_alpha": 0.5,
     
     "perform_resevo_fitting": False,
+    "fit_num_points": 100,
     "fit_line_color": "black",
     "fit_line_width": 1,
     "fit_line_style": "-",
     
+    "header_fontsize": 5,
+    
+    "paginate_flag": False,
+    "render_processes": 1,
     "figure_path": "plot_parameter_evolution.pdf",
     "figure_dpi": 300,
     "fig_height": 11.69,
@@ -102,6 +107,22 @@ _default_config = {
     
     }
 
+_config_schema = plotvalidators.ConfigSchema(
+    _default_config,
+    name="Parameter Evolution Plot",
+    )
+
+Config = plotconfig.make_config_class(
+    "Config",
+    _default_config,
+    _config_schema,
+    __name__,
+    )
+"""
+Immutable and hashable configuration of the template,
+see :mod:`FarseerNMR.plot.base.plotconfig`.
+"""
+
 
 def get_config():
     """
@@ -141,6 +162,9 @@ def plot(
         peak_status=None,
         fitting=None,
         fitting_info=None,
+        config=None,
+        pool=None,
+        cache=None,
         **kwargs,
         ):
     """
@@ -191,12 +215,36 @@ def plot(
         N should be in range of <exp_values> parameter, in order for
         the fit to match the plot.
         
+        If None and "perform_resevo_fitting" configuration is True,
+        the single-site binding isotherm is fitted to values with
+        :func:`FarseerNMR.calc.binding.calc_fitting`, both <fitting>
+        and <fitting_info> are then generated.
+        
     fitting_info : np.array shape (y,), dtype=str, optional
         Information strings that accompany fitting values.
         Where Y is as defined for values.
         This information will be plot on the top left corner of each
         subplot.
     
+    config : :obj:`Config`, optional
+        An immutable configuration of the template, validated when
+        created, which is not merged nor validated again. ``kwargs``,
+        if given, replace its values.
+        Defaults to None, the default configuration updated with
+        ``kwargs``.
+    
+    pool : :obj:`FarseerNMR.plot.base.figurepool.FigurePool`, optional
+        A pool of figures, reused by plots of the same layout,
+        see :mod:`FarseerNMR.plot.base.figurepool`.
+        Defaults to None, figures are drawn and closed.
+    
+    cache : :obj:`FarseerNMR.plot.base.outputcache.OutputCache`, optional
+        A cache of output files. If it holds the files of a plot of
+        the same data and configuration, they are written to the
+        output path and the plot is not rendered,
+        see :mod:`FarseerNMR.plot.base.outputcache`.
+        Defaults to None, the plot is always rendered.
+    
     **kwargs :
         Plot details (colors, shapes, fonts, ...) can be highly
         configured through additional named parameters.
@@ -229,14 +277,17 @@ def plot(
     if suptitles is None:
         suptitles = [str(i) for i in range(values.shape[0])]
     
-    plotvalidators.validate_subplot_per_residue(
-        values,
-        header,
-        suptitles,
-        peak_status,
-        fitting,
-        fitting_info,
-        )
+    trace = logger.Trace(__name__, shapes={"values": values.shape})
+    
+    with trace.stage("validation"):
+        plotvalidators.validate_subplot_per_residue(
+            values,
+            header,
+            suptitles,
+            peak_status,
+            fitting,
+            fitting_info,
+            )
     
     # # # # # validates type of positional arguments
     # # # # args2validate = [
@@ -281,113 +332,306 @@ def plot(
     # [plotvalidators.validate_len(values[0, :], t)
         # for t in args2validate if t[1] is not None]
     
-    # assigned and validates config
-    config = {**_default_config, **kwargs}
-    
-    plotvalidators.validate_config(
-        _default_config,
-        config,
-        name="Parameter Evolution Plot",
-        )
-    
-    """Runs all operations to plot."""
-    num_subplots = values.shape[0]
+    with trace.stage("config_validation"):
+        config = _resolve_config(config, kwargs)
     
-    if not(config["titration_x_values"]):
-        
-        config["titration_x_values"] = list(range(values.shape[1]))
-    
-    else:
+    trace.update(path=config["figure_path"])
     
-        try:
-            config["titration_x_values"] = \
-                [float(i) for i in config["titration_x_values"]]
+    if cache is not None:
         
-        except ValueError:
-            config["is_float"] = False
+        with trace.stage("cache"):
+            cache_key = cache.key(
+                __name__,
+                config,
+                values=values,
+                header=header,
+                suptitles=suptitles,
+                peak_status=peak_status,
+                fitting=fitting,
+                fitting_info=fitting_info,
+                )
+            cached = cache.fetch(cache_key, config)
         
-        else:
-            config["is_float"] = True
-    
-    figure, axs = plottingbase.draw_figure(
-        num_subplots,
-        config["rows_page"],
-        config["cols_page"],
-        config["fig_height"],
-        config["fig_width"],
-        )
+        if cached is not None:
+            trace.finish()
+            return
     
-    for i in range(values.shape[0]):
-        _subplot(
-            axs[i],
-            values[i],
-            i,
-            config,
+    """Runs all operations to plot."""
+    # all subplots are computed at once, pages only draw the plan
+    with trace.stage("plan"):
+        render_plan = _calc_plan(
+            values,
             suptitles,
             peak_status,
             fitting,
             fitting_info,
+            config,
             )
     
-    plottingbase.adjust_subplots(
-        figure,
-        config["hspace"],
-        config["wspace"],
-        )
+    if config["paginate_flag"]:
+        pages = plottingbase.calc_pages(
+            len(render_plan),
+            config["rows_page"],
+            config["cols_page"],
+            )
     
-    plottingbase.clean_subplots(axs, num_subplots)
+    else:
+        pages = [range(len(render_plan))]
     
-    plottingbase.save_figure(
-        figure,
+    writer = plottingbase.PageWriter(
         config["figure_path"],
-        header=header,
-        header_fs=config["header_fontsize"],
-        dpi=config["figure_dpi"],
+        paginate=config["paginate_flag"],
         )
     
-    plt.close(figure)
+    with writer:
+        plottingbase.render_pages(
+            _draw_page,
+            pages,
+            writer,
+            render_plan,
+            trace=trace,
+            processes=config["render_processes"],
+            pool=pool,
+            header=header,
+            header_fs=config["header_fontsize"],
+            dpi=config["figure_dpi"],
+            config=config,
+            )
+    
+    if cache is not None:
+        cache.store(cache_key, writer.paths)
+    
+    trace.finish()
     
     return
 
 
-def _subplot(
-        ax,
+def calc_plan(
+        values,
+        suptitles=None,
+        peak_status=None,
+        fitting=None,
+        fitting_info=None,
+        config=None,
+        **kwargs,
+        ):
+    """
+    Computes the render plan of :func:`~plot` without drawing,
+    see :mod:`FarseerNMR.plot.base.renderplan`.
+    
+    The binding isotherm is fitted here, if requested.
+    
+    Parameters
+    ----------
+    See :func:`~plot`.
+    
+    Returns
+    -------
+    :obj:`FarseerNMR.plot.base.renderplan.RenderPlan`
+        Figure elements: ``xticks``, ``xticks_labels``,
+        ``xticks_locator``, ``fit_x``, ``unassigned_xy`` and
+        ``info_xy``.
+        Subplot elements: ``titles``, ``values``, ``measured``,
+        ``unassigned``, ``fitting`` and ``fitting_info``.
+    """
+    
+    if suptitles is None:
+        suptitles = [str(i) for i in range(values.shape[0])]
+    
+    plotvalidators.validate_subplot_per_residue(
+        values,
+        "",
+        suptitles,
+        peak_status,
+        fitting,
+        fitting_info,
+        )
+    
+    return _calc_plan(
+        values,
+        suptitles,
+        peak_status,
+        fitting,
+        fitting_info,
+        _resolve_config(config, kwargs),
+        )
+
+
+def _resolve_config(config, kwargs):
+    """
+    Returns the configuration of a plot, validated.
+    """
+    
+    if config is None:
+        
+        _config_schema.validate(kwargs)
+        
+        # assigned config
+        return {**_default_config, **kwargs}
+    
+    if not(isinstance(config, Config)):
+        raise TypeError("config should be a Config instance")
+    
+    if kwargs:
+        return config.replace(**kwargs)
+    
+    return config
+
+
+def _calc_plan(
         values,
-        i,
-        c,
         suptitles,
         peak_status,
         fitting,
         fitting_info,
+        c,
+        ):
+    """
+    Computes the elements of all the subplots at once.
+    """
+    
+    num_subplots = values.shape[0]
+    
+    # Defines X Axis, the same in all subplots
+    if not(c["titration_x_values"]):
+        xticks_labels = list(range(values.shape[1]))
+        xticks = [float(n) for n in xticks_labels]
+        is_float = True
+    
+    else:
+        
+        try:
+            xticks_labels = [float(i) for i in c["titration_x_values"]]
+        
+        except ValueError:
+            xticks_labels = list(c["titration_x_values"])
+            xticks = list(range(values.shape[1]))
+            is_float = False
+        
+        else:
+            xticks = xticks_labels
+            is_float = True
+    
+    log.debug("xticks: %s", logger.TruncatedRepr(xticks))
+    
+    xmin, xmax = xticks[0], xticks[-1]
+    
+    if c["perform_resevo_fitting"] and fitting is None:
+        
+        if is_float:
+            log.debug("Fitting binding isotherm to all residues")
+            fitting, fitting_info = binding.calc_fitting(
+                values,
+                xticks_labels,
+                num_points=c["fit_num_points"],
+                )
+        
+        else:
+            log.info(
+                "* Fitting not performed: titration_x_values "
+                "are not numeric"
+                )
+    
+    if fitting is not None:
+        fit_x = np.linspace(xmin, xmax, fitting.shape[1])
+    
+    else:
+        fit_x = None
+    
+    # missing peaks are not represented
+    # and unassigned peaks are written in the center of the plot
+    if peak_status is not None:
+        measured = peak_status == "measured"
+        unassigned = peak_status[:, 0] == 'unassigned'
+    
+    else:
+        measured = None
+        unassigned = np.zeros(num_subplots, dtype=bool)
+    
+    return renderplan.RenderPlan(
+        __name__,
+        figure={
+            "xticks": xticks,
+            "xticks_labels": xticks_labels,
+            "xticks_locator": is_float,
+            "fit_x": fit_x,
+            "unassigned_xy": (
+                (xmin + xmax) / 2,
+                (c["y_lims"][0] + c["y_lims"][1]) / 2,
+                ),
+            "info_xy": (xmax * 0.05, c["y_lims"][1] * 0.97),
+            },
+        subplots={
+            "titles": np.asarray(suptitles, dtype=str),
+            "values": values,
+            "measured": measured,
+            "unassigned": unassigned,
+            "fitting": fitting,
+            "fitting_info": fitting_info,
+            },
+        )
+
+
+def _draw_page(
+        subplots,
+        plan,
+        *,
+        page,
+        trace,
+        pool,
+        config,
         ):
-    """ subplot routine."""
+    """
+    Draws the figure of a page, see
+    :func:`FarseerNMR.plot.base.plottingbase.render_pages`.
+    """
+    
+    with trace.stage("draw_figure", page=page):
+        figure, axs = plottingbase.draw_figure(
+            len(subplots),
+            config["rows_page"],
+            config["cols_page"],
+            config["fig_height"],
+            config["fig_width"],
+            pool=pool,
+            key=config,
+            )
+    
+    for ax, i in zip(axs, subplots):
+        with trace.stage("subplot", subplot=i):
+            _subplot(ax, plan.figure, plan.subplot(i), config)
+    
+    with trace.stage("adjust_subplots", page=page):
+        plottingbase.adjust_subplots(
+            figure,
+            config["hspace"],
+            config["wspace"],
+            )
+    
+    plottingbase.clean_subplots(axs, len(subplots))
+    
+    return figure
+
+
+def _subplot(ax, figure, subplot, c):
+    """Draws a subplot of the plan."""
     
     # Draws subplot title
     ax.set_title(
-        suptitles[i],
-        y=c["subtitle_fs"],
+        subplot["titles"],
+        y=c["subtitle_pad"],
         fontsize=c["subtitle_fs"],
         fontname=c["subtitle_fn"],
         fontweight=c["subtitle_weight"],
         )
     
     # Defines X Axis
-    
-    try:
-        xticks = [float(n) for n in c["titration_x_values"]]
-        is_float = True
-    
-    except ValueError as e:
-        xticks = list(range(len(values)))
-        is_float = False
-    
-    log.debug(f"xticks: {xticks}")
+    xticks = figure["xticks"]
     
     ax.set_xticks(xticks)
-    xmin, xmax = xticks[0], xticks[-1]
-    ax.set_xlim(xmin, xmax)
+    ax.set_xlim(xticks[0], xticks[-1])
     
-    if is_float:
+    if figure["xticks_locator"]:
         ax.locator_params(
             axis="x",
             tight=True,
@@ -395,7 +639,7 @@ def _subplot(
             )
     
     ax.set_xticklabels(
-        c["titration_x_values"],
+        figure["xticks_labels"],
         fontname=c["x_ticks_fn"],
         fontsize=c["x_ticks_fs"],
         fontweight=c["x_ticks_weight"],
@@ -455,10 +699,9 @@ def _subplot(
     
     # writes unassigned in the center of the plot for unassigned peaks
     # and plots nothing
-    if peak_status is not None and peak_status[i, 0] == 'unassigned':
+    if subplot["unassigned"]:
         ax.text(
-            (c["titration_x_value"][0] + c["titration_x_value"][-1]) / 2,
-            (c["y_lims"][0] + c["y_lims"][1]) / 2,
+            *figure["unassigned_xy"],
             'unassigned',
             fontsize=8,
             fontname='Arial',
@@ -469,14 +712,14 @@ def _subplot(
         return
     
     # do not represent the missing peaks.
-    if peak_status is not None:
-        measured_mask = peak_status[i, :] == "measured"
-        measured_values = values[measured_mask]
-        x_measured = ax.get_xticks()[measured_mask]
+    if subplot["measured"] is not None:
+        measured_mask = subplot["measured"]
+        measured_values = subplot["values"][measured_mask]
+        x_measured = np.array(figure["xticks"])[measured_mask]
     
     else:
-        measured_values = values
-        x_measured = ax.get_xticks()
+        measured_values = subplot["values"]
+        x_measured = np.array(figure["xticks"])
     
     # Plots data
     ax.plot(
@@ -500,25 +743,20 @@ def _subplot(
             alpha=c["fill_alpha"],
             )
     
-    if fitting is not None:
+    if subplot["fitting"] is not None:
         ax.plot(
-            np.linspace(
-                c["titration_x_values"][0],
-                c["titration_x_values"][-1],
-                len(fitting[i, :]),
-                ),
-            fitting[i, :],
+            figure["fit_x"],
+            subplot["fitting"],
             ls=c["fit_line_style"],
             lw=c["fit_line_width"],
             color=c["fit_line_color"],
             zorder=6,
             )
     
-    if fitting_info is not None:
+    if subplot["fitting_info"] is not None:
         ax.text(
-            xmax * 0.05,
-            c["y_lims"][1] * 0.97,
-            fitting_info[i],
+            *figure["info_xy"],
+            subplot["fitting_info"],
             ha='left',
             va='top',
             fontsize=4,
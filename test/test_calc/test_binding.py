@@ -0,0 +1,87 @@
+import pytest
+import numpy as np
+
+from FarseerNMR.calc import binding
+
+x = np.array([0, 0.5, 1, 2, 4, 8, 16, 32])
+
+
+def test_fit_single_site_excess():
+    
+    kd = np.linspace(0.5, 10, 50)
+    dmax = np.linspace(0.1, 0.5, 50)
+    
+    values = binding.single_site(x, kd, dmax)
+    
+    kd_fit, dmax_fit, kd_error, dmax_error = \
+        binding.fit_single_site(values, x)
+    
+    assert np.allclose(kd_fit, kd, rtol=1e-4)
+    assert np.allclose(dmax_fit, dmax, rtol=1e-4)
+    assert np.all(kd_error < 1e-3)
+    
+    return
+
+
+def test_fit_single_site_depletion():
+    
+    kd = np.linspace(0.5, 10, 50)
+    dmax = np.full(50, 0.3)
+    
+    values = binding.single_site(x, kd, dmax, protein_conc=1.0)
+    
+    kd_fit, dmax_fit, _, _ = binding.fit_single_site(
+        values,
+        x,
+        protein_conc=1.0,
+        )
+    
+    assert np.allclose(kd_fit, kd, rtol=1e-4)
+    assert np.allclose(dmax_fit, dmax, rtol=1e-4)
+    
+    return
+
+
+def test_fit_single_site_nan():
+    
+    values = binding.single_site(x, np.full(3, 2.0), np.full(3, 0.2))
+    values[0, 2] = np.nan
+    values[1, 2:] = np.nan
+    
+    kd_fit, dmax_fit, kd_error, dmax_error = \
+        binding.fit_single_site(values, x)
+    
+    assert np.isclose(kd_fit[0], 2.0, rtol=1e-4)
+    assert np.isnan(kd_fit[1])
+    assert np.isnan(dmax_error[1])
+    assert np.isclose(kd_fit[2], 2.0, rtol=1e-4)
+    
+    return
+
+
+def test_calc_fitting():
+    
+    values = binding.single_site(x, np.full(4, 2.0), np.full(4, 0.2))
+    
+    fitting, fitting_info = binding.calc_fitting(values, x, num_points=30)
+    
+    assert fitting.shape == (4, 30)
+    assert fitting_info.shape == (4,)
+    assert np.isclose(fitting[0, -1], 0.2 * 32 / 34)
+    assert fitting_info[0].startswith("Kd: 2 ")
+    
+    return
+
+
+def test_fit_single_site_errors():
+    
+    with pytest.raises(TypeError):
+        binding.fit_single_site(np.ones(8), x)
+    
+    with pytest.raises(ValueError):
+        binding.fit_single_site(np.ones((2, 7)), x)
+    
+    with pytest.raises(ValueError):
+        binding.fit_single_site(np.ones((2, 8)), x, max_iter=0)
+    
+    return
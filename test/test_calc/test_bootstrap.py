@@ -0,0 +1,118 @@
+import numpy as np
+
+from FarseerNMR.calc import binding, bootstrap
+
+x = np.array([0, 0.5, 1, 2, 4, 8, 16, 32])
+
+
+def make_values(num_residues=10):
+    
+    rng = np.random.RandomState(0)
+    
+    values = binding.single_site(
+        x,
+        np.full(num_residues, 2.0),
+        np.full(num_residues, 0.2),
+        )
+    
+    values += rng.normal(0, 0.005, size=values.shape)
+    values[1, :] = np.nan
+    
+    return values
+
+
+def test_bootstrap_single_site():
+    
+    values = make_values()
+    
+    kd, dmax, kd_ci, dmax_ci = bootstrap.bootstrap_single_site(
+        values,
+        x,
+        num_boot=200,
+        chunk_size=4,
+        processes=1,
+        )
+    
+    assert kd_ci.shape == (10, 2)
+    assert np.all(np.isnan(kd_ci[1]))
+    
+    fitted = np.logical_not(np.isnan(kd))
+    assert np.all(kd_ci[fitted, 0] < kd[fitted])
+    assert np.all(kd_ci[fitted, 1] > kd[fitted])
+    assert np.all(dmax_ci[fitted, 0] < dmax[fitted])
+    assert np.all(dmax_ci[fitted, 1] > dmax[fitted])
+    
+    return
+
+
+def test_bootstrap_deterministic_processes():
+    
+    values = make_values()
+    
+    serial = bootstrap.bootstrap_single_site(
+        values,
+        x,
+        num_boot=50,
+        chunk_size=3,
+        processes=1,
+        seed=7,
+        )
+    
+    pool = bootstrap.bootstrap_single_site(
+        values,
+        x,
+        num_boot=50,
+        chunk_size=3,
+        processes=2,
+        seed=7,
+        )
+    
+    for a, b in zip(serial, pool):
+        assert np.array_equal(a, b, equal_nan=True)
+    
+    return
+
+
+def test_bootstrap_fits_values_once(monkeypatch):
+    
+    calls = []
+    fit = binding.fit_single_site
+    
+    def counted(values, *args, **kwargs):
+        calls.append(values.shape)
+        return fit(values, *args, **kwargs)
+    
+    monkeypatch.setattr(binding, "fit_single_site", counted)
+    
+    bootstrap.bootstrap_single_site(
+        make_values(),
+        x,
+        num_boot=10,
+        chunk_size=4,
+        processes=1,
+        )
+    
+    # the values, then the replicates of each chunk
+    assert calls == [(10, 8), (40, 8), (40, 8), (20, 8)]
+    
+    return
+
+
+def test_calc_bootstrap_fitting():
+    
+    values = make_values(4)
+    
+    fitting, fitting_info = bootstrap.calc_bootstrap_fitting(
+        values,
+        x,
+        num_points=20,
+        num_boot=20,
+        processes=1,
+        )
+    
+    assert fitting.shape == (4, 20)
+    assert fitting_info.shape == (4,)
+    assert fitting_info[1] == "Kd: not fitted"
+    assert fitting_info[0].endswith("95% CI")
+    
+    return
@@ -1,3 +1,4 @@
+import pytest
 import numpy as np
 
 from FarseerNMR.calc import calc
@@ -22,3 +23,130 @@ def test_threshold_2():
     
     assert t == y
     return
+
+
+def test_threshold_population():
+    
+    values = np.arange(100)
+    
+    t = calc.threshold_std_of_population(values, population=0.2)
+    
+    y = np.mean(np.arange(20)) + 5 * np.std(np.arange(20))
+    
+    assert np.isclose(t, y)
+    return
+
+
+def test_threshold_nan():
+    
+    values = np.arange(100, dtype=float)
+    values[:10] = np.nan
+    
+    t = calc.threshold_std_of_population(values)
+    
+    y = np.mean(np.arange(10, 19)) + 5 * np.std(np.arange(10, 19))
+    
+    assert np.isclose(t, y)
+    return
+
+
+def test_batch_threshold_1():
+    
+    rng = np.random.RandomState(0)
+    values = rng.normal(size=(50, 500))
+    values[3, :] = np.nan
+    values[5, 100:] = np.nan
+    values[7, ::3] = np.nan
+    
+    t = calc.batch_threshold_std_of_population(values, population=0.15)
+    
+    assert t.shape == (50,)
+    assert np.isnan(t[3])
+    
+    for row, ti in zip(values[[0, 5, 7, 49]], t[[0, 5, 7, 49]]):
+        
+        parsed = np.sort(np.absolute(row[np.logical_not(np.isnan(row))]))
+        firstpop = parsed[0: int(np.ceil(0.15 * len(parsed)))]
+        y = np.mean(firstpop) + 5 * np.std(firstpop)
+        
+        assert np.isclose(ti, y)
+    
+    return
+
+
+def test_batch_threshold_2():
+    
+    values = np.arange(200).reshape(2, 100)
+    
+    t = calc.batch_threshold_std_of_population(values, std=3)
+    
+    for row, ti in zip(values, t):
+        assert np.isclose(ti, calc.threshold_std_of_population(row, std=3))
+    
+    return
+
+
+def test_batch_threshold_errors():
+    
+    with pytest.raises(TypeError):
+        calc.batch_threshold_std_of_population(np.ones(10))
+    
+    with pytest.raises(ValueError):
+        calc.batch_threshold_std_of_population(
+            np.ones((2, 10)),
+            population=0,
+            )
+    
+    return
+
+
+def test_streaming_threshold_1():
+    
+    st = calc.StreamingThreshold()
+    
+    assert np.isnan(st.threshold)
+    
+    st.update(np.ones(50))
+    st.update(np.ones(50))
+    
+    assert st.count == 100
+    assert np.isclose(st.threshold, 1)
+    
+    return
+
+
+def test_streaming_threshold_2():
+    
+    rng = np.random.RandomState(1)
+    values = rng.normal(size=(40, 250))
+    values[0, :20] = np.nan
+    values[10, :] = 0
+    
+    st = calc.StreamingThreshold(population=0.2)
+    
+    for chunk in values:
+        st.update(chunk)
+    
+    exact = calc.threshold_std_of_population(values.ravel(), population=0.2)
+    
+    finite = values[np.logical_not(np.isnan(values))]
+    q = np.sort(np.absolute(finite))[int(np.ceil(0.2 * finite.size)) - 1]
+    gamma = (1 + st.alpha) / (1 - st.alpha)
+    
+    assert st.count == finite.size
+    assert abs(st.threshold - exact) <= (1 + st.std) * (gamma - 1) * q
+    
+    return
+
+
+def test_streaming_threshold_bounded():
+    
+    st = calc.StreamingThreshold(max_bins=64)
+    
+    for i in range(10):
+        st.update(np.logspace(-3, 3, 1000) * (i + 1))
+    
+    assert st.num_bins <= 64
+    assert st.count == 10000
+    
+    return
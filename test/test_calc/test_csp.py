@@ -0,0 +1,87 @@
+import pytest
+import numpy as np
+
+from FarseerNMR.calc import csp
+
+
+def make_shifts(shape=(2, 4, 10)):
+    
+    shifts = np.zeros(shape + (2,))
+    shifts[..., 0] = 8.0
+    shifts[..., 1] = 120.0
+    
+    for point in range(shape[1]):
+        shifts[:, point, :, 0] += 0.01 * point
+        shifts[:, point, :, 1] += 0.1 * point
+    
+    return shifts
+
+
+def test_csp_1():
+    
+    shifts = make_shifts()
+    
+    csps = csp.calc_csp(shifts)
+    
+    assert csps.shape == (2, 4, 10)
+    
+    for point in range(4):
+        y = np.sqrt(0.5 * ((0.01 * point) ** 2 + (0.14 * 0.1 * point) ** 2))
+        assert np.allclose(csps[:, point, :], y)
+    
+    return
+
+
+def test_csp_nan():
+    
+    shifts = make_shifts()
+    shifts[0, 2, 5, 1] = np.nan
+    
+    csps = csp.calc_csp(shifts)
+    
+    assert np.isnan(csps[0, 2, 5])
+    assert np.count_nonzero(np.isnan(csps)) == 1
+    
+    return
+
+
+def test_csp_reference_nan():
+    
+    shifts = make_shifts()
+    shifts[1, 0, 3, 0] = np.nan
+    
+    csps = csp.calc_csp(shifts)
+    
+    assert np.all(np.isnan(csps[1, :, 3]))
+    
+    return
+
+
+def test_csp_weights_float32():
+    
+    shifts = make_shifts()
+    
+    csps64 = csp.calc_csp(shifts, weights={"15N": 0.2})
+    csps32 = csp.calc_csp(shifts, weights={"15N": 0.2}, dtype=np.float32)
+    
+    assert csps32.dtype == np.float32
+    assert np.allclose(csps64, csps32, atol=1e-5)
+    
+    return
+
+
+def test_csp_errors():
+    
+    with pytest.raises(TypeError):
+        csp.calc_csp(np.zeros((3, 10, 2)))
+    
+    with pytest.raises(ValueError):
+        csp.calc_csp(make_shifts(), nuclei=("1H",))
+    
+    with pytest.raises(ValueError):
+        csp.calc_csp(make_shifts(), nuclei=("1H", "31P"))
+    
+    with pytest.raises(ValueError):
+        csp.calc_csp(make_shifts(), dtype=np.int32)
+    
+    return
@@ -0,0 +1,106 @@
+import pytest
+import numpy as np
+
+from FarseerNMR.calc import memoize, threshold
+
+
+def test_lru_eviction():
+    
+    cache = memoize.LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    
+    assert cache.get("a") == 1
+    
+    cache.put("c", 3)
+    
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    assert cache.get("b") is None
+    assert cache.info() == memoize.CacheInfo(1, 1, 2, 2)
+    
+    cache.clear()
+    
+    assert cache.info() == memoize.CacheInfo(0, 0, 2, 0)
+    
+    return
+
+
+def test_lru_maxsize():
+    
+    with pytest.raises(ValueError):
+        memoize.LRUCache(maxsize=0)
+    
+    return
+
+
+def test_array_key():
+    
+    values = np.arange(10, dtype=float)
+    
+    key = memoize.array_key(values, 1, std=5)
+    
+    assert key == memoize.array_key(values.copy(), 1, std=5)
+    assert key != memoize.array_key(values, 1, std=4)
+    assert key != memoize.array_key(values.astype(np.float32), 1, std=5)
+    assert key != memoize.array_key(values.reshape(2, 5), 1, std=5)
+    
+    values[0] = 1
+    
+    assert key != memoize.array_key(values, 1, std=5)
+    
+    return
+
+
+def test_memoize():
+    
+    calls = []
+    
+    @memoize.memoize(maxsize=4)
+    def func(values, *, std=5):
+        calls.append(std)
+        return values * std
+    
+    values = np.arange(10, dtype=float)
+    
+    result = func(values)
+    result[0] = 100
+    
+    assert np.array_equal(func(values.copy()), values * 5)
+    assert func(values, std=2)[1] == 2
+    assert calls == [5, 2]
+    assert func.cache_info() == memoize.CacheInfo(1, 2, 4, 2)
+    
+    # not hashable parameters are not cached
+    func(values, std=[1])
+    
+    assert calls == [5, 2, [1]]
+    
+    func.cache_clear()
+    
+    assert func.cache_info().currsize == 0
+    
+    return
+
+
+def test_memoized_thresholds():
+    
+    threshold.calc_thresholds.cache_clear()
+    
+    values = np.random.default_rng(0).random((3, 100))
+    
+    first = threshold.calc_thresholds(values, strategy="mad")
+    second = threshold.calc_thresholds(values.copy(), strategy="mad")
+    
+    assert np.array_equal(first, second)
+    assert threshold.calc_thresholds.cache_info().hits == 1
+    
+    infos = memoize.cache_info()
+    
+    assert "FarseerNMR.calc.threshold.calc_thresholds" in infos
+    
+    memoize.cache_clear()
+    
+    assert threshold.calc_thresholds.cache_info().currsize == 0
+    
+    return
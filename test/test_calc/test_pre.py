@@ -0,0 +1,98 @@
+import pytest
+import numpy as np
+
+from FarseerNMR.calc import pre
+
+
+def test_k_nitroxide():
+    
+    # 1.23e-32 cm^6 s^-2
+    assert np.isclose(pre.K_NITROXIDE * 1e-48, 1.23e-32, rtol=1e-2)
+    
+    return
+
+
+def test_intensity_ratios():
+    
+    para = np.array([[1.0, 2.0, np.nan], [3.0, 0.0, 1.0]])
+    dia = np.array([2.0, 4.0, 0.0])
+    
+    ratios = pre.calc_intensity_ratios(para, dia)
+    
+    assert ratios.shape == (2, 3)
+    assert np.allclose(ratios[:, :2], [[0.5, 0.5], [1.5, 0.0]])
+    assert np.all(np.isnan(ratios[:, 2]))
+    
+    return
+
+
+def test_intensity_ratios_shapes():
+    
+    with pytest.raises(ValueError):
+        pre.calc_intensity_ratios(np.ones((2, 3)), np.ones(4))
+    
+    with pytest.raises(TypeError):
+        pre.calc_intensity_ratios([1, 2], np.ones(2))
+    
+    return
+
+
+def test_distances():
+    
+    tags = np.array([[0, 0, 0], [1, 0, 0]])
+    amides = np.array([[3, 4, 0], [0, 0, 2], [np.nan, 0, 0]])
+    
+    distances = pre.calc_distances(tags, amides)
+    
+    assert distances.shape == (2, 3)
+    assert np.allclose(distances[0, :2], [5, 2])
+    assert np.isclose(distances[1, 1], np.sqrt(5))
+    assert np.all(np.isnan(distances[:, 2]))
+    
+    return
+
+
+def test_theo_pre():
+    
+    distances = np.array([
+        [0, 10, 20, 40, np.nan],
+        [40, 20, 10, 0, 15],
+        ])
+    
+    r2 = np.array([10, 10, 20, 20, 10])
+    
+    theo_pre = pre.calc_theo_pre(distances, r2=r2, t=9e-3, tc=5e-9)
+    
+    assert theo_pre.shape == distances.shape
+    
+    omega = 2 * np.pi * 600e6
+    tc = 5e-9
+    
+    for i, j in [(0, 1), (0, 2), (1, 4)]:
+        gamma2 = pre.K_NITROXIDE / distances[i, j] ** 6 \
+            * (4 * tc + 3 * tc / (1 + (omega * tc) ** 2))
+        expected = r2[j] * np.exp(-gamma2 * 9e-3) / (r2[j] + gamma2)
+        assert np.isclose(theo_pre[i, j], expected)
+    
+    assert theo_pre[0, 0] == 0
+    assert theo_pre[1, 3] == 0
+    assert np.isnan(theo_pre[0, 4])
+    assert theo_pre[0, 3] > 0.99
+    
+    return
+
+
+def test_tag_position():
+    
+    tag_position = pre.calc_tag_position([1, 3], (2, 5))
+    
+    assert tag_position.shape == (2, 5)
+    assert tag_position[0, 1] == "*"
+    assert tag_position[1, 3] == "*"
+    assert np.count_nonzero(tag_position == "*") == 2
+    
+    tag_position = pre.calc_tag_position(2, (3, 4), tag_id="tag")
+    
+    assert np.all(tag_position[:, 2] == "tag")
+    
+    return
@@ -0,0 +1,115 @@
+import pytest
+import numpy as np
+
+from FarseerNMR.calc import calc, threshold
+
+
+def make_values(seed=0, shape=(5, 200)):
+    
+    rng = np.random.default_rng(seed)
+    values = rng.normal(0, 1, size=shape)
+    values[:, ::20] = 50
+    
+    return values
+
+
+def test_strategies_registered():
+    
+    for name in ("std_of_population", "mad", "sigma_clip"):
+        assert name in threshold.strategies
+    
+    return
+
+
+def test_unknown_strategy():
+    
+    with pytest.raises(ValueError):
+        threshold.calc_thresholds(make_values(), strategy="none")
+    
+    return
+
+
+def test_wrong_ndim():
+    
+    with pytest.raises(TypeError):
+        threshold.calc_thresholds(np.ones(10))
+    
+    return
+
+
+def test_std_of_population():
+    
+    values = make_values()
+    
+    result = threshold.calc_thresholds(values, std=3)
+    expected = calc.batch_threshold_std_of_population(values, std=3)
+    
+    assert np.allclose(result, expected)
+    
+    return
+
+
+def test_mad():
+    
+    values = make_values()
+    values[1, 3] = np.nan
+    
+    result = threshold.calc_thresholds(values, strategy="mad", std=3)
+    
+    for row, value in zip(values, result):
+        row = np.absolute(row[~np.isnan(row)])
+        median = np.median(row)
+        mad = np.median(np.absolute(row - median))
+        assert np.isclose(value, median + 3 * 1.4826 * mad)
+    
+    return
+
+
+def test_sigma_clip():
+    
+    values = make_values()
+    
+    result = threshold.calc_thresholds(values, strategy="sigma_clip")
+    
+    for row, value in zip(values, result):
+        row = np.absolute(row)
+        
+        for i in range(10):
+            clipped = row[np.absolute(row - row.mean()) <= 3 * row.std()]
+            if clipped.size == row.size:
+                break
+            row = clipped
+        
+        assert np.isclose(value, row.mean() + 5 * row.std())
+    
+    return
+
+
+def test_nan_rows():
+    
+    values = make_values()
+    values[2] = np.nan
+    
+    for name in ("mad", "sigma_clip"):
+        result = threshold.calc_thresholds(values, strategy=name)
+        assert np.isnan(result[2])
+        assert np.all(np.isfinite(np.delete(result, 2)))
+    
+    return
+
+
+def test_register_strategy():
+    
+    @threshold.register_strategy("max")
+    def _max(values, *, std=5):
+        return np.nanmax(np.absolute(values), axis=1)
+    
+    try:
+        values = make_values()
+        result = threshold.calc_thresholds(values, strategy="max")
+        assert np.allclose(result, np.absolute(values).max(axis=1))
+    
+    finally:
+        threshold.strategies.pop("max")
+    
+    return
@@ -0,0 +1,412 @@
+import json
+import logging
+import logging.handlers
+import os
+
+import numpy as np
+import pytest
+
+from FarseerNMR import logger
+from FarseerNMR.core import parallel
+
+
+@pytest.fixture(autouse=True)
+def restore_logging():
+    
+    yield
+    
+    logger.configure()
+    
+    return
+
+
+def test_get_log_does_not_configure():
+    
+    handlers = list(logging.getLogger().handlers)
+    
+    logger.get_log("FarseerNMR.test")
+    
+    assert logging.getLogger().handlers == handlers
+    
+    return
+
+
+def test_configure_files(tmp_path):
+    
+    log_dir = os.fspath(tmp_path / "logs")
+    
+    logger.configure(sinks=("files",), log_dir=log_dir)
+    
+    log = logger.get_log("FarseerNMR.test")
+    log.info("info message")
+    log.debug("debug message")
+    
+    with open(os.path.join(log_dir, "farseernmr.log")) as fin:
+        info = fin.read()
+    
+    with open(os.path.join(log_dir, "farseernmr.debug")) as fin:
+        debug = fin.read()
+    
+    assert "info message" in info and "debug message" not in info
+    assert "debug message" in debug
+    
+    names = [type(h).__name__ for h in logging.getLogger().handlers]
+    
+    assert "StreamHandler" not in names
+    
+    logger.configure()
+    
+    return
+
+
+def test_configure_default_log_dir(tmp_path, monkeypatch):
+    
+    environ = dict(os.environ)
+    monkeypatch.chdir(tmp_path)
+    
+    logger.configure(sinks=("files",), log_dir=os.fspath(tmp_path / "logs"))
+    logger.configure(sinks=("files",))
+    
+    logger.get_log("FarseerNMR.test").info("info message")
+    
+    assert os.path.exists(tmp_path / "farseernmr.log")
+    assert not(os.path.exists(tmp_path / "logs" / "farseernmr.log"))
+    assert dict(os.environ) == environ
+    
+    logger.configure(sinks=None)
+    
+    return
+
+
+def test_configure_no_sinks():
+    
+    logger.configure(sinks=None)
+    
+    log = logger.get_log("FarseerNMR.test")
+    
+    assert not log.isEnabledFor(logging.INFO)
+    
+    logger.configure()
+    
+    assert log.isEnabledFor(logging.DEBUG)
+    
+    return
+
+
+def test_configure_no_sinks_removes_handlers(capfd):
+    
+    logger.configure(sinks=("console",))
+    logger.configure(sinks=())
+    
+    log = logger.get_log("FarseerNMR.test")
+    log.warning("silenced warning")
+    
+    out, err = capfd.readouterr()
+    
+    assert "silenced warning" not in out + err
+    assert not any(
+        isinstance(h, logging.StreamHandler)
+        for h in logging.getLogger().handlers
+        )
+    
+    return
+
+
+def test_configure_wrong_sink():
+    
+    with pytest.raises(ValueError):
+        logger.configure(sinks=("printer",))
+    
+    return
+
+
+def test_level_from_sinks():
+    
+    logger.configure(sinks=("console",))
+    
+    log = logger.get_log("FarseerNMR.test")
+    
+    assert not log.isEnabledFor(logging.DEBUG)
+    assert log.isEnabledFor(logging.INFO)
+    
+    logger.configure()
+    
+    return
+
+
+def test_truncated_repr():
+    
+    import numpy as np
+    
+    values = np.arange(20000)
+    
+    r = str(logger.TruncatedRepr(values))
+    
+    assert "..." in r
+    assert "shape=(20000,)" in r
+    assert len(r) < 100
+    
+    assert str(logger.TruncatedRepr(list(range(100)))).endswith("...]")
+    assert str(logger.TruncatedRepr("abc")) == "'abc'"
+    
+    return
+
+
+def test_truncated_repr_deferred():
+    
+    class Counter():
+        calls = 0
+        
+        def __repr__(self):
+            Counter.calls += 1
+            return "counter"
+    
+    logger.configure(sinks=None)
+    
+    log = logger.get_log("FarseerNMR.test")
+    log.debug("value: %s", logger.TruncatedRepr(Counter()))
+    
+    assert Counter.calls == 0
+    
+    logger.configure()
+    
+    return
+
+
+def test_configure_queue(tmp_path):
+    
+    log_dir = os.fspath(tmp_path)
+    
+    logger.configure(sinks=("files",), log_dir=log_dir, queue=True)
+    
+    root_handlers = logging.getLogger().handlers
+    
+    assert len(root_handlers) == 1
+    assert isinstance(root_handlers[0], logging.handlers.QueueHandler)
+    
+    log = logger.get_log("FarseerNMR.test")
+    
+    for i in range(100):
+        log.debug("queued message %s", i)
+    
+    logger.shutdown()
+    
+    with open(os.path.join(log_dir, "farseernmr.debug")) as fin:
+        debug = fin.read()
+    
+    assert debug.count("queued message") == 100
+    assert logging.getLogger().handlers == []
+    
+    logger.configure()
+    
+    return
+
+
+def test_fork_with_queue(tmp_path):
+    
+    if not(hasattr(os, "fork")):
+        pytest.skip("fork not available")
+    
+    logger.configure(sinks=("files",), log_dir=os.fspath(tmp_path), queue=True)
+    
+    listeners = list(logger._listeners)
+    log = logger.get_log("FarseerNMR.test")
+    
+    pid = os.fork()
+    
+    if pid == 0:
+        # the child writes directly, without a listener thread
+        log.info("child message")
+        os._exit(0 if logger._listeners == [] else 1)
+    
+    _, status = os.waitpid(pid, 0)
+    log.info("parent message")
+    
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert logger._listeners == listeners
+    
+    logger.shutdown()
+    
+    with open(tmp_path / "farseernmr.log") as fin:
+        info = fin.read()
+    
+    assert "child message" in info and "parent message" in info
+    
+    return
+
+
+def _work(i):
+    
+    log = logger.get_log("FarseerNMR.test")
+    log.info("worker %s\nsecond line", i)
+    
+    return os.getpid()
+
+
+def test_per_process_dirs(tmp_path):
+    
+    logger.configure(
+        sinks=("files",),
+        log_dir=os.fspath(tmp_path / "{run}" / "{pid}"),
+        queue=True,
+        )
+    
+    settings = logger.worker_settings()
+    
+    assert not(settings["queue"])
+    
+    log = logger.get_log("FarseerNMR.test")
+    log.info("main")
+    
+    with parallel.process_pool(2) as executor:
+        pids = set(executor.map(_work, range(4)))
+    
+    run_dir = os.path.dirname(settings["log_dir"])
+    folders = set(os.listdir(run_dir))
+    
+    assert str(os.getpid()) in folders
+    assert {str(pid) for pid in pids} <= folders
+    
+    # closes the log files of the main process
+    logger.shutdown()
+    logger.configure(sinks=None)
+    
+    with open(logger.merge_logs(run_dir)) as fin:
+        merged = fin.read()
+    
+    assert merged.count("second line") == 4
+    assert merged.index("main") < merged.index("worker")
+    
+    return
+
+
+def test_merge_logs(tmp_path):
+    
+    (tmp_path / "1").mkdir()
+    (tmp_path / "2").mkdir()
+    
+    (tmp_path / "1" / "farseernmr.debug").write_text(
+        "2020-01-01 10:00:00,001 - 1 - INFO - a\n"
+        "continuation of a\n"
+        "2020-01-01 10:00:00,003 - 1 - INFO - c\n"
+        )
+    
+    (tmp_path / "2" / "farseernmr.debug").write_text(
+        "2020-01-01 10:00:00,002 - 2 - INFO - b\n"
+        "2020-01-01 10:00:00,004 - 2 - INFO - d\n"
+        )
+    
+    output = logger.merge_logs(os.fspath(tmp_path))
+    
+    with open(output) as fin:
+        lines = fin.read().splitlines()
+    
+    assert [line[-1] for line in lines] == ["a", "a", "b", "c", "d"]
+    assert lines[1] == "continuation of a"
+    
+    return
+
+
+def test_trace_queue(tmp_path):
+    
+    logger.configure(sinks=("trace",), log_dir=os.fspath(tmp_path), queue=True)
+    
+    trace_handlers = logging.getLogger("FarseerNMR.trace").handlers
+    
+    assert len(trace_handlers) == 1
+    assert isinstance(trace_handlers[0], logging.handlers.QueueHandler)
+    
+    # the listener thread waits for the file handler
+    _, _, listener = logger._listeners[0]
+    file_handler = listener.handlers[0]
+    file_handler.acquire()
+    
+    try:
+        trace = logger.Trace("template")
+        
+        with trace.stage("stage"):
+            pass
+        
+        trace.finish()
+        
+        assert not(os.path.exists(tmp_path / "farseernmr.trace.jsonl"))
+    
+    finally:
+        file_handler.release()
+    
+    logger.shutdown()
+    
+    with open(tmp_path / "farseernmr.trace.jsonl") as fin:
+        records = [json.loads(line) for line in fin]
+    
+    assert [r["stage"] for r in records] == ["stage", "total"]
+    
+    logger.configure()
+    
+    return
+
+
+def test_trace_disabled(tmp_path):
+    
+    logger.configure(sinks=("files",), log_dir=os.fspath(tmp_path))
+    
+    trace = logger.Trace("template")
+    
+    with trace.stage("stage"):
+        pass
+    
+    trace.finish()
+    
+    assert not(trace.enabled)
+    assert not(os.path.exists(tmp_path / "farseernmr.trace.jsonl"))
+    
+    return
+
+
+def test_trace(tmp_path):
+    
+    logger.configure(sinks=("trace",), log_dir=os.fspath(tmp_path))
+    
+    for run in range(4):
+        
+        trace = logger.Trace("template", shapes={"values": (2, 3)})
+        trace.update(path="figure.pdf")
+        
+        for i in range(2):
+            with trace.stage("subplot", subplot=i):
+                pass
+        
+        trace.finish()
+    
+    logger.shutdown()
+    
+    with open(tmp_path / "farseernmr.trace.jsonl") as fin:
+        records = [json.loads(line) for line in fin]
+    
+    assert len(records) == 12
+    assert records[1]["subplot"] == 1
+    assert records[2]["stage"] == "total"
+    assert records[0]["shapes"] == {"values": [2, 3]}
+    assert records[0]["path"] == "figure.pdf"
+    assert records[0]["wall"] >= 0 and records[0]["cpu"] >= 0
+    
+    summary = logger.summarize_trace(os.fspath(tmp_path))
+    
+    assert summary["template"]["subplot"]["count"] == 8
+    assert summary["template"]["total"]["count"] == 4
+    assert set(summary["template"]["total"]) == {
+        "count", "wall_p50", "wall_p95", "cpu_p50", "cpu_p95",
+        }
+    
+    return
+
+
+def test_percentile():
+    
+    values = [1.0, 2.0, 3.0, 4.0, 10.0]
+    
+    for q in (0, 50, 95, 100):
+        assert logger._percentile(values, q) == \
+            pytest.approx(np.percentile(values, q))
+    
+    return
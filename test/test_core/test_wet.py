@@ -99,3 +99,74 @@ def test_wetnum_type():
     
     with pytest.raises(TypeError):
         wet.WetHandler("T", "msg", "dasds")
+
+
+def test_catalog():
+    
+    record = wet.catalog[27]
+    
+    assert record.code == 27
+    assert record.severity == "ERROR"
+    assert record.link.endswith("#wet27")
+    
+    return
+
+
+def test_register_wet():
+    
+    record = wet.register_wet(
+        1000,
+        "WARNING",
+        """
+        A testing message.
+        """,
+        )
+    
+    assert wet.catalog[1000] is record
+    assert record.message == "A testing message."
+    assert wet.render(1000).startswith(
+        "\n****************************** WARNING"
+        )
+    
+    del wet.catalog[1000]
+    
+    return
+
+
+def test_render_cached():
+    
+    wet._generate.cache_clear()
+    
+    a = wet.render(27, width=50)
+    b = wet.render(27, width=50)
+    wet.render(27, width=50, style="@")
+    
+    assert a is b
+    assert wet._generate.cache_info().hits == 1
+    assert wet._generate.cache_info().misses == 2
+    
+    return
+
+
+def test_counts():
+    
+    wet.reset_counts()
+    
+    wet.render(27)
+    wet.render(27, width=50)
+    wet.generate("TESTING", "msg", 1)
+    
+    assert wet.counts() == {27: 2, 1: 1}
+    
+    summary = wet.summary()
+    
+    assert summary[0]["code"] == 27
+    assert summary[0]["count"] == 2
+    assert summary[0]["severity"] == "ERROR"
+    assert summary[1]["severity"] is None
+    
+    wet.reset_counts()
+    
+    assert not(wet.counts())
+    
+    return
@@ -0,0 +1,29 @@
+import numpy as np
+
+from FarseerNMR.plot import barplotextended
+from FarseerNMR.plot.base import barplotbase
+
+
+def test_bar_style():
+    
+    c = barplotextended.get_config()
+    
+    facecolors, edgecolors, linewidths = barplotbase.bar_style(
+        4,
+        {**c, "bar_linewidth": 2, "color_user_details_flag": True},
+        peak_status=np.array(["measured", "missing", "other", "other"]),
+        details=np.array(["none", "none", "foo", "none"]),
+        )
+    
+    assert list(facecolors) == [
+        c["measured_color"],
+        c["missing_color"],
+        c["user_bar_colors_dict"]["foo"],
+        c["measured_color"],
+        ]
+    
+    # only bars with condition have coloured edges
+    assert edgecolors[3] == "none"
+    assert list(linewidths) == [2, 2, 2, 0]
+    
+    return
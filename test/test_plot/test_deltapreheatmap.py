@@ -0,0 +1,48 @@
+import os
+
+import numpy as np
+
+from FarseerNMR.plot import deltapreheatmap
+from FarseerNMR.plot.examples import deltapreheatmapxmpls
+
+
+def test_deltapreheatmap(tmp_path):
+    
+    values, labels, suptitles, tag_position = \
+        deltapreheatmapxmpls.make_data((5, 300))
+    
+    values[1, 10:20] = np.nan
+    
+    figure_path = os.fspath(tmp_path / "heatmap.png")
+    
+    deltapreheatmap.plot(
+        values,
+        labels,
+        suptitles=suptitles,
+        tag_position=tag_position,
+        figure_path=figure_path,
+        figure_dpi=50,
+        )
+    
+    assert os.path.exists(figure_path)
+    
+    return
+
+
+def test_deltapreheatmap_no_tags(tmp_path):
+    
+    values, labels, _, _ = deltapreheatmapxmpls.make_data((3, 50))
+    
+    figure_path = os.fspath(tmp_path / "heatmap.png")
+    
+    deltapreheatmap.plot(
+        values,
+        labels,
+        figure_path=figure_path,
+        figure_dpi=50,
+        colorbar_flag=False,
+        )
+    
+    assert os.path.exists(figure_path)
+    
+    return
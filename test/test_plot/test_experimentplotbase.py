@@ -0,0 +1,114 @@
+import numpy as np
+from matplotlib import pyplot as plt
+
+from FarseerNMR.plot.base import experimentplotbase
+
+
+def test_resolve_colors():
+    
+    values = np.array(["measured", "missing", "other", "missing"])
+    d = {"measured": "black", "missing": "red"}
+    
+    colors = experimentplotbase.resolve_colors(values, d)
+    
+    assert list(colors) == ["black", "red", None, "red"]
+    
+    return
+
+
+def test_resolve_colors_default():
+    
+    previous = np.array(["a", "b", "c"], dtype=object)
+    
+    colors = experimentplotbase.resolve_colors(
+        np.array([1, 2, 3]),
+        {"2": "red"},
+        default=previous,
+        )
+    
+    assert list(colors) == ["a", "red", "c"]
+    assert list(previous) == ["a", "b", "c"]
+    
+    return
+
+
+
+def test_map_categories():
+    
+    values = np.array(["P", "A", "P"])
+    
+    marks = experimentplotbase.map_categories(values, {"P": "*"}, "")
+    
+    assert list(marks) == ["*", "", "*"]
+    
+    return
+
+
+def test_calc_text_marks_2d():
+    
+    details = np.array([["foo", "none"], ["bar", "foo"]])
+    
+    marks = experimentplotbase.calc_text_marks(details, {"foo": "f"})
+    
+    assert marks.tolist() == [["f", ""], ["", "f"]]
+    
+    return
+
+
+def test_find_paramagnetic_tags():
+    
+    tag_position = np.array([["", "*", "*"], ["", "", ""], ["*", "", ""]])
+    
+    tags = experimentplotbase.find_paramagnetic_tags(tag_position)
+    
+    assert tags.tolist() == [1, -1, 0]
+    
+    return
+
+
+def test_text_marker_batched():
+    
+    fig, ax = plt.subplots()
+    
+    series = np.array(["a", "b", "a", "c", "a", "b"])
+    
+    experimentplotbase.text_marker(
+        ax,
+        range(6),
+        np.array([1, -1, 2, 1, -2, np.nan]),
+        series,
+        {"a": "A", "b": "B"},
+        batched=True,
+        )
+    
+    lines = ax.lines
+    
+    # (A, bottom), (A, top), (B, top), (B, bottom)
+    assert len(lines) == 4
+    assert sum(len(line.get_xdata()) for line in lines) == 5
+    assert not(ax.texts)
+    
+    plt.close(fig)
+    
+    return
+
+
+def test_text_marker_fallback():
+    
+    fig, ax = plt.subplots()
+    
+    experimentplotbase.text_marker(
+        ax,
+        range(3),
+        np.array([1, 2, 3]),
+        np.array(["a", "b", "a"]),
+        {"a": "A"},
+        orientation="vertical",
+        )
+    
+    assert [t.get_text() for t in ax.texts] == ["A", "A"]
+    assert not(ax.lines)
+    
+    plt.close(fig)
+    
+    return
@@ -0,0 +1,170 @@
+import os
+from filecmp import cmp
+
+import numpy as np
+import pytest
+from matplotlib import pyplot as plt
+
+from FarseerNMR.plot import barplotextended, barplotextendedvertical
+from FarseerNMR.plot.base import figurepool
+
+
+def test_pool_reuses_layout():
+    
+    with figurepool.FigurePool() as pool:
+        
+        figure, axs = pool.draw_figure(3, 2, 2, 4, 4)
+        axs[0].plot([1, 2, 3])
+        figure.text(0.1, 0.1, "header")
+        pool.release(figure)
+        
+        same, same_axs = pool.draw_figure(3, 2, 2, 4, 4)
+        other, _ = pool.draw_figure(4, 2, 2, 4, 4)
+        
+        assert same is figure
+        assert not(same_axs[0].lines)
+        assert not(same.texts)
+        assert other is not figure
+        assert pool.info() == figurepool.PoolInfo(1, 2, 8, 0)
+        
+        pool.release(same)
+        pool.release(other)
+    
+    assert len(pool) == 0
+    
+    return
+
+
+def test_pool_config_key():
+    
+    config = {"y_lims": (0, 1), "figure_path": "a.pdf"}
+    
+    with figurepool.FigurePool() as pool:
+        
+        figure, _ = pool.draw_figure(1, 1, 1, 2, 2, key=config)
+        pool.release(figure)
+        
+        # output keys do not change the figure
+        same, _ = pool.draw_figure(
+            1, 1, 1, 2, 2,
+            key={**config, "figure_path": "b.pdf"},
+            )
+        pool.release(same)
+        
+        other, _ = pool.draw_figure(
+            1, 1, 1, 2, 2,
+            key={**config, "y_lims": (0, 2)},
+            )
+        pool.release(other)
+    
+    assert same is figure
+    assert other is not figure
+    
+    return
+
+
+def test_pool_maxsize():
+    
+    with figurepool.FigurePool(maxsize=1) as pool:
+        
+        first, _ = pool.draw_figure(1, 1, 1, 2, 2)
+        second, _ = pool.draw_figure(2, 1, 1, 2, 2)
+        pool.release(first)
+        pool.release(second)
+        
+        assert len(pool) == 1
+        assert not(plt.fignum_exists(first.number))
+    
+    assert not(plt.fignum_exists(second.number))
+    
+    return
+
+
+def test_pool_maxsize_error():
+    
+    with pytest.raises(ValueError):
+        figurepool.FigurePool(maxsize=0)
+    
+    return
+
+
+def test_pool_plot(tmp_path):
+    
+    labels = np.arange(20).astype(str)
+    rs = np.random.RandomState(0)
+    values_a = rs.rand(3, 20)
+    values_b = rs.rand(3, 20) - 0.5
+    
+    config = barplotextendedvertical.Config(figure_dpi=30)
+    
+    fresh = os.fspath(tmp_path / "fresh.png")
+    pooled = os.fspath(tmp_path / "pooled.png")
+    
+    barplotextendedvertical.plot(
+        values_b,
+        labels,
+        config=config,
+        figure_path=fresh,
+        )
+    
+    with figurepool.FigurePool() as pool:
+        for values in (values_a, values_b):
+            barplotextendedvertical.plot(
+                values,
+                labels,
+                config=config,
+                pool=pool,
+                figure_path=pooled,
+                )
+        
+        assert pool.info().hits == 1
+    
+    assert cmp(fresh, pooled, shallow=False)
+    
+    return
+
+
+def test_pool_plot_styling_not_inherited(tmp_path):
+    
+    labels = np.arange(20).astype(str)
+    rs = np.random.RandomState(0)
+    values_a = rs.rand(3, 20)
+    values_b = rs.rand(3, 20)
+    
+    config = barplotextended.Config(figure_dpi=30)
+    
+    fresh = os.fspath(tmp_path / "fresh.png")
+    pooled = os.fspath(tmp_path / "pooled.png")
+    
+    barplotextended.plot(
+        values_b,
+        labels,
+        config=config,
+        figure_path=fresh,
+        )
+    
+    with figurepool.FigurePool() as pool:
+        
+        # red tick labels of missing peaks
+        barplotextended.plot(
+            values_a,
+            labels,
+            peak_status=np.full((3, 20), "missing"),
+            config=config,
+            pool=pool,
+            figure_path=os.fspath(tmp_path / "a.png"),
+            )
+        
+        barplotextended.plot(
+            values_b,
+            labels,
+            config=config,
+            pool=pool,
+            figure_path=pooled,
+            )
+        
+        assert pool.info().hits == 1
+    
+    assert cmp(fresh, pooled, shallow=False)
+    
+    return
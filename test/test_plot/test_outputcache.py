@@ -0,0 +1,227 @@
+import os
+from filecmp import cmp
+
+import matplotlib
+import numpy as np
+import pytest
+
+from FarseerNMR.plot import barplotextendedvertical, deltapreheatmap
+from FarseerNMR.plot.base import outputcache
+
+
+def _write(path, content):
+    
+    with open(path, "wb") as fout:
+        fout.write(content)
+    
+    return os.fspath(path)
+
+
+def test_cache_key(tmp_path):
+    
+    cache = outputcache.OutputCache(os.fspath(tmp_path / "cache"))
+    values = np.arange(6, dtype=float).reshape(2, 3)
+    config = {"y_lims": (0, 1), "figure_path": "a.pdf"}
+    
+    key = cache.key("FarseerNMR.plot.barplotcompacted", config, values=values)
+    
+    def other(template="FarseerNMR.plot.barplotcompacted", **kwargs):
+        return cache.key(template, {**config, **kwargs}, values=values)
+    
+    assert key == cache.key(
+        "FarseerNMR.plot.barplotcompacted",
+        {**config, "figure_path": "other/b.pdf", "render_processes": 2},
+        values=values.copy(),
+        )
+    
+    assert key != other(y_lims=(0, 2))
+    assert key != other(figure_path="a.png")
+    assert key != other(template="FarseerNMR.plot.barplotextended")
+    assert key != cache.key(
+        "FarseerNMR.plot.barplotcompacted",
+        config,
+        values=values.reshape(3, 2),
+        )
+    
+    return
+
+
+def test_cache_key_rcparams(tmp_path):
+    
+    cache = outputcache.OutputCache(os.fspath(tmp_path / "cache"))
+    values = np.arange(6, dtype=float).reshape(2, 3)
+    config = {"figure_path": "a.pdf"}
+    
+    def key():
+        return cache.key(
+            "FarseerNMR.plot.barplotcompacted",
+            config,
+            values=values,
+            )
+    
+    default = key()
+    
+    with matplotlib.rc_context({"patch.force_edgecolor": True}):
+        assert key() != default
+    
+    with matplotlib.rc_context({"interactive": True}):
+        assert key() == default
+    
+    assert key() == default
+    
+    return
+
+
+def test_cache_rcparams_miss(tmp_path):
+    
+    labels = np.arange(4).astype(str)
+    values = np.random.RandomState(0).rand(1, 4)
+    figure_path = os.fspath(tmp_path / "plot.png")
+    
+    cache = outputcache.OutputCache(os.fspath(tmp_path / "cache"))
+    
+    def plot():
+        barplotextendedvertical.plot(
+            values,
+            labels,
+            cache=cache,
+            figure_path=figure_path,
+            figure_dpi=30,
+            )
+        return
+    
+    plot()
+    
+    with matplotlib.rc_context({"text.color": "red"}):
+        plot()
+    
+    assert cache.info()[:2] == (0, 2)
+    
+    return
+
+
+def test_cache_maxsize_error(tmp_path):
+    
+    with pytest.raises(ValueError):
+        outputcache.OutputCache(os.fspath(tmp_path), maxsize=0)
+    
+    return
+
+
+def test_cache_eviction(tmp_path):
+    
+    cache = outputcache.OutputCache(os.fspath(tmp_path / "cache"), maxsize=25)
+    
+    for key in ("a", "b", "c"):
+        cache.store(key, [_write(tmp_path / f"{key}.pdf", b"0123456789")])
+    
+    # c evicted a, the least recently used
+    assert "a" not in cache
+    assert len(cache) == 2
+    
+    cache.fetch("b", {"figure_path": os.fspath(tmp_path / "b.pdf")})
+    cache.store("d", [_write(tmp_path / "d.pdf", b"0123456789")])
+    
+    assert "b" in cache
+    assert "c" not in cache
+    assert cache.info() == outputcache.CacheInfo(1, 0, 25, 20)
+    assert sorted(os.listdir(tmp_path / "cache")) == [
+        "b_000.pdf",
+        "d_000.pdf",
+        outputcache.MANIFEST,
+        ]
+    
+    return
+
+
+def test_cache_manifest(tmp_path):
+    
+    directory = os.fspath(tmp_path / "cache")
+    figure_path = _write(tmp_path / "plot.pdf", b"figure")
+    
+    outputcache.OutputCache(directory).store("a", [figure_path])
+    os.remove(figure_path)
+    
+    cache = outputcache.OutputCache(directory)
+    
+    assert cache.fetch("a", {"figure_path": figure_path}) == [figure_path]
+    
+    with open(figure_path, "rb") as fin:
+        assert fin.read() == b"figure"
+    
+    cache.clear()
+    
+    assert len(outputcache.OutputCache(directory)) == 0
+    assert os.listdir(directory) == [outputcache.MANIFEST]
+    
+    return
+
+
+def test_cache_plot(tmp_path, monkeypatch):
+    
+    labels = np.arange(20).astype(str)
+    values = np.random.RandomState(0).rand(4, 20)
+    config = barplotextendedvertical.Config(
+        figure_dpi=30,
+        paginate_flag=True,
+        cols_page=1,
+        rows_page=2,
+        )
+    
+    cache = outputcache.OutputCache(os.fspath(tmp_path / "cache"))
+    
+    def plot(figure_path):
+        barplotextendedvertical.plot(
+            values,
+            labels,
+            config=config,
+            cache=cache,
+            figure_path=os.fspath(tmp_path / figure_path),
+            )
+        return
+    
+    plot("fresh.png")
+    
+    pages = [tmp_path / "fresh_001.png", tmp_path / "fresh_002.png"]
+    assert all(page.exists() for page in pages)
+    
+    def fail(*args, **kwargs):
+        raise AssertionError("cached plot rendered")
+    
+    monkeypatch.setattr(barplotextendedvertical, "_calc_plan", fail)
+    
+    os.remove(pages[1])
+    plot("fresh.png")
+    plot("cached.png")
+    
+    assert cache.info().hits == 2
+    assert all(page.exists() for page in pages)
+    assert cmp(pages[1], tmp_path / "cached_002.png", shallow=False)
+    
+    with pytest.raises(AssertionError):
+        plot("cached.pdf")
+    
+    return
+
+
+def test_cache_heatmap(tmp_path):
+    
+    labels = np.arange(20).astype(str)
+    values = np.random.RandomState(0).rand(3, 20)
+    figure_path = os.fspath(tmp_path / "heatmap.png")
+    
+    cache = outputcache.OutputCache(os.fspath(tmp_path / "cache"))
+    
+    for _ in range(2):
+        deltapreheatmap.plot(
+            values,
+            labels,
+            cache=cache,
+            figure_path=figure_path,
+            figure_dpi=30,
+            )
+    
+    assert cache.info()[:2] == (1, 1)
+    assert os.path.exists(figure_path)
+    
+    return
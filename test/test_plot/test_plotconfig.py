@@ -0,0 +1,96 @@
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from FarseerNMR.plot import (
+    barplotcompacted,
+    deltapreheatmap,
+    parameterevolutionplot,
+    )
+
+
+def test_config_defaults():
+    
+    config = barplotcompacted.Config()
+    
+    for key, value in barplotcompacted.get_config().items():
+        assert config[key] == value or dict(config[key]) == value
+    
+    assert config.y_lims == (0, 0.3)
+    
+    return
+
+
+def test_config_immutable():
+    
+    config = barplotcompacted.Config(figure_dpi=150)
+    
+    with pytest.raises(AttributeError):
+        config.figure_dpi = 300
+    
+    with pytest.raises(TypeError):
+        config["user_marks_dict"]["foo"] = "x"
+    
+    return
+
+
+def test_config_errors():
+    
+    with pytest.raises(TypeError):
+        barplotcompacted.Config(figure_dpi=150.0)
+    
+    with pytest.raises(TypeError):
+        barplotcompacted.Config(not_a_key=1)
+    
+    return
+
+
+def test_config_hash():
+    
+    a = barplotcompacted.Config(figure_dpi=150, user_marks_dict={"a": "b"})
+    b = barplotcompacted.Config(figure_dpi=150, user_marks_dict={"a": "b"})
+    c = a.replace(figure_dpi=300)
+    
+    assert a == b
+    assert hash(a) == hash(b)
+    assert a != c
+    assert len({a, b, c}) == 2
+    assert c.figure_dpi == 300
+    assert a.figure_dpi == 150
+    
+    return
+
+
+def test_config_pickle():
+    
+    config = parameterevolutionplot.Config(titration_x_values=[1, 2, 3])
+    
+    assert pickle.loads(pickle.dumps(config)) == config
+    assert config.asdict()["titration_x_values"] == [1, 2, 3]
+    
+    return
+
+
+def test_plot_config(tmp_path):
+    
+    values = np.random.random((3, 20))
+    labels = np.array([str(i) for i in range(20)])
+    
+    config = deltapreheatmap.Config(figure_dpi=50)
+    
+    for i in range(2):
+        figure_path = os.fspath(tmp_path / f"heatmap{i}.png")
+        deltapreheatmap.plot(
+            values,
+            labels,
+            config=config,
+            figure_path=figure_path,
+            )
+        assert os.path.exists(figure_path)
+    
+    with pytest.raises(TypeError):
+        deltapreheatmap.plot(values, labels, config={"figure_dpi": 50})
+    
+    return
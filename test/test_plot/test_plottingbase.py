@@ -0,0 +1,224 @@
+import os
+import re
+import subprocess
+import sys
+from filecmp import cmp
+
+import numpy as np
+from matplotlib import pyplot as plt
+
+from FarseerNMR import logger
+from FarseerNMR.plot import barplotcompacted
+from FarseerNMR.plot.base import plottingbase, renderplan
+
+
+def test_calc_pages():
+    
+    pages = plottingbase.calc_pages(23, 5, 2)
+    
+    assert pages == [range(0, 10), range(10, 20), range(20, 23)]
+    
+    return
+
+
+def test_calc_pages_empty():
+    
+    assert plottingbase.calc_pages(0, 5, 2) == []
+    
+    return
+
+
+def test_page_writer_numbered(tmp_path):
+    
+    file_path = os.fspath(tmp_path / "figure.png")
+    
+    with plottingbase.PageWriter(file_path, paginate=True) as writer:
+        for _ in range(2):
+            figure = plt.figure(figsize=(1, 1))
+            writer.save(figure, dpi=20)
+            plt.close(figure)
+    
+    assert writer.num_pages == 2
+    assert writer.paths == [
+        os.fspath(tmp_path / "figure_001.png"),
+        os.fspath(tmp_path / "figure_002.png"),
+        ]
+    assert all(os.path.exists(path) for path in writer.paths)
+    assert not(os.path.exists(file_path))
+    
+    return
+
+
+def test_paginated_pdf(tmp_path):
+    
+    figure_path = os.fspath(tmp_path / "bars.pdf")
+    
+    barplotcompacted.plot(
+        np.random.RandomState(0).rand(7, 20),
+        np.arange(20).astype(str),
+        figure_path=figure_path,
+        paginate_flag=True,
+        rows_page=2,
+        cols_page=2,
+        threshold_flag=False,
+        )
+    
+    with open(figure_path, "rb") as fin:
+        pdf = fin.read()
+    
+    # 7 subplots in pages of 4
+    assert re.findall(rb"/Count (\d+)", pdf) == [b"2"]
+    
+    return
+
+
+def _draw_test_page(subplots, plan, *, page, trace, pool, color):
+    
+    figure, axs = plottingbase.draw_figure(len(subplots), 1, 2, 2, 2)
+    
+    for ax, i in zip(axs, subplots):
+        ax.plot(plan.subplot(i)["values"], color=color)
+    
+    plottingbase.clean_subplots(axs, len(subplots))
+    
+    return figure
+
+
+def test_render_pages_parallel(tmp_path):
+    
+    values = np.random.RandomState(0).rand(5, 10)
+    pages = plottingbase.calc_pages(5, 1, 2)
+    
+    paths = {}
+    for processes in (1, 2):
+        
+        file_path = os.fspath(tmp_path / f"lines{processes}.png")
+        
+        with plottingbase.PageWriter(file_path, paginate=True) as writer:
+            plottingbase.render_pages(
+                _draw_test_page,
+                pages,
+                writer,
+                renderplan.RenderPlan("test", subplots={"values": values}),
+                trace=logger.Trace(__name__),
+                processes=processes,
+                dpi=20,
+                color="red",
+                )
+        
+        paths[processes] = writer.paths
+    
+    assert len(paths[2]) == 3
+    
+    for serial, parallel in zip(paths[1], paths[2]):
+        assert cmp(serial, parallel, shallow=False)
+    
+    return
+
+
+def test_render_pages_parallel_pdf(tmp_path):
+    
+    values = np.random.RandomState(0).rand(5, 10)
+    file_path = os.fspath(tmp_path / "lines.pdf")
+    
+    with plottingbase.PageWriter(file_path, paginate=True) as writer:
+        plottingbase.render_pages(
+            _draw_test_page,
+            plottingbase.calc_pages(5, 1, 2),
+            writer,
+            renderplan.RenderPlan("test", subplots={"values": values}),
+            trace=logger.Trace(__name__),
+            processes=2,
+            color="red",
+            )
+    
+    with open(file_path, "rb") as fin:
+        assert re.findall(rb"/Count (\d+)", fin.read()) == [b"3"]
+    
+    return
+
+
+def _run_python(code):
+    
+    env = {
+        k: v
+        for k, v in os.environ.items()
+        if k not in ("DISPLAY", "WAYLAND_DISPLAY", "MPLBACKEND")
+        }
+    
+    env["PYTHONPATH"] = os.pathsep.join(sys.path)
+    
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env=env,
+        stdout=subprocess.PIPE,
+        check=True,
+        )
+    
+    return result.stdout.decode().strip()
+
+
+def test_lazy_matplotlib_import():
+    
+    out = _run_python(
+        "import sys\n"
+        "import FarseerNMR.calc.threshold\n"
+        "from FarseerNMR.plot import barplotcompacted, deltapreheatmap\n"
+        "from FarseerNMR.plot import parameterevolutionplot\n"
+        "print('matplotlib' in sys.modules)\n"
+        )
+    
+    assert out == "False"
+    
+    return
+
+
+def test_import_pyplot_headless():
+    
+    if not(sys.platform.startswith("linux")):
+        return
+    
+    out = _run_python(
+        "from FarseerNMR.plot.base import plottingbase\n"
+        "plt = plottingbase.import_pyplot()\n"
+        "print(plt.get_backend().lower())\n"
+        )
+    
+    assert out == "agg"
+    
+    return
+
+
+def test_backend_selected(monkeypatch):
+    
+    import matplotlib
+    
+    monkeypatch.setenv("MPLBACKEND", "agg")
+    
+    assert plottingbase._backend_selected(matplotlib)
+    
+    monkeypatch.delenv("MPLBACKEND")
+    monkeypatch.delattr(
+        type(matplotlib.rcParams),
+        "_get_backend_or_none",
+        raising=False,
+        )
+    
+    assert plottingbase._backend_selected(matplotlib)
+    
+    return
+
+
+def test_lazy_submodules():
+    
+    out = _run_python(
+        "import sys\n"
+        "from FarseerNMR import calc\n"
+        "print('FarseerNMR.calc.threshold' in sys.modules)\n"
+        "calc.threshold\n"
+        "print('FarseerNMR.calc.threshold' in sys.modules)\n"
+        )
+    
+    assert out.split() == ["False", "True"]
+    
+    return
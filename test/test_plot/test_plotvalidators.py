@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from FarseerNMR.plot.base import plotvalidators
+
+
+def _params(**kwargs):
+    
+    params = {
+        "values": np.zeros((2, 3)),
+        "labels": np.array(["1", "2", "3"]),
+        "header": "",
+        "suptitles": ["a", "b"],
+        "letter_code": None,
+        "peak_status": np.full((2, 3), "measured"),
+        "details": None,
+        "tag_position": None,
+        "theo_pre": None,
+        }
+    
+    params.update(kwargs)
+    
+    return params
+
+
+def test_barplot_params():
+    
+    plotvalidators.barplot_params.validate(*_params().values())
+    
+    return
+
+
+@pytest.mark.parametrize(
+    "params,error",
+    [
+        (_params(labels=["1", "2", "3"]), TypeError),
+        (_params(labels=np.array(["1", "2"])), ValueError),
+        (_params(suptitles=["a"]), ValueError),
+        (_params(peak_status=np.full((3, 2), "")), ValueError),
+        (_params(header=1), TypeError),
+        ]
+    )
+def test_barplot_params_errors(params, error):
+    
+    with pytest.raises(error):
+        plotvalidators.barplot_params.validate(*params.values())
+    
+    return
+
+
+def test_barplot_params_ndim():
+    
+    with pytest.raises(SystemExit):
+        plotvalidators.barplot_params.validate(
+            *_params(values=np.zeros(3)).values(),
+            )
+    
+    return
+
+
+def test_config_schema():
+    
+    schema = plotvalidators.ConfigSchema(
+        {"x_label": "", "y_lims": (0, 1), "figure_dpi": 300},
+        name="Test",
+        )
+    
+    schema.validate({"x_label": "a", "y_lims": (0, 2), "other": None})
+    
+    with pytest.raises(TypeError):
+        schema.validate({"figure_dpi": 300.0})
+    
+    return
+
+
+def test_trusted():
+    
+    schema = plotvalidators.ConfigSchema({"figure_dpi": 300})
+    
+    with plotvalidators.trusted():
+        schema.validate({"figure_dpi": 300.0})
+        plotvalidators.barplot_params.validate(*_params(header=1).values())
+    
+    with pytest.raises(TypeError):
+        schema.validate({"figure_dpi": 300.0})
+    
+    return
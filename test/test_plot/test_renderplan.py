@@ -0,0 +1,181 @@
+import json
+
+import numpy as np
+import pytest
+
+from FarseerNMR.plot import (
+    barplotcompacted,
+    barplotextended,
+    deltapreheatmap,
+    parameterevolutionplot,
+    )
+from FarseerNMR.plot.base import renderplan
+
+
+def _make_data(shape=(3, 25)):
+    
+    rs = np.random.RandomState(0)
+    values = rs.rand(*shape) * 0.3
+    values[0, 2] = np.nan
+    labels = np.array([str(i + 1) for i in range(shape[1])])
+    peak_status = np.full(shape, "measured", dtype="<U10")
+    peak_status[1, 4] = "missing"
+    tag_position = np.full(shape, "", dtype="<U1")
+    tag_position[0, 0] = "*"
+    tag_position[2, 7] = "*"
+    
+    return values, labels, peak_status, tag_position
+
+
+def test_plan_subplot():
+    
+    plan = renderplan.RenderPlan(
+        "test",
+        figure={"xticks": np.arange(3)},
+        subplots={"values": np.ones((4, 3)), "marks": None},
+        )
+    
+    assert len(plan) == 4
+    assert plan.subplot(1)["marks"] is None
+    assert np.array_equal(plan.subplot(1)["values"], np.ones(3))
+    
+    return
+
+
+def test_plan_lengths():
+    
+    with pytest.raises(ValueError):
+        renderplan.RenderPlan(
+            "test",
+            subplots={"a": np.ones((4, 3)), "b": np.ones(3)},
+            )
+    
+    return
+
+
+def test_plan_diff():
+    
+    values = np.ones((4, 3))
+    values[0, 0] = np.nan
+    plan = renderplan.RenderPlan(
+        "test",
+        figure={"xticks": np.arange(3)},
+        subplots={"values": values},
+        )
+    
+    changed = values.copy()
+    changed[2, 1] = 2
+    other = plan.replace(values=changed)
+    other.figure["xticks"] = np.arange(4)
+    
+    assert plan == plan.replace(values=values.copy())
+    assert plan.diff(other) == {"values": [2], "xticks": None}
+    assert plan != other
+    
+    return
+
+
+def test_plan_json():
+    
+    values, labels, peak_status, tag_position = _make_data()
+    
+    plan = barplotextended.calc_plan(
+        values,
+        labels,
+        peak_status=peak_status,
+        tag_position=tag_position,
+        theo_pre=values,
+        plot_theoretical_pre=True,
+        )
+    
+    loaded = renderplan.RenderPlan.from_dict(
+        json.loads(json.dumps(plan.to_dict()))
+        )
+    
+    assert loaded == plan
+    
+    return
+
+
+def test_barplot_plan():
+    
+    values, labels, peak_status, tag_position = _make_data()
+    
+    plan = barplotcompacted.calc_plan(
+        values,
+        labels,
+        peak_status=peak_status,
+        tag_position=tag_position,
+        theo_pre=values,
+        plot_theoretical_pre=True,
+        threshold_strategy="mad",
+        )
+    
+    assert len(plan) == 3
+    assert plan.figure["xticks"].tolist() == [9, 19]
+    assert plan.subplots["ydata"][0, 2] == 0
+    assert plan.subplots["facecolors"][1, 4] == "red"
+    assert plan.subplots["tag_index"].tolist() == [0, -1, 7]
+    assert plan.subplots["detail_marks"] is None
+    
+    # same data, same plan
+    assert plan == barplotcompacted.calc_plan(
+        values.copy(),
+        labels,
+        peak_status=peak_status,
+        tag_position=tag_position,
+        theo_pre=values,
+        plot_theoretical_pre=True,
+        threshold_strategy="mad",
+        )
+    
+    return
+
+
+def test_barplot_plan_validation():
+    
+    values, labels, _, _ = _make_data()
+    
+    with pytest.raises(ValueError):
+        barplotcompacted.calc_plan(values, labels[:-1])
+    
+    return
+
+
+def test_parameterevolution_plan():
+    
+    values = np.random.RandomState(0).rand(4, 5)
+    peak_status = np.full(values.shape, "measured", dtype="<U10")
+    peak_status[3, 0] = "unassigned"
+    
+    plan = parameterevolutionplot.calc_plan(
+        values,
+        peak_status=peak_status,
+        titration_x_values=["0", "10", "20", "40", "80"],
+        )
+    
+    assert plan.figure["xticks"] == [0, 10, 20, 40, 80]
+    assert plan.figure["xticks_locator"]
+    assert plan.subplots["unassigned"].tolist() == [False] * 3 + [True]
+    assert plan.subplots["fitting"] is None
+    
+    return
+
+
+def test_deltapreheatmap_plan():
+    
+    values, labels, _, tag_position = _make_data()
+    
+    plan = deltapreheatmap.calc_plan(
+        values,
+        labels,
+        tag_position=tag_position,
+        x_ticks_max=5,
+        )
+    
+    assert len(plan) == 0
+    assert plan.figure["xticks"].tolist() == [0, 5, 10, 15, 20]
+    assert plan.figure["tag_cols"].tolist() == [0, 7]
+    assert plan.figure["tag_strip"].tolist() == [0, 7]
+    
+    return